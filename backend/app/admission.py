@@ -0,0 +1,162 @@
+"""
+Admission control for the LLM-heavy generation endpoints.
+
+Each controller admits at most `max_concurrent` requests at a time and lets
+up to `max_queue` more wait (for at most `queue_timeout` seconds) for a slot.
+Anything beyond that is turned away immediately with `429 Too Many Requests`
+and a `Retry-After` estimate. A spike of generation requests then cannot
+pile up in the request threadpool and starve the browsing endpoints.
+
+Slots are released with `release()`, which may be called from any thread.
+Stream runs are an example: their generation outlives the request handler.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Optional
+
+from fastapi import HTTPException
+
+from .config import settings
+from .metrics import metrics
+
+# Smoothing for the moving average of slot hold times (used for Retry-After)
+_HOLD_TIME_ALPHA = 0.2
+
+
+class _Waiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+        self.granted = False
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: Callable[[], int], max_queue: Callable[[], int]):
+        """`max_concurrent` and `max_queue` return the current limits (read from settings on use)."""
+        self.name = name
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self.active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._avg_hold_seconds: Optional[float] = None
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent()
+
+    @property
+    def max_queue(self) -> int:
+        return self._max_queue()
+
+    @property
+    def queue_timeout(self) -> float:
+        return settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """
+        Take a slot, waiting in the bounded queue if necessary. Returns the
+        monotonic time the slot was granted (pass it to `release`).
+
+        Raises 429 when the queue is full or the wait times out.
+        """
+        if not settings.ADMISSION_ENABLED:
+            return time.monotonic()
+
+        started = time.monotonic()
+        with self._lock:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                metrics.inc("admission_requests_total", {"pool": self.name, "result": "admitted"})
+                return time.monotonic()
+            if len(self._waiters) >= self.max_queue:
+                self._reject("queue_full")
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                if granted:
+                    self.release()  # The slot was handed over just as the client went away
+                raise
+            if not granted:
+                self._reject("queue_timeout")
+        metrics.inc("admission_requests_total", {"pool": self.name, "result": "queued"})
+        metrics.observe("admission_queue_wait_seconds", time.monotonic() - started, {"pool": self.name})
+        return time.monotonic()
+
+    def release(self, granted_at: Optional[float] = None) -> None:
+        """Free a slot (thread-safe), handing it straight to the next waiter."""
+        if not settings.ADMISSION_ENABLED:
+            return
+        with self._lock:
+            if granted_at is not None:
+                held = time.monotonic() - granted_at
+                self._avg_hold_seconds = held if self._avg_hold_seconds is None else (
+                    _HOLD_TIME_ALPHA * held + (1 - _HOLD_TIME_ALPHA) * self._avg_hold_seconds
+                )
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True  # The slot moves to the waiter; `active` is unchanged
+                waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+            else:
+                self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        granted_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(granted_at)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the average hold time and queue depth."""
+        hold = self._avg_hold_seconds or settings.ADMISSION_DEFAULT_RETRY_AFTER_SECONDS
+        return max(1, math.ceil(hold * (len(self._waiters) + 1) / self.max_concurrent))
+
+    def _reject(self, reason: str) -> None:
+        metrics.inc("admission_requests_total", {"pool": self.name, "result": "rejected"})
+        metrics.inc("admission_rejections_total", {"pool": self.name, "reason": reason})
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {self.name} requests in progress, retry later",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# Create singleton instances
+guide_admission = AdmissionController(
+    "guide_generation",
+    max_concurrent=lambda: settings.GUIDE_MAX_CONCURRENT,
+    max_queue=lambda: settings.GUIDE_MAX_QUEUE
+)
+regenerate_admission = AdmissionController(
+    "question_regeneration",
+    max_concurrent=lambda: settings.REGENERATE_MAX_CONCURRENT,
+    max_queue=lambda: settings.REGENERATE_MAX_QUEUE
+)
+
+metrics.describe("admission_requests_total", "Generation requests by admission outcome (admitted at once, after queueing, or rejected)")
+metrics.describe("admission_rejections_total", "Generation requests turned away with 429 by reason")
+metrics.describe("admission_queue_wait_seconds", "Time admitted requests waited in the admission queue")
@@ -0,0 +1,64 @@
+"""Cooperative cancellation for guide generation (client disconnects, explicit cancels)."""
+
+import threading
+from typing import Callable, List, Optional
+
+
+class GenerationCancelled(Exception):
+    """Raised inside the generation pipeline once its token has been cancelled."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an LLM call runs past the time budget it was given."""
+
+
+class CancellationToken:
+    """
+    Thread-safe cancel flag shared between a request handler and the worker
+    thread doing the generation. Callbacks let in-flight work (e.g. an open
+    LLM response stream) be torn down immediately instead of at the next
+    checkpoint.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the token. Returns False if it was already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback (run immediately if already cancelled). Returns an unregister function."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove() -> None:
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return remove
+        callback()
+        return lambda: None
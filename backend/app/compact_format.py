@@ -0,0 +1,94 @@
+"""
+Compact wire format for structured LLM responses.
+
+Guide responses repeat long keys like `evidence_from_evaluation` and
+`what_to_listen_for` for every question, and output tokens dominate LLM
+latency. With LLM_COMPACT_OUTPUT the response schema uses the short keys in
+SHORT_KEYS instead (the long name stays in each property's description,
+except on `$ref` properties, which must stay bare).
+Responses are expanded back to the long keys before validation, so counting,
+trimming and merging see the usual `sections` structure.
+"""
+
+import copy
+from typing import Any, Dict
+
+SHORT_KEYS = {
+    "executive_summary": "sum",
+    "interview_duration_estimate": "dur",
+    "sections": "sec",
+    "verified_skills": "ver",
+    "skill_gaps": "gaps",
+    "skills_not_tested": "unt",
+    "overall_red_flags": "orf",
+    "overall_strengths": "ost",
+    "interview_tips": "tips",
+    "additional_questions": "add",
+    "skill_name": "sk",
+    "score": "sc",
+    "current_score": "cs",
+    "acknowledgment": "ack",
+    "priority": "pr",
+    "reasoning": "why",
+    "data_observation": "obs",
+    "evidence_from_evaluation": "ev",
+    "gap_significance": "sig",
+    "interview_strategy": "strat",
+    "question_rationale": "rat",
+    "note": "note",
+    "relevance_to_role": "rel",
+    "question_strategy": "qstrat",
+    "questions": "qs",
+    "question": "q",
+    "what_to_listen_for": "lf",
+    "red_flags": "rf",
+    "follow_ups": "fu",
+    "time_estimate": "t",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+
+
+def _rename(node: Any, keys: Dict[str, str]) -> Any:
+    if isinstance(node, dict):
+        return {keys.get(key, key): _rename(value, keys) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_rename(item, keys) for item in node]
+    return node
+
+
+def expand(data: Any) -> Any:
+    """Compact response -> the long-key structure."""
+    return _rename(data, LONG_KEYS)
+
+
+def compact(data: Any) -> Any:
+    """Long-key structure -> compact response (the inverse of `expand`)."""
+    return _rename(data, SHORT_KEYS)
+
+
+def compact_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a strict JSON schema with its property names shortened."""
+    schema = copy.deepcopy(schema)
+
+    def shorten(node: Any) -> None:
+        if isinstance(node, dict):
+            if isinstance(node.get("properties"), dict):
+                properties = {}
+                for name, prop in node["properties"].items():
+                    short = SHORT_KEYS.get(name, name)
+                    # Strict structured outputs reject keywords next to a `$ref`
+                    if short != name and "$ref" not in prop:
+                        description = prop.get("description")
+                        prop = {**prop, "description": f"{name}: {description}" if description else name}
+                    properties[short] = prop
+                node["properties"] = properties
+                if "required" in node:
+                    node["required"] = [SHORT_KEYS.get(name, name) for name in node["required"]]
+            for value in node.values():
+                shorten(value)
+        elif isinstance(node, list):
+            for item in node:
+                shorten(item)
+
+    shorten(schema)
+    return schema
@@ -0,0 +1,184 @@
+"""Response compression middleware (gzip/brotli) with a flush-aware SSE mode."""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - fall back to gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+EVENT_STREAM_TYPE = "text/event-stream"
+
+
+class _Encoder:
+    """Incremental encoder wrapping zlib (gzip container) or brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 -> gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything buffered so far without ending the stream."""
+        if self.encoding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON/text responses above a size threshold.
+
+    Regular responses are compressed in one shot (or incrementally when the
+    app streams them). For `text/event-stream` responses the compressor is
+    flushed after every chunk in "flush" mode so each SSE event reaches the
+    browser as soon as it is produced; "off" leaves event streams untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_enabled: bool = True,
+        brotli_quality: int = 4,
+        sse_mode: str = "flush"
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_enabled = brotli_enabled and brotli is not None
+        self.brotli_quality = brotli_quality
+        self.sse_mode = sse_mode
+
+    def _select_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = set()
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0"):
+                continue  # explicitly refused by the client
+            accepted.add(name.strip())
+        if self.brotli_enabled and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = self._select_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+            if encoding:
+                responder = _CompressionResponder(self.app, self, encoding)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, config: CompressionMiddleware, encoding: str) -> None:
+        self.app = app
+        self.config = config
+        self.encoding = encoding
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.flush_each_chunk = False
+        self.encoder: Optional[_Encoder] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_skip(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return True
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(EVENT_STREAM_TYPE):
+            return self.config.sse_mode != "flush"
+        return not content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _start_encoding(self) -> MutableHeaders:
+        self.encoder = _Encoder(self.encoding, self.config.gzip_level, self.config.brotli_quality)
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the start message until we know whether to compress
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = self._should_skip(headers)
+            self.flush_each_chunk = headers.get("content-type", "").lower().startswith(EVENT_STREAM_TYPE)
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+
+            if not more_body and not self.flush_each_chunk:
+                if len(body) < self.config.minimum_size:
+                    # Small responses are not worth the CPU
+                    await self.send(self.initial_message)
+                    await self.send(message)
+                    return
+
+                # Whole body available - compress in one shot
+                headers = self._start_encoding()
+                body = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            # Streaming response - length is unknown up front
+            headers = self._start_encoding()
+            del headers["Content-Length"]
+            await self.send(self.initial_message)
+
+        if more_body:
+            chunk = self.encoder.compress(body)
+            if self.flush_each_chunk:
+                # Push the event out now instead of waiting for the compressor window
+                chunk += self.encoder.flush()
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
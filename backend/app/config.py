@@ -1,38 +1,135 @@
+import json
+import logging
 import os
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load .env from backend directory (parent of app directory)
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+logger = logging.getLogger(__name__)
 
-# Debug: print if .env was found
-if env_path.exists():
-    print(f"✓ Loaded .env from: {env_path}")
-else:
-    print(f"⚠ Warning: .env file not found at: {env_path}")
+# .env in the backend directory (parent of app directory); loaded when the
+# settings are first read, and reported by log_summary()
+env_path = Path(__file__).parent.parent / '.env'
 
 class Settings:
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-    
-    # PostgreSQL connection - loaded from environment variables only
-    PG_HOST: str = os.getenv("PG_HOST", "")
-    PG_PORT: str = os.getenv("PG_PORT", "5432")
-    PG_DBNAME: str = os.getenv("PG_DBNAME", "")
-    PG_USERNAME: str = os.getenv("PG_USERNAME", "")
-    PG_PASSWORD: str = os.getenv("PG_PASSWORD", "")
+    def __init__(self) -> None:
+        """Read the settings from the environment, after loading the .env file."""
+        load_dotenv(dotenv_path=env_path)
+
+        self.OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+        self.LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4o")
+        self.LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")  # Small tasks, and guides when generation is degraded
+        # task (guide, top_up, regenerate, legacy_guide) -> model, as a JSON string; unset tasks keep their default
+        self.LLM_ROUTES: dict = json.loads(os.getenv("LLM_ROUTES", "{}"))
+        self.LLM_ESCALATION_ENABLED: bool = os.getenv("LLM_ESCALATION_ENABLED", "true").lower() == "true"  # Retry invalid output on a larger model
+        self.LLM_ESCALATION_MODEL: str = os.getenv("LLM_ESCALATION_MODEL", "")  # Defaults to LLM_MODEL
+        self.LLM_STRUCTURED_OUTPUTS: bool = os.getenv("LLM_STRUCTURED_OUTPUTS", "true").lower() == "true"  # Strict JSON schemas; false = JSON mode with the schema in the prompt
+        self.LLM_COMPACT_OUTPUT: bool = os.getenv("LLM_COMPACT_OUTPUT", "false").lower() == "true"  # Short-key response schemas, expanded server-side
+        self.LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")  # openai, fake (deterministic, for benchmarks)
+        self.FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+        self.FAKE_LLM_MS_PER_1K_CHARS: float = float(os.getenv("FAKE_LLM_MS_PER_1K_CHARS", "0"))
+        self.FAKE_LLM_SHORTFALL: int = int(os.getenv("FAKE_LLM_SHORTFALL", "0"))  # Questions missing from the first guide call
     
-    def __init__(self):
-        # Debug output
-        if self.OPENAI_API_KEY:
-            print(f"✓ OpenAI API Key loaded (starts with: {self.OPENAI_API_KEY[:10]}...)")
+        # PostgreSQL connection - loaded from environment variables only
+        self.PG_HOST: str = os.getenv("PG_HOST", "")
+        self.PG_PORT: str = os.getenv("PG_PORT", "5432")
+        self.PG_DBNAME: str = os.getenv("PG_DBNAME", "")
+        self.PG_USERNAME: str = os.getenv("PG_USERNAME", "")
+        self.PG_PASSWORD: str = os.getenv("PG_PASSWORD", "")
+        self.DB_WARMUP_CONNECTIONS: int = int(os.getenv("DB_WARMUP_CONNECTIONS", "0"))  # Pool connections to open at startup (0 = connect on first request)
+
+        # Response compression (gzip always available, brotli when the package is installed)
+        self.COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+        self.COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.COMPRESSION_BROTLI_ENABLED: bool = os.getenv("COMPRESSION_BROTLI_ENABLED", "true").lower() == "true"
+        self.COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+        self.COMPRESSION_SSE_MODE: str = os.getenv("COMPRESSION_SSE_MODE", "flush")  # flush, off
+
+        # Background generation jobs (local durable queue + worker processes)
+        self.JOB_QUEUE_DB_PATH: str = os.getenv("JOB_QUEUE_DB_PATH", str(Path(__file__).parent.parent / "data" / "jobs.sqlite3"))
+        self.JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", "2"))
+        self.JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "300"))  # Re-queue items whose worker stopped heartbeating
+        self.JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # seconds
+        self.JOB_CANCEL_POLL_SECONDS: float = float(os.getenv("JOB_CANCEL_POLL_SECONDS", "5"))  # How often running items check for job cancellation
+        self.CAMPAIGN_JOB_SHARDS: int = int(os.getenv("CAMPAIGN_JOB_SHARDS", "4"))  # Default concurrency for campaign-wide jobs
+        self.CAMPAIGN_JOB_MAX_SHARDS: int = int(os.getenv("CAMPAIGN_JOB_MAX_SHARDS", "32"))
+        self.CAMPAIGN_JOB_MAX_SESSIONS: int = int(os.getenv("CAMPAIGN_JOB_MAX_SESSIONS", "5000"))
+
+        # Resumable SSE streams (runs are buffered in memory per web worker)
+        self.STREAM_RUN_TTL_SECONDS: int = int(os.getenv("STREAM_RUN_TTL_SECONDS", "900"))  # Keep finished runs for reconnects
+        self.STREAM_KEEPALIVE_SECONDS: float = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "15"))
+        self.STREAM_DISCONNECT_GRACE_SECONDS: float = float(os.getenv("STREAM_DISCONNECT_GRACE_SECONDS", "30"))  # Cancel unattended runs after this
+        self.DISCONNECT_POLL_SECONDS: float = float(os.getenv("DISCONNECT_POLL_SECONDS", "1.0"))
+
+        # Coalesce identical concurrent guide generations into one LLM run
+        self.SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+        # Idempotency-Key results for retried POST generation requests
+        self.IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+        self.IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))  # Max wait for the original request (409 after)
+
+        # Admission control for generation endpoints (429 + Retry-After when saturated)
+        self.ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        self.GUIDE_MAX_CONCURRENT: int = int(os.getenv("GUIDE_MAX_CONCURRENT", "8"))  # Guide requests generating at once
+        self.GUIDE_MAX_QUEUE: int = int(os.getenv("GUIDE_MAX_QUEUE", "16"))  # Guide requests allowed to wait for a slot
+        self.REGENERATE_MAX_CONCURRENT: int = int(os.getenv("REGENERATE_MAX_CONCURRENT", "8"))
+        self.REGENERATE_MAX_QUEUE: int = int(os.getenv("REGENERATE_MAX_QUEUE", "16"))
+        self.ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+        self.ADMISSION_DEFAULT_RETRY_AFTER_SECONDS: float = float(os.getenv("ADMISSION_DEFAULT_RETRY_AFTER_SECONDS", "5"))  # Until hold times are known
+        self.LLM_EXECUTOR_WORKERS: int = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))  # Threads for LLM-bound work (>= the concurrency limits above)
+        self.REQUEST_THREADPOOL_SIZE: int = int(os.getenv("REQUEST_THREADPOOL_SIZE", "40"))  # AnyIO threads for sync routes (DB reads)
+
+        # Latency-aware degradation of guide generation
+        self.DEGRADATION_ENABLED: bool = os.getenv("DEGRADATION_ENABLED", "true").lower() == "true"
+        self.GUIDE_DEADLINE_SECONDS: float = float(os.getenv("GUIDE_DEADLINE_SECONDS", "120"))  # Default per-guide deadline
+        self.GUIDE_FIRST_CALL_SHARE: float = float(os.getenv("GUIDE_FIRST_CALL_SHARE", "0.7"))  # Deadline share for the first call when top-ups may follow
+        self.LLM_MIN_CALL_SECONDS: float = float(os.getenv("LLM_MIN_CALL_SECONDS", "3"))  # Don't start an LLM call with less budget left
+        self.LLM_LATENCY_SLO_SECONDS: float = float(os.getenv("LLM_LATENCY_SLO_SECONDS", "45"))  # p95 target for first guide calls
+        self.LLM_LATENCY_WINDOW_SECONDS: float = float(os.getenv("LLM_LATENCY_WINDOW_SECONDS", "300"))
+        self.DEGRADATION_MIN_SAMPLES: int = int(os.getenv("DEGRADATION_MIN_SAMPLES", "5"))
+        # p95/SLO ratios above which to step down to reduced, fast_model and draft
+        self.DEGRADATION_STEP_RATIOS: list = [float(r) for r in os.getenv("DEGRADATION_STEP_RATIOS", "1.0,1.5,2.5").split(",")]
+
+        # Packed batches: several small-evidence candidates per first guide call (requests with `pack`)
+        self.GUIDE_PACK_MAX_CANDIDATES: int = int(os.getenv("GUIDE_PACK_MAX_CANDIDATES", "4"))
+        self.GUIDE_PACK_MAX_EVIDENCE_CHARS: int = int(os.getenv("GUIDE_PACK_MAX_EVIDENCE_CHARS", "2500"))  # Larger evidence gets its own call
+        self.GUIDE_PACK_MAX_TOKENS: int = int(os.getenv("GUIDE_PACK_MAX_TOKENS", "16000"))  # max_tokens cap of a packed call
+
+        # Question bank (local SQLite): reuse vetted questions before asking the LLM
+        self.QUESTION_BANK_ENABLED: bool = os.getenv("QUESTION_BANK_ENABLED", "false").lower() == "true"
+        self.QUESTION_BANK_DB_PATH: str = os.getenv("QUESTION_BANK_DB_PATH", str(Path(__file__).parent.parent / "data" / "question_bank.sqlite3"))
+        self.QUESTION_BANK_MAX_SHARE: float = float(os.getenv("QUESTION_BANK_MAX_SHARE", "0.75"))  # Max fraction of a guide served from the bank
+        self.QUESTION_BANK_MAX_PER_SKILL: int = int(os.getenv("QUESTION_BANK_MAX_PER_SKILL", "2"))  # Per skill gap
+
+        # LLM call ledger (local SQLite, written off the request path)
+        self.LLM_LEDGER_ENABLED: bool = os.getenv("LLM_LEDGER_ENABLED", "true").lower() == "true"
+        self.LLM_LEDGER_DB_PATH: str = os.getenv("LLM_LEDGER_DB_PATH", str(Path(__file__).parent.parent / "data" / "llm_ledger.sqlite3"))
+        # USD per 1M tokens, {"model": {"input": x, "output": y}}; override with a JSON string
+        self.LLM_PRICES: dict = json.loads(os.getenv(
+            "LLM_PRICES",
+            '{"gpt-4o": {"input": 2.50, "output": 10.00}, "gpt-4o-mini": {"input": 0.15, "output": 0.60}}'
+        ))
+
+    def log_summary(self) -> None:
+        """Log what was configured (called once at app startup, not at import)."""
+        if env_path.exists():
+            logger.info(f"Loaded .env from: {env_path}")
         else:
-            print("⚠ Warning: OPENAI_API_KEY not set - will use mock data for interview generation")
+            logger.warning(f".env file not found at: {env_path}")
+        
+        if self.LLM_PROVIDER == "fake":
+            logger.info("LLM_PROVIDER=fake - using the deterministic fake LLM")
+        elif self.OPENAI_API_KEY:
+            logger.info(f"OpenAI API Key loaded (starts with: {self.OPENAI_API_KEY[:10]}...)")
+        else:
+            logger.warning("OPENAI_API_KEY not set - will use mock data for interview generation")
         
         if self.PG_HOST:
-            print(f"✓ Database configured: {self.PG_HOST[:10]}....")
+            logger.info(f"Database configured: {self.PG_HOST[:10]}....")
         else:
-            print("⚠ Warning: Database credentials not fully configured")
+            logger.warning("Database credentials not fully configured")
     
     @property
     def DATABASE_URL(self) -> str:
@@ -40,4 +137,30 @@ class Settings:
             raise ValueError("Database credentials not configured. Please set PG_HOST, PG_DBNAME, PG_USERNAME, PG_PASSWORD in .env file")
         return f"postgresql://{self.PG_USERNAME}:{self.PG_PASSWORD}@{self.PG_HOST}:{self.PG_PORT}/{self.PG_DBNAME}"
 
-settings = Settings()
+
+class _LazySettings:
+    """
+    Builds Settings on first attribute access, so importing this module does
+    no file I/O; the .env file is read then.
+    """
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_settings", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> Settings:
+        if self._settings is None:
+            with self._lock:
+                if self._settings is None:
+                    object.__setattr__(self, "_settings", Settings())
+        return self._settings
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+
+# Create singleton instance
+settings = _LazySettings()
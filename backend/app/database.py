@@ -1,23 +1,83 @@
+import logging
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import metrics
 
-# Create engine with pool_pre_ping to handle stale connections
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Enables connection health checks
-    pool_recycle=300,    # Recycle connections every 5 minutes
-    pool_size=5,         # Number of connections in pool
-    max_overflow=10      # Max additional connections
-)
+logger = logging.getLogger(__name__)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+POOL_SIZE = 5  # Number of connections in pool
+MAX_OVERFLOW = 10  # Max additional connections
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Create the engine on first use. Importing this module therefore needs no
+    database credentials and does not load the Postgres driver.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # Create engine with pool_pre_ping to handle stale connections
+                _engine = create_engine(
+                    settings.DATABASE_URL,
+                    pool_pre_ping=True,  # Enables connection health checks
+                    pool_recycle=300,    # Recycle connections every 5 minutes
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW
+                )
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the engine the first time a session is made."""
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
+        # Check the connection out up front so time spent waiting on the pool is visible
+        started = time.perf_counter()
+        db.connection()
+        metrics.observe("db_pool_wait_seconds", time.perf_counter() - started)
         yield db
     finally:
         db.close()
+
+
+def warm_up(connections: int) -> None:
+    """Open up to `connections` pool connections now so the first requests skip connect latency."""
+    connections = min(connections, POOL_SIZE)  # Overflow connections would be closed again on return
+    started = time.perf_counter()
+    opened = [get_engine().connect() for _ in range(connections)]
+    for conn in opened:
+        conn.close()
+    logger.info(f"Warmed up {connections} database connections in {time.perf_counter() - started:.2f}s")
+
+
+def _pool_samples():
+    # Read through SessionLocal so a rebound sessionmaker (benchmarks) is reported
+    bind = SessionLocal.kw.get("bind")
+    pool = getattr(bind, "pool", None)
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [({"state": "checked_out"}, pool.checkedout()), ({"state": "idle"}, pool.checkedin())]
+
+
+metrics.gauge("db_pool_connections", "Database pool connections by state", _pool_samples)
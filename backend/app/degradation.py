@@ -0,0 +1,172 @@
+"""
+Latency-aware degradation for guide generation.
+
+The controller keeps a rolling window of LLM call latencies on each task's
+routed model (see model_routing). Before each guide it picks a plan. While the p95 of first guide calls
+stays under LLM_LATENCY_SLO_SECONDS, the plan is the full pipeline. As the
+p95 climbs past the DEGRADATION_STEP_RATIOS multiples of the SLO, it steps
+down to cheaper strategies:
+
+- reduced: one top-up iteration at most, smaller `max_tokens`
+- fast_model: as reduced, with every call on LLM_FAST_MODEL
+- draft: no LLM call, the rule-based draft engine
+
+The request's deadline can force a cheaper plan on its own. If the p95 of
+first calls does not fit in the deadline, the guide is drafted. If a top-up
+would not fit, top-ups are skipped. A guide whose top-ups run out of budget
+mid-way is returned short, with `remaining_deficit`. Plans that are not `full`, and guides
+that fell back to the draft engine after an LLM error, report `degraded` in
+the response metadata.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+from .llm_ledger import percentile
+from .metrics import metrics
+from .model_routing import CALL_TYPE_TASKS, model_router
+
+# strategy -> (use fast model, max_tokens first call, max_tokens top-up, max top-up iterations)
+STRATEGIES: Dict[str, Tuple[bool, int, int, int]] = {
+    "full": (False, 6000, 4000, 3),
+    "reduced": (False, 5000, 3000, 1),
+    "fast_model": (True, 5000, 3000, 1),
+}
+LEVELS = ["full", "reduced", "fast_model", "draft"]
+
+
+class GenerationPlan:
+    """How one guide should be generated; also collects why it was degraded."""
+
+    def __init__(
+        self,
+        strategy: str = "full",
+        deadline_seconds: Optional[float] = None,
+        reasons: Optional[List[str]] = None,
+        p95_seconds: Optional[float] = None
+    ):
+        self.strategy = strategy
+        self.reasons = list(reasons or [])
+        self.p95_seconds = p95_seconds
+        self.deadline_seconds = deadline_seconds or settings.GUIDE_DEADLINE_SECONDS
+        self.deadline_at = time.monotonic() + self.deadline_seconds
+        fast, self.max_tokens_first, self.max_tokens_top_up, self.max_iterations = STRATEGIES.get(strategy, STRATEGIES["full"])
+        self.model = settings.LLM_FAST_MODEL if fast else model_router.model_for("guide")
+        self.top_up_model = settings.LLM_FAST_MODEL if fast else model_router.model_for("top_up")
+
+    @property
+    def draft(self) -> bool:
+        return self.strategy == "draft"
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.reasons)
+
+    def remaining(self) -> float:
+        return self.deadline_at - time.monotonic()
+
+    def mark(self, reason: str) -> None:
+        """Record a degradation that kept the strategy (e.g. top-ups cut short by the deadline)."""
+        self.reasons.append(reason)
+        metrics.inc("guide_degraded_total", {"strategy": self.strategy, "reason": reason})
+
+    def restart(self, shared_seconds: float) -> None:
+        """Restart the deadline now, less the time of a call shared with other guides (packed batches)."""
+        self.deadline_at = time.monotonic() + self.deadline_seconds - shared_seconds
+
+    def fall_back(self, reason: str) -> None:
+        """Record that the guide came from the draft engine after all (e.g. an LLM error)."""
+        self.strategy = "draft"
+        self.reasons.append(reason)
+        metrics.inc("guide_degraded_total", {"strategy": "draft", "reason": reason})
+
+    def metadata(self) -> Dict[str, Any]:
+        """Fields for the response metadata."""
+        if not self.degraded:
+            return {"degraded": False}
+        return {
+            "degraded": True,
+            "degradation": {
+                "strategy": self.strategy,
+                "reasons": self.reasons,
+                "llm_p95_seconds": round(self.p95_seconds, 2) if self.p95_seconds is not None else None
+            }
+        }
+
+
+class DegradationController:
+    def __init__(self):
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}  # call_type -> (monotonic time, seconds)
+        self._lock = threading.Lock()
+
+    def observe(self, call_type: str, model: str, seconds: float) -> None:
+        """Record an LLM call. Only calls on the task's routed model count toward the SLO."""
+        if model != model_router.model_for(CALL_TYPE_TASKS.get(call_type, call_type)):
+            return
+        with self._lock:
+            self._samples.setdefault(call_type, deque(maxlen=1000)).append((time.monotonic(), seconds))
+
+    def p95(self, call_type: str = "first") -> Optional[float]:
+        """p95 latency over the window, or None with too few recent samples."""
+        cutoff = time.monotonic() - settings.LLM_LATENCY_WINDOW_SECONDS
+        with self._lock:
+            samples = self._samples.get(call_type, deque())
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            values = [seconds for _, seconds in samples]
+        if len(values) < settings.DEGRADATION_MIN_SAMPLES:
+            return None
+        return percentile(values, 95)
+
+    def level(self) -> int:
+        p95 = self.p95()
+        if p95 is None:
+            return 0
+        ratio = p95 / settings.LLM_LATENCY_SLO_SECONDS
+        return sum(1 for step in settings.DEGRADATION_STEP_RATIOS if ratio > step)
+
+    def plan(self, deadline_seconds: Optional[float] = None, mode: str = "llm") -> GenerationPlan:
+        """Pick the generation strategy for a guide that must finish within `deadline_seconds`."""
+        if not settings.DEGRADATION_ENABLED or mode != "llm":
+            return GenerationPlan(deadline_seconds=deadline_seconds)
+
+        p95_first, p95_top_up = self.p95("first"), self.p95("top_up")
+        level = min(self.level(), len(LEVELS) - 1)
+        reasons = ["llm_latency_slo"] if level else []
+        plan = GenerationPlan(LEVELS[level], deadline_seconds, reasons, p95_first)
+
+        if not plan.draft and p95_first is not None and p95_first > plan.deadline_seconds:
+            plan = GenerationPlan("draft", deadline_seconds, plan.reasons + ["deadline"], p95_first)
+        elif plan.max_iterations and p95_first is not None and p95_top_up is not None and p95_first + p95_top_up > plan.deadline_seconds:
+            plan.max_iterations = 0
+            plan.reasons.append("deadline_no_top_up")
+
+        for reason in plan.reasons:
+            metrics.inc("guide_degraded_total", {"strategy": plan.strategy, "reason": reason})
+        return plan
+
+
+# Create singleton instance
+degradation = DegradationController()
+
+metrics.describe("guide_degraded_total", "Guides generated with a degraded strategy, by strategy and reason")
+
+
+def _latency_samples():
+    samples = []
+    for call_type in ("first", "top_up"):
+        p95 = degradation.p95(call_type)
+        if p95 is not None:
+            samples.append(({"call_type": call_type}, p95))
+    return samples
+
+
+metrics.gauge("llm_latency_p95_seconds", "Rolling p95 LLM latency on the routed model, by call type", _latency_samples)
+metrics.gauge(
+    "guide_degradation_level",
+    "Current degradation level (0 full, 1 reduced, 2 fast_model, 3 draft)",
+    lambda: [({}, min(degradation.level(), len(LEVELS) - 1))]
+)
@@ -0,0 +1,380 @@
+"""
+Deterministic rule-based guide engine.
+
+Builds an agentic guide with the same shape as the LLM output, using only the
+skill classification. Questions come from templates keyed by skill family
+and gap severity. The reasoning cites the candidate's evaluation evidence,
+and the guide always has exactly `num_questions` questions. It makes no network
+calls and takes milliseconds. It serves `mode=draft` requests and is the
+fallback when the LLM is unavailable.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keyword -> skill family; the first family with a keyword in the skill name wins
+SKILL_FAMILIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("customer", ("customer", "client", "service", "sales", "negotiat", "empathy", "patient")),
+    ("communication", ("communicat", "listening", "presentation", "writing", "verbal", "clarity", "english", "pronunciation")),
+    ("collaboration", ("team", "collaborat", "stakeholder", "relationship", "interpersonal")),
+    ("leadership", ("leader", "manag", "ownership", "coaching", "mentor", "influenc", "decision")),
+    ("problem_solving", ("problem", "analytic", "critical", "troubleshoot", "reasoning", "judgement", "judgment")),
+    ("adaptability", ("adapt", "resilien", "flexib", "time", "priorit", "organi", "stress", "learning")),
+    ("technical", ("technical", "coding", "data", "software", "system", "tool", "product", "domain")),
+    ("behavioural", ("behavioural", "behavioral")),
+]
+
+# Skill of the questions that fill a guide for a candidate with no gaps and no verified skills
+GENERAL_SKILL = "General Behavioural"
+
+# Situations to ask about, per family ("... a time when you {situation}")
+SITUATIONS: Dict[str, List[str]] = {
+    "customer": [
+        "handled a customer who was upset with your organization",
+        "had to say no to a customer while keeping the relationship",
+        "had to understand what a customer really needed beyond what they asked for",
+    ],
+    "communication": [
+        "had to explain something complex to someone without your background",
+        "had to deliver difficult news or feedback",
+        "realized that your message had been misunderstood",
+    ],
+    "collaboration": [
+        "had to align people with conflicting priorities",
+        "worked with a difficult colleague to deliver a shared goal",
+        "needed another team's help to get your work done",
+    ],
+    "leadership": [
+        "had to get others to commit to a direction they initially disagreed with",
+        "took ownership of work that was going badly",
+        "had to make a call that others depended on, without all the information",
+    ],
+    "problem_solving": [
+        "faced a problem with no obvious solution",
+        "had to find the root cause of an issue that kept coming back",
+        "had to choose between several imperfect options",
+    ],
+    "adaptability": [
+        "had your priorities change suddenly",
+        "had to deliver under significant time pressure",
+        "received critical feedback you did not expect",
+    ],
+    "technical": [
+        "had to learn an unfamiliar tool or system quickly",
+        "found a mistake in your own work after it had been delivered",
+        "had to trade off quality against a deadline",
+    ],
+    "behavioural": [
+        "achieved something at work that you are proud of",
+        "had to recover from a setback",
+        "had to juggle several responsibilities at once",
+    ],
+    "general": [
+        "had to apply {skill} to a real problem",
+        "felt {skill} made the difference to an outcome",
+        "struggled with {skill} and had to improve",
+    ],
+}
+
+# Added to a question once every situation/frame pair of its skill is used, so repeats stay distinct
+NEW_EXAMPLE_PROMPTS = [
+    "Choose a different example from the ones you have already given.",
+    "This time, pick an example from an earlier role or project.",
+    "This time, pick an example where the outcome was not what you hoped for.",
+    "This time, pick an example where you worked with people you did not know well.",
+    "This time, pick the most recent example you can think of.",
+    "This time, pick the example where the stakes were highest.",
+]
+
+# Question framing per severity; the weaker the score, the more the question probes fundamentals
+FRAMES: Dict[str, List[str]] = {
+    "significant": [
+        "Walk me through, step by step, a specific time when you {situation}. What did you do first, and why?",
+        "Tell me about a time when you {situation} and it did not go well. What happened, and what did you learn?",
+        "Think of the last time you {situation}. What exactly did you say and do?",
+    ],
+    "moderate": [
+        "Tell me about a time when you {situation}. What approach did you take, and what was the outcome?",
+        "Describe a situation where you {situation}. What options did you consider?",
+        "Give me an example of when you {situation}. How did you know whether it worked?",
+    ],
+    "minor": [
+        "Describe the most challenging time you {situation}. What would you do differently now?",
+        "Tell me about a time when you {situation} under pressure. How did you adjust your approach?",
+        "Give me an example of when you {situation} and helped others do the same.",
+    ],
+    "not_tested": [
+        "Describe a recent situation where you {situation}. What was your role, and what was the result?",
+        "Tell me about a time when you {situation}. What did you do, and how did it turn out?",
+        "Give me an example of when you {situation}. What would you change if it happened again?",
+    ],
+}
+
+LISTEN_FOR: Dict[str, List[str]] = {
+    "customer": ["Acknowledges the customer's perspective before solving", "Concrete steps taken to resolve the issue", "Follows up to confirm the outcome"],
+    "communication": ["Adapts the message to the audience", "Checks for understanding", "Clear, structured account of the situation"],
+    "collaboration": ["Seeks to understand others' priorities", "Shares credit and responsibility", "Concrete actions to build agreement"],
+    "leadership": ["Takes personal ownership of the outcome", "Explains the reasoning behind decisions", "Brings others along rather than directing"],
+    "problem_solving": ["Breaks the problem into parts", "Uses evidence to test assumptions", "Weighs trade-offs explicitly"],
+    "adaptability": ["Re-prioritizes deliberately rather than reacting", "Stays composed under pressure", "Turns feedback into specific changes"],
+    "technical": ["Structured approach to learning or fixing", "Owns mistakes openly", "Understands the impact of trade-offs"],
+    "behavioural": ["Specific, detailed example with context", "Reflects honestly on what went well and what did not", "Shows what motivates them"],
+    "general": ["Specific, detailed example with context", "Clear actions the candidate took personally", "Measurable outcome or result"],
+}
+
+RED_FLAGS: Dict[str, List[str]] = {
+    "customer": ["Blames the customer", "Resolves by escalating everything", "No follow-through"],
+    "communication": ["Rambling or unstructured answer", "Assumes the listener understood", "Avoids difficult conversations"],
+    "collaboration": ["Describes only their own contribution", "Dismissive of colleagues", "Avoids conflict entirely"],
+    "leadership": ["Defers every decision to others", "Takes credit for team outcomes", "Cannot describe their own reasoning"],
+    "problem_solving": ["Jumps to a solution without diagnosis", "Cannot explain why the solution worked", "Relies on others to solve it"],
+    "adaptability": ["Becomes defensive about feedback", "Describes being overwhelmed without a plan", "Resists change"],
+    "technical": ["Hides or minimizes mistakes", "Vague about what they actually did", "Ignores quality entirely"],
+    "behavioural": ["Cannot name a concrete example", "Blames others for setbacks", "Describes only the team's work, never their own"],
+    "general": ["Vague or hypothetical answers", "Blaming others for failures", "Cannot articulate specific actions taken"],
+}
+
+FOLLOW_UPS: Dict[str, List[str]] = {
+    "significant": ["What would you do differently now?", "Who did you go to for help?", "How have you practised this since?"],
+    "moderate": ["What was the outcome?", "How did you measure success?", "What did you learn from it?"],
+    "minor": ["How would you coach someone else through this?", "What made this harder than usual?"],
+    "not_tested": ["How did you develop this skill?", "What challenges did you face?"],
+}
+
+TIME_ESTIMATES = {"significant": "5-6 minutes", "moderate": "4-5 minutes", "minor": "3-4 minutes", "not_tested": "4-5 minutes"}
+_MINUTES = {"5-6 minutes": 5.5, "4-5 minutes": 4.5, "3-4 minutes": 3.5}  # Midpoint of each estimate
+
+_PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+_SEVERITY_RANK = {"critical": 0, "significant": 0, "moderate": 1, "minor": 2}
+
+
+def skill_family(skill_name: str) -> str:
+    name = (skill_name or "").lower()
+    for family, keywords in SKILL_FAMILIES:
+        if any(keyword in name for keyword in keywords):
+            return family
+    return "general"
+
+
+def _severity(gap: Dict[str, Any]) -> str:
+    severity = gap.get("gap_severity", "moderate")
+    return "significant" if severity == "critical" else severity if severity in FRAMES else "moderate"
+
+
+def _clip(text: Optional[str], limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class DraftEngine:
+    def generate(
+        self,
+        candidate_name: str,
+        verified_skills: List[Dict[str, Any]],
+        skill_gaps: List[Dict[str, Any]],
+        skills_not_tested: List[Dict[str, Any]],
+        num_questions: int,
+        role: Optional[str] = None,
+        scenario_type: Optional[str] = None
+    ) -> dict:
+        """
+        Build a guide with exactly `num_questions` questions: every gap gets one,
+        then every untested skill, then further gap questions round-robin in
+        priority/severity order. A candidate without gaps gets the rest as
+        stretch questions on the verified skills, or as general behavioural
+        questions when nothing was verified either; these are listed under
+        `skill_gaps` with low priority, like LLM top-up questions.
+        """
+        gaps = sorted(skill_gaps, key=lambda g: (
+            _PRIORITY_RANK.get(g.get("priority"), 1), _SEVERITY_RANK.get(g.get("gap_severity"), 1), g.get("current_score") or 0
+        ))
+        not_tested = sorted(skills_not_tested, key=lambda s: _PRIORITY_RANK.get(s.get("priority"), 1))
+        gap_counts, untested_count = self._allocate(len(gaps), len(not_tested), num_questions)
+
+        gaps_section = [self._gap_entry(gap, count, role) for gap, count in zip(gaps, gap_counts) if count]
+        stretch = verified_skills or [{"skill_name": GENERAL_SKILL}]
+        stretch_counts, _ = self._allocate(len(stretch), 0, num_questions - sum(gap_counts) - untested_count)
+        gaps_section += [self._stretch_entry(skill, count, role) for skill, count in zip(stretch, stretch_counts) if count]
+        not_tested_section = [self._not_tested_entry(skill, role) for skill in not_tested[:untested_count]]
+        verified_section = [
+            {
+                "skill_name": skill.get("skill_name", "Unknown Skill"),
+                "score": skill.get("score", 4),
+                "acknowledgment": f"Scored {skill.get('score', 4)}/5 in the simulation" + (
+                    f" ({_clip(skill.get('evidence'), 120)})" if skill.get("evidence") else ""
+                ) + ". Acknowledge briefly, no further probing needed.",
+                "time_estimate": "1 minute"
+            }
+            for skill in verified_skills
+        ]
+
+        guide = {
+            "executive_summary": self._summary(candidate_name, role, verified_skills, gaps, not_tested),
+            "interview_duration_estimate": self._duration(gaps_section, not_tested_section, verified_section),
+            "sections": {
+                "verified_skills": verified_section,
+                "skill_gaps": gaps_section,
+                "skills_not_tested": not_tested_section
+            },
+            "overall_red_flags": [
+                f"{gap.get('skill_name')} scored {gap.get('current_score')}/5 ({_severity(gap)} gap)"
+                for gap in gaps[:3]
+            ] or ["Limited simulation data - verify depth of practical experience"],
+            "overall_strengths": [
+                f"{skill.get('skill_name')} ({skill.get('score')}/5)" for skill in verified_skills[:3]
+            ] or ["Completed the simulation assessment"],
+            "interview_tips": self._tips(gaps, not_tested, verified_skills)
+        }
+        return guide
+
+    def _allocate(self, gap_total: int, untested_total: int, num_questions: int) -> Tuple[List[int], int]:
+        gap_counts = [0] * gap_total
+        remaining = num_questions
+        for i in range(min(gap_total, remaining)):
+            gap_counts[i] = 1
+        remaining -= sum(gap_counts)
+        untested_count = min(untested_total, remaining)
+        remaining -= untested_count
+        i = 0
+        while remaining > 0 and gap_total:
+            gap_counts[i % gap_total] += 1
+            remaining -= 1
+            i += 1
+        return gap_counts, untested_count
+
+    def _question(self, skill_name: str, severity: str, n: int, evidence: Optional[str] = None) -> Dict[str, Any]:
+        family = skill_family(skill_name)
+        situations = SITUATIONS[family]
+        frames = FRAMES[severity]
+        # Walk situations first, then frames, so consecutive questions differ in topic
+        situation = situations[n % len(situations)].format(skill=skill_name)
+        frame = frames[(n // len(situations)) % len(frames)]
+        listen_for = list(LISTEN_FOR[family])
+        question = frame.format(situation=situation)
+        repeat = n // (len(situations) * len(frames))
+        if repeat:
+            question += " " + NEW_EXAMPLE_PROMPTS[(repeat - 1) % len(NEW_EXAMPLE_PROMPTS)]
+        if evidence:
+            listen_for.append(f"Addresses the simulation gap: {_clip(evidence, 100)}")
+        return {
+            "question": question,
+            "what_to_listen_for": listen_for,
+            "red_flags": list(RED_FLAGS[family]),
+            "follow_ups": list(FOLLOW_UPS[severity]),
+            "time_estimate": TIME_ESTIMATES[severity]
+        }
+
+    def _gap_entry(self, gap: Dict[str, Any], count: int, role: Optional[str]) -> Dict[str, Any]:
+        skill_name = gap.get("skill_name", "Unknown Skill")
+        severity = _severity(gap)
+        priority = gap.get("priority", "medium")
+        evidence = gap.get("evidence")
+        snippet = gap.get("transcript_snippet")
+        cited = _clip(evidence, 150) or "No evaluator comment recorded"
+        if snippet:
+            cited += f' Transcript: "{_clip(snippet, 100)}"'
+        return {
+            "skill_name": skill_name,
+            "current_score": gap.get("current_score", 0),
+            "priority": priority,
+            "reasoning": {
+                "data_observation": f"Scored {gap.get('current_score', 'N/A')}/5 against a required {gap.get('required_score', 4)}/5 ({severity} gap)",
+                "evidence_from_evaluation": cited,
+                "gap_significance": f"{priority.title()} priority skill{f' for the {role} role' if role else ''}",
+                "interview_strategy": {
+                    "significant": "Probe fundamentals with step-by-step behavioral questions",
+                    "moderate": "Behavioral questions to test whether the simulation result reflects real experience",
+                    "minor": "Stretch questions to confirm the skill holds up under pressure"
+                }[severity],
+                "question_rationale": f"STAR questions on common {skill_family(skill_name).replace('_', ' ')} situations reveal actual experience depth"
+            },
+            "questions": [self._question(skill_name, severity, n, evidence if n == 0 else None) for n in range(count)]
+        }
+
+    def _stretch_entry(self, skill: Dict[str, Any], count: int, role: Optional[str]) -> Dict[str, Any]:
+        skill_name = skill.get("skill_name", "Unknown Skill")
+        for_role = f" for the {role} role" if role else ""
+        severity = "minor"
+        if skill_name == GENERAL_SKILL:
+            severity = "moderate"
+            observation = "No skill gaps or verified skills to build on"
+            cited = "No skill-level simulation results available"
+        else:
+            observation = f"Verified at {skill.get('score', 4)}/5 in the simulation; no gaps to probe"
+            cited = _clip(skill.get("evidence"), 150) or "No evaluator comment recorded"
+        return {
+            "skill_name": skill_name,
+            "current_score": skill.get("score", 0),
+            "priority": "low",
+            "reasoning": {
+                "data_observation": observation,
+                "evidence_from_evaluation": cited,
+                "gap_significance": f"Confirms the candidate's overall fit{for_role}",
+                "interview_strategy": "Stretch questions to confirm the skill holds up under pressure" if severity == "minor" else "Broad behavioral questions to establish experience",
+                "question_rationale": "Real examples show whether the simulation result carries over to day-to-day work"
+            },
+            "questions": [self._question(skill_name, severity, n) for n in range(count)]
+        }
+
+    def _not_tested_entry(self, skill: Dict[str, Any], role: Optional[str]) -> Dict[str, Any]:
+        skill_name = skill.get("skill_name", "Unknown Skill")
+        return {
+            "skill_name": skill_name,
+            "priority": skill.get("priority", "medium"),
+            "reasoning": {
+                "note": skill.get("reason") or "This skill was not evaluated in the simulation",
+                "relevance_to_role": f"Required{f' for the {role} role' if role else ''} by the job description",
+                "question_strategy": "Baseline behavioral question to establish experience level"
+            },
+            "question": self._question(skill_name, "not_tested", 0)
+        }
+
+    def _summary(
+        self,
+        candidate_name: str,
+        role: Optional[str],
+        verified_skills: List[Dict[str, Any]],
+        gaps: List[Dict[str, Any]],
+        not_tested: List[Dict[str, Any]]
+    ) -> str:
+        parts = [f"{candidate_name} was assessed{f' for {role}' if role else ''} in the simulation."]
+        if verified_skills:
+            parts.append(f"Verified: {', '.join(s.get('skill_name', '') for s in verified_skills[:4])}.")
+        if gaps:
+            parts.append("Gaps to explore: " + ", ".join(
+                f"{g.get('skill_name')} ({g.get('current_score')}/5)" for g in gaps[:4]
+            ) + ".")
+        if not_tested:
+            parts.append(f"Not tested: {', '.join(s.get('skill_name', '') for s in not_tested[:4])}.")
+        if gaps:
+            parts.append("Focus the interview on the gaps, in the order below.")
+        elif verified_skills:
+            parts.append("No gaps were found; the questions below confirm the candidate's strengths.")
+        else:
+            parts.append("No skill results to build on; the questions below establish general experience.")
+        return " ".join(parts)
+
+    def _duration(self, gaps_section: List[Dict], not_tested_section: List[Dict], verified_section: List[Dict]) -> str:
+        questions = [q for gap in gaps_section for q in gap["questions"]] + [s["question"] for s in not_tested_section]
+        minutes = len(verified_section) + sum(_MINUTES[q["time_estimate"]] for q in questions)
+        low = max(5, int(minutes // 5 * 5))
+        return f"{low}-{low + 10} minutes"
+
+    def _tips(
+        self,
+        gaps: List[Dict[str, Any]],
+        not_tested: List[Dict[str, Any]],
+        verified_skills: List[Dict[str, Any]]
+    ) -> List[str]:
+        tips = []
+        if verified_skills:
+            tips.append("Start with verified skills to build rapport before probing gaps")
+        if any(_severity(g) == "significant" for g in gaps):
+            tips.append("Allow extra time on significant gaps and ask for a second example if the first is vague")
+        if not_tested:
+            tips.append("Untested skills have no simulation baseline - listen for concrete past examples")
+        tips.append("Take notes on specific examples provided for reference checks")
+        return tips
+
+
+# Create singleton instance
+draft_engine = DraftEngine()
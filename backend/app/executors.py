@@ -0,0 +1,120 @@
+"""
+Thread pools per workload class.
+
+- request: AnyIO's default threadpool. FastAPI runs sync routes (campaign
+  listings, session detail and other DB-only endpoints) and sync
+  dependencies such as `get_db` on it. Sized by REQUEST_THREADPOOL_SIZE at
+  startup.
+- llm: generation handlers. They block for seconds to minutes on LLM calls,
+  so they get their own executor (LLM_EXECUTOR_WORKERS). A burst of
+  generations then cannot occupy the request threads.
+
+Background job workers are separate processes (JOB_WORKER_PROCESSES).
+Utilization of every pool is exported as gauges on /metrics.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import anyio.to_thread
+
+from .config import settings
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+class WorkloadExecutor:
+    """ThreadPoolExecutor that tracks busy threads and queued tasks."""
+
+    def __init__(self, name: str, max_workers: Callable[[], int]):
+        """`max_workers` returns the pool size; it is read when the first task is submitted."""
+        self.name = name
+        self._max_workers = max_workers
+        self.busy = 0
+        self.queued = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def max_workers(self) -> int:
+        return self._executor._max_workers if self._executor is not None else self._max_workers()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers(), thread_name_prefix=self.name)
+            return self._executor
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Schedule `fn(*args, **kwargs)` with the caller's context variables (timing, ledger)."""
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+
+        def call() -> T:
+            with self._lock:
+                self.queued -= 1
+                self.busy += 1
+            metrics.observe("executor_queue_wait_seconds", time.perf_counter() - submitted, {"pool": self.name})
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.busy -= 1
+
+        return self._pool().submit(call)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Await `fn(*args, **kwargs)` on this pool."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def utilization(self) -> Dict[str, int]:
+        threads = self.max_workers
+        with self._lock:
+            return {"threads": threads, "busy": self.busy, "queued": self.queued}
+
+
+class _RequestThreadpool:
+    """AnyIO's default limiter, captured from the event loop at startup."""
+
+    def __init__(self):
+        self._limiter: Optional[Any] = None
+
+    def configure(self) -> None:
+        """Size the default limiter; call from the running event loop (app lifespan)."""
+        self._limiter = anyio.to_thread.current_default_thread_limiter()
+        self._limiter.total_tokens = settings.REQUEST_THREADPOOL_SIZE
+
+    def utilization(self) -> Optional[Dict[str, int]]:
+        if self._limiter is None:
+            return None
+        return {
+            "threads": int(self._limiter.total_tokens),
+            "busy": self._limiter.borrowed_tokens,
+            "queued": self._limiter.statistics().tasks_waiting
+        }
+
+
+def _pool_samples(field: str):
+    def collect():
+        pools = {executor.name: executor.utilization() for executor in (llm_executor,)}
+        pools["request"] = request_threadpool.utilization()
+        return [({"pool": name}, stats[field]) for name, stats in pools.items() if stats is not None]
+    return collect
+
+
+# Create singleton instances
+llm_executor = WorkloadExecutor("llm", lambda: settings.LLM_EXECUTOR_WORKERS)
+request_threadpool = _RequestThreadpool()
+
+metrics.describe("executor_queue_wait_seconds", "Time tasks waited for a free thread in a workload executor")
+metrics.gauge("executor_threads", "Thread capacity of each workload pool", _pool_samples("threads"))
+metrics.gauge("executor_busy_threads", "Threads currently running work in each workload pool", _pool_samples("busy"))
+metrics.gauge("executor_queued_tasks", "Tasks waiting for a thread in each workload pool", _pool_samples("queued"))
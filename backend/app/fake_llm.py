@@ -0,0 +1,210 @@
+"""
+Deterministic stand-in for the OpenAI client, used by benchmarks and local
+runs without an API key (LLM_PROVIDER=fake).
+
+It answers each prompt the service sends (agentic guide, packed guides,
+top-up, legacy guide, question regeneration) with JSON that matches the response schema
+and has the requested size, after an injectable latency. `shortfall` makes the first guide call return
+fewer questions than asked so the top-up loop is exercised too.
+"""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import compact_format
+from .config import settings
+
+_PACKED_COUNTS = re.compile(r"session_id `([^`]+)`: generate EXACTLY (\d+) questions total")
+_AGENTIC_COUNT = re.compile(r"Generate EXACTLY (\d+) questions total")
+_TOP_UP_COUNT = re.compile(r"Generate EXACTLY (\d+) NEW interview questions")
+_LEGACY_COUNT = re.compile(r"Generate exactly (\d+) targeted interview questions")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def _question(skill: str, n: int) -> Dict[str, Any]:
+    return {
+        "question": f"Tell me about a time you had to demonstrate {skill} under pressure (scenario {n}).",
+        "what_to_listen_for": [f"Concrete example of {skill}", "Clear ownership of actions", "Measurable outcome"],
+        "red_flags": ["Vague or hypothetical answer", "Blames others"],
+        "follow_ups": ["What would you do differently?", "How did you measure success?"],
+        "time_estimate": "4-5 minutes"
+    }
+
+
+def _reasoning(skill: str) -> Dict[str, str]:
+    return {
+        "data_observation": f"The simulation showed inconsistent {skill} across scenarios.",
+        "evidence_from_evaluation": f"Evaluator noted missed opportunities to apply {skill}.",
+        "gap_significance": f"{skill} is used daily in this role.",
+        "interview_strategy": "Behavioral questions using the STAR method",
+        "question_rationale": f"Asks for real past behaviour to separate {skill} ability from simulation nerves."
+    }
+
+
+def _wants_compact(messages: List[Dict[str, str]], response_format: Optional[Dict[str, Any]]) -> bool:
+    """Whether the request asked for the compact wire format (schema in response_format or the system message)."""
+    name = ((response_format or {}).get("json_schema") or {}).get("name", "")
+    return name.endswith("Compact") or "Compact):" in messages[0]["content"]
+
+
+def _conform(data: Any, schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Drop the keys a (e.g. profile-trimmed) response schema leaves out, as the real model would."""
+    if "$ref" in schema:
+        schema = defs[schema["$ref"].rsplit("/", 1)[-1]]
+    if isinstance(data, dict) and "properties" in schema:
+        return {key: _conform(value, schema["properties"][key], defs) for key, value in data.items() if key in schema["properties"]}
+    if isinstance(data, list) and "items" in schema:
+        return [_conform(item, schema["items"], defs) for item in data]
+    return data
+
+
+class _Stream:
+    """Iterable of chunk objects with a closable `response`, like openai.Stream."""
+
+    def __init__(self, content: str, usage: SimpleNamespace, chunk_size: int = 40):
+        self._content = content
+        self._usage = usage
+        self._chunk_size = chunk_size
+        self._closed = threading.Event()
+        self.response = SimpleNamespace(close=self._closed.set)
+
+    def __iter__(self) -> Iterator[SimpleNamespace]:
+        for start in range(0, len(self._content), self._chunk_size):
+            if self._closed.is_set():
+                raise ConnectionError("stream closed")
+            delta = SimpleNamespace(content=self._content[start:start + self._chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, index=0, finish_reason=None)], usage=None)
+        yield SimpleNamespace(choices=[], usage=self._usage)
+
+
+class _FakeCompletions:
+    def __init__(self, client: "FakeLLMClient"):
+        self._client = client
+
+    def create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, timeout: Optional[float] = None, **kwargs: Any):
+        prompt = messages[-1]["content"]
+        response = self._client.respond(prompt)
+        if _wants_compact(messages, kwargs.get("response_format")):
+            response = compact_format.compact(response)
+        schema = ((kwargs.get("response_format") or {}).get("json_schema") or {}).get("schema")
+        if schema:
+            response = _conform(response, schema, schema.get("$defs", {}))
+        content = json.dumps(response)
+        usage = SimpleNamespace(
+            prompt_tokens=sum(_estimate_tokens(m["content"]) for m in messages),
+            completion_tokens=_estimate_tokens(content)
+        )
+        self._client.calls += 1
+        latency = self._client.latency_for(content)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"fake LLM call exceeded timeout of {timeout}s")
+        time.sleep(latency)
+        if stream:
+            return _Stream(content, usage)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, index=0, finish_reason="stop")],
+            usage=usage,
+            model=model
+        )
+
+
+class FakeLLMClient:
+    def __init__(self, latency_ms: float = 0.0, ms_per_1k_chars: float = 0.0, shortfall: int = 0):
+        self.latency_ms = latency_ms
+        self.ms_per_1k_chars = ms_per_1k_chars
+        self.shortfall = shortfall
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    def latency_for(self, content: str) -> float:
+        return (self.latency_ms + self.ms_per_1k_chars * len(content) / 1000) / 1000
+
+    def respond(self, prompt: str) -> Dict[str, Any]:
+        packed = _PACKED_COUNTS.findall(prompt)
+        if packed:
+            return {
+                "guides": [
+                    {"session_id": session_id, "guide": self._agentic_guide(max(int(count) - self.shortfall, 1))}
+                    for session_id, count in packed
+                ]
+            }
+        match = _TOP_UP_COUNT.search(prompt)
+        if match:
+            return self._top_up(int(match.group(1)))
+        match = _AGENTIC_COUNT.search(prompt)
+        if match:
+            return self._agentic_guide(max(int(match.group(1)) - self.shortfall, 1))
+        match = _LEGACY_COUNT.search(prompt)
+        if match:
+            return self._legacy_guide(int(match.group(1)))
+        if "Regenerate the following interview question" in prompt:
+            return {**_question("the target skill", 1), "follow_ups": ["Why?", "What next?"]}
+        return {}
+
+    def _agentic_guide(self, count: int) -> Dict[str, Any]:
+        skills = ["Communication", "Problem Solving", "Stakeholder Management"]
+        gaps = []
+        for i, skill in enumerate(skills):
+            questions = [_question(skill, n) for n in range(i, count, len(skills))]
+            if questions:
+                gaps.append({
+                    "skill_name": skill,
+                    "current_score": 2,
+                    "priority": "high",
+                    "reasoning": _reasoning(skill),
+                    "questions": questions
+                })
+        return {
+            "executive_summary": "Solid foundation with gaps in structured communication.",
+            "interview_duration_estimate": "30-45 minutes",
+            "sections": {"verified_skills": [], "skill_gaps": gaps, "skills_not_tested": []},
+            "overall_red_flags": ["Inconsistent follow-through"],
+            "overall_strengths": ["Empathetic tone"],
+            "interview_tips": ["Ask for concrete examples"]
+        }
+
+    def _top_up(self, count: int) -> Dict[str, Any]:
+        return {
+            "additional_questions": [
+                {
+                    "skill_name": "Problem Solving",
+                    "priority": "medium",
+                    "reasoning": _reasoning("Problem Solving"),
+                    "question": _question("Problem Solving", 100 + n)
+                }
+                for n in range(count)
+            ]
+        }
+
+    def _legacy_guide(self, count: int) -> Dict[str, Any]:
+        return {
+            "summary": "Candidate shows promise with gaps to probe.",
+            "strengths": ["Empathy", "Clarity", "Persistence"],
+            "red_flags": ["Rushed answers", "Limited detail", "Avoids conflict"],
+            "questions": [
+                {
+                    **_question("Communication", n),
+                    "skill_targeted": "Communication",
+                    "difficulty": "medium",
+                    "follow_up_questions": ["What happened next?", "Who else was involved?"]
+                }
+                for n in range(count)
+            ]
+        }
+
+
+def create_fake_client() -> FakeLLMClient:
+    return FakeLLMClient(
+        latency_ms=settings.FAKE_LLM_LATENCY_MS,
+        ms_per_1k_chars=settings.FAKE_LLM_MS_PER_1K_CHARS,
+        shortfall=settings.FAKE_LLM_SHORTFALL
+    )
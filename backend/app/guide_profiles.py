@@ -0,0 +1,89 @@
+"""
+Generation profiles for agentic guides.
+
+- full: five-field reasoning per gap, red flags, follow-ups, time estimates,
+  verified-skill acknowledgments, overall strengths/red flags and tips
+- standard: short reasoning (evidence and rationale), red flags and
+  follow-ups, overall strengths/red flags; no time estimates or tips
+- fast: questions and what to listen for only, for screening interviews
+
+A profile removes fields from the response schema (matched by property
+name at any depth) and caps `max_tokens`. The parsed response is validated
+against the full output model, whose defaults fill the omitted fields, so
+lighter guides keep the same structure with empty values.
+"""
+
+import copy
+import json
+import re
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+PROFILES = ["full", "standard", "fast"]
+
+_STANDARD_OMITTED = frozenset({
+    "interview_duration_estimate", "interview_tips", "time_estimate",
+    "data_observation", "gap_significance", "interview_strategy",
+    "note", "question_strategy",
+})
+
+# profile -> (omitted fields, max_tokens cap first call, max_tokens cap top-up)
+PROFILE_SETTINGS: Dict[str, Tuple[FrozenSet[str], Optional[int], Optional[int]]] = {
+    "full": (frozenset(), None, None),
+    "standard": (_STANDARD_OMITTED, 4000, 2500),
+    "fast": (_STANDARD_OMITTED | {
+        "reasoning", "red_flags", "follow_ups", "verified_skills",
+        "overall_red_flags", "overall_strengths",
+    }, 2000, 1200),
+}
+
+
+def omitted_fields(profile: str) -> FrozenSet[str]:
+    return PROFILE_SETTINGS.get(profile, PROFILE_SETTINGS["full"])[0]
+
+
+def max_tokens(profile: str, planned: int, call_type: str = "first") -> int:
+    """`planned` (from the generation plan), capped for the profile."""
+    _, cap_first, cap_top_up = PROFILE_SETTINGS.get(profile, PROFILE_SETTINGS["full"])
+    cap = cap_first if call_type == "first" else cap_top_up
+    return min(planned, cap) if cap else planned
+
+
+def prune_schema(schema: Dict[str, Any], omitted: FrozenSet[str]) -> Dict[str, Any]:
+    """Copy of a strict JSON schema without the `omitted` properties."""
+    if not omitted:
+        return schema
+    schema = copy.deepcopy(schema)
+
+    def prune(node: Any) -> None:
+        if isinstance(node, dict):
+            if isinstance(node.get("properties"), dict):
+                node["properties"] = {name: prop for name, prop in node["properties"].items() if name not in omitted}
+                if "required" in node:
+                    node["required"] = [name for name in node["required"] if name not in omitted]
+            for value in node.values():
+                prune(value)
+        elif isinstance(node, list):
+            for item in node:
+                prune(item)
+
+    prune(schema)
+    _drop_unused_defs(schema)
+    return schema
+
+
+def _refs(node: Any) -> set:
+    return set(re.findall(r'"#/\$defs/([^"]+)"', json.dumps(node)))
+
+
+def _drop_unused_defs(schema: Dict[str, Any]) -> None:
+    """Remove $defs no longer referenced (e.g. reasoning models in the fast profile)."""
+    defs = schema.get("$defs")
+    if not defs:
+        return
+    used = _refs({key: value for key, value in schema.items() if key != "$defs"})
+    pending = list(used)
+    while pending:
+        for name in _refs(defs.get(pending.pop(), {})) - used:
+            used.add(name)
+            pending.append(name)
+    schema["$defs"] = {name: definition for name, definition in defs.items() if name in used}
@@ -0,0 +1,143 @@
+"""
+Idempotency-Key support for the expensive POST generation endpoints.
+
+A client that retries a request with the same `Idempotency-Key` header gets
+the original response instead of triggering a second generation: if the
+original is still running the retry waits for it (up to
+IDEMPOTENCY_WAIT_SECONDS, then 409 with `Retry-After`), and if it finished
+within IDEMPOTENCY_TTL_SECONDS its stored response is replayed. Retries wait
+on the event loop, before taking an admission slot, a worker thread or a
+database session, so they cannot crowd out other requests.
+
+Results are kept in process memory, so retries must reach the same web
+worker. Failed requests are not stored; retrying them runs the work again.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .config import settings
+from .metrics import metrics
+
+MAX_KEY_LENGTH = 255
+
+
+class _Entry:
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = asyncio.Event()
+        self.response: Any = None
+        self.stored = False
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        fn: Callable[[], Awaitable[Any]],
+        should_store: Callable[[Any], bool] = lambda response: True
+    ) -> Tuple[Any, bool]:
+        """
+        Await `fn()` at most once per (scope, key) and return (response, replayed).
+
+        `fn` should take the admission slot and worker thread itself, so that
+        a request waiting for another with the same key holds neither. It
+        waits at most IDEMPOTENCY_WAIT_SECONDS, then gets 409 with
+        `Retry-After`. Reusing a key with a different payload is rejected
+        with 422.
+        """
+        if not key:
+            return await fn(), False
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        fingerprint = _fingerprint(payload)
+        while True:
+            entry, owner = self._begin((scope, key), fingerprint)
+            metrics.inc("cache_requests_total", {"cache": "idempotency", "result": "miss" if owner else "hit"})
+            if owner:
+                break
+            metrics.inc("idempotent_requests_total", {"endpoint": scope, "outcome": "waited" if not entry.done.is_set() else "replayed"})
+            try:
+                await asyncio.wait_for(entry.done.wait(), timeout=settings.IDEMPOTENCY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                metrics.inc("idempotent_requests_total", {"endpoint": scope, "outcome": "wait_timeout"})
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress, retry later",
+                    headers={"Retry-After": str(max(int(settings.ADMISSION_DEFAULT_RETRY_AFTER_SECONDS), 1))}
+                )
+            if entry.stored:
+                return entry.response, True
+            # The original failed and released the key: take over
+
+        try:
+            response = await fn()
+        except BaseException:
+            self._release((scope, key), entry)
+            raise
+        if should_store(response):
+            self._store(entry, response)
+        else:
+            self._release((scope, key), entry)
+        return response, False
+
+    def _begin(self, entry_key: Tuple[str, str], fingerprint: str) -> Tuple[_Entry, bool]:
+        self._evict_expired()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                entry = self._entries[entry_key] = _Entry(fingerprint)
+                return entry, True
+        if entry.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+        return entry, False
+
+    def _store(self, entry: _Entry, response: Any) -> None:
+        entry.response = response
+        entry.stored = True
+        entry.expires_at = time.time() + settings.IDEMPOTENCY_TTL_SECONDS
+        entry.done.set()
+
+    def _release(self, entry_key: Tuple[str, str], entry: _Entry) -> None:
+        with self._lock:
+            if self._entries.get(entry_key) is entry:
+                del self._entries[entry_key]
+        entry.done.set()
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            expired = [
+                entry_key for entry_key, entry in self._entries.items()
+                if entry.expires_at is not None and entry.expires_at < now
+            ]
+            for entry_key in expired:
+                del self._entries[entry_key]
+
+
+def _fingerprint(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+# Create singleton instance
+idempotency_store = IdempotencyStore()
+
+metrics.describe("idempotent_requests_total", "Requests answered from an earlier request with the same Idempotency-Key")
@@ -0,0 +1,373 @@
+"""Durable local queue for background guide generation jobs (SQLite)."""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,              -- queued, running, completed, cancelled
+    payload TEXT NOT NULL,             -- AgenticGuideRequest as JSON
+    total_items INTEGER NOT NULL,
+    shards INTEGER,                    -- max concurrently running items (NULL = unlimited)
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS generation_job_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES generation_jobs(id),
+    idx INTEGER NOT NULL,
+    session_id TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,  -- items of one shard run one at a time
+    status TEXT NOT NULL,              -- pending, running, completed, failed, cancelled
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    result TEXT,                       -- per-candidate checkpoint (JSON)
+    error TEXT,
+    started_at REAL,
+    finished_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS ix_job_items_status ON generation_job_items(status, job_id, idx);
+CREATE INDEX IF NOT EXISTS ix_job_items_job ON generation_job_items(job_id, idx);
+CREATE INDEX IF NOT EXISTS ix_job_items_shard ON generation_job_items(job_id, shard, status);
+"""
+
+# Columns added after the first release of the queue schema
+MIGRATIONS = {
+    "generation_jobs": [("shards", "INTEGER")],
+    "generation_job_items": [("shard", "INTEGER NOT NULL DEFAULT 0")],
+}
+
+TERMINAL_ITEM_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobQueue:
+    """
+    Job/item tables shared by the API (submit, poll, cancel) and the worker
+    processes (claim, checkpoint). Each candidate is a separate item, so a
+    restarted worker only redoes items that had not been checkpointed.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._initialized = False
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or settings.JOB_QUEUE_DB_PATH
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode - transactions are opened explicitly where needed
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._migrate(conn)
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        for table, columns in MIGRATIONS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not existing:
+                continue  # table will be created from SCHEMA
+            for name, ddl in columns:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+    # ------------------------------------------------------------------
+    # API side
+    # ------------------------------------------------------------------
+
+    def submit(self, payload: Dict[str, Any], session_ids: List[str], shards: Optional[int] = None) -> str:
+        """
+        Create a job with one pending item per session.
+
+        With `shards`, items are dealt round-robin into that many shards and
+        workers run at most one item per shard at a time, bounding the job's
+        concurrency. Without it every item is its own shard.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO generation_jobs (id, status, payload, total_items, shards, created_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), len(session_ids), shards, now)
+            )
+            conn.executemany(
+                "INSERT INTO generation_job_items (job_id, idx, session_id, shard, status) VALUES (?, ?, ?, ?, 'pending')",
+                [(job_id, idx, session_id, idx % shards if shards else idx) for idx, session_id in enumerate(session_ids)]
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status with per-status item counts and throughput statistics."""
+        with self._connect() as conn:
+            job = conn.execute("SELECT * FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+            if not job:
+                return None
+            counts = {
+                row["status"]: row["n"]
+                for row in conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM generation_job_items WHERE job_id = ? GROUP BY status",
+                    (job_id,)
+                )
+            }
+            timing = conn.execute(
+                "SELECT AVG(finished_at - started_at) AS avg_item_seconds "
+                "FROM generation_job_items WHERE job_id = ? AND status IN ('completed', 'failed') AND started_at IS NOT NULL",
+                (job_id,)
+            ).fetchone()
+            shard_rows = []
+            if job["shards"]:
+                shard_rows = conn.execute(
+                    "SELECT shard, COUNT(*) AS total, "
+                    "SUM(CASE WHEN status IN ('completed', 'failed', 'cancelled') THEN 1 ELSE 0 END) AS done, "
+                    "SUM(CASE WHEN status = 'running' THEN 1 ELSE 0 END) AS running "
+                    "FROM generation_job_items WHERE job_id = ? GROUP BY shard ORDER BY shard",
+                    (job_id,)
+                ).fetchall()
+        done = sum(counts.get(s, 0) for s in TERMINAL_ITEM_STATUSES)
+        processed = counts.get("completed", 0) + counts.get("failed", 0)
+        remaining = counts.get("pending", 0) + counts.get("running", 0)
+
+        # Throughput over the job's wall-clock time so far
+        elapsed = None
+        items_per_minute = None
+        eta_seconds = None
+        if job["started_at"]:
+            end = job["finished_at"] or time.time()
+            elapsed = max(end - job["started_at"], 0.0)
+            if elapsed > 0 and processed:
+                items_per_minute = processed / elapsed * 60
+                if remaining and job["status"] in ("queued", "running"):
+                    eta_seconds = remaining / items_per_minute * 60
+
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "total": job["total_items"],
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "progress": (done / job["total_items"] * 100) if job["total_items"] else 100.0,
+            "shards": job["shards"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "throughput": {
+                "elapsed_seconds": elapsed,
+                "items_per_minute": items_per_minute,
+                "avg_item_seconds": timing["avg_item_seconds"],
+                "eta_seconds": eta_seconds
+            },
+            "shard_progress": [
+                {"shard": row["shard"], "total": row["total"], "done": row["done"], "running": row["running"]}
+                for row in shard_rows
+            ]
+        }
+
+    def get_results(self, job_id: str) -> List[Dict[str, Any]]:
+        """Checkpointed per-candidate results in submission order."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id, status, result, error FROM generation_job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+        results = []
+        for row in rows:
+            if row["result"]:
+                results.append(json.loads(row["result"]))
+            elif row["status"] in ("failed", "cancelled"):
+                results.append({
+                    "session_id": row["session_id"],
+                    "error": row["error"] or row["status"],
+                    "success": False
+                })
+        return results
+
+    def cancel(self, job_id: str) -> Optional[int]:
+        """
+        Cancel a job. Pending items are dropped. Running items are stopped by
+        their worker's heartbeat (within JOB_CANCEL_POLL_SECONDS) and recorded
+        as cancelled; they are not retried.
+
+        Returns how many pending items were dropped, or None if the job was
+        not queued or running.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
+                "UPDATE generation_jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (now, job_id)
+            )
+            dropped = None
+            if cur.rowcount:
+                dropped = conn.execute(
+                    "UPDATE generation_job_items SET status = 'cancelled', finished_at = ? "
+                    "WHERE job_id = ? AND status = 'pending'",
+                    (now, job_id)
+                ).rowcount
+            conn.execute("COMMIT")
+        return dropped
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+        return row is not None and row["status"] == "cancelled"
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically lease the next pending item (oldest job first) whose shard is idle."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT i.id, i.job_id, i.idx, i.session_id, i.attempts, j.payload "
+                "FROM generation_job_items i JOIN generation_jobs j ON j.id = i.job_id "
+                "WHERE i.status = 'pending' AND j.status IN ('queued', 'running') "
+                "AND NOT EXISTS (SELECT 1 FROM generation_job_items r WHERE r.job_id = i.job_id "
+                "AND r.shard = i.shard AND r.status = 'running') "
+                "ORDER BY j.created_at, i.idx LIMIT 1"
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE generation_job_items SET status = 'running', worker_id = ?, attempts = attempts + 1, "
+                "started_at = ?, lease_expires_at = ? WHERE id = ?",
+                (worker_id, now, now + settings.JOB_LEASE_SECONDS, row["id"])
+            )
+            conn.execute(
+                "UPDATE generation_jobs SET status = 'running', started_at = COALESCE(started_at, ?) "
+                "WHERE id = ? AND status = 'queued'",
+                (now, row["job_id"])
+            )
+            conn.execute("COMMIT")
+        return {
+            "item_id": row["id"],
+            "job_id": row["job_id"],
+            "idx": row["idx"],
+            "session_id": row["session_id"],
+            "attempt": row["attempts"] + 1,
+            "payload": json.loads(row["payload"])
+        }
+
+    def extend_lease(self, item_id: int, worker_id: str) -> None:
+        """Heartbeat for long-running items so they are not re-queued."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE generation_job_items SET lease_expires_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + settings.JOB_LEASE_SECONDS, item_id, worker_id)
+            )
+
+    # complete, mark_cancelled and fail only update an item still leased to
+    # `worker_id`: after its lease expired the item may belong to another
+    # worker, and they return False without touching it.
+
+    def complete(self, item_id: int, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Checkpoint a finished candidate."""
+        return self._finish_item(item_id, job_id, worker_id, "completed", result=json.dumps(result))
+
+    def mark_cancelled(self, item_id: int, job_id: str, worker_id: str) -> bool:
+        """Record an item aborted mid-generation because its job was cancelled."""
+        return self._finish_item(item_id, job_id, worker_id, "cancelled", error="Cancelled")
+
+    def fail(self, item_id: int, job_id: str, worker_id: str, error: str, retry: bool) -> bool:
+        """Record a failure; retryable failures go back to pending."""
+        if retry:
+            with self._connect() as conn:
+                cur = conn.execute(
+                    "UPDATE generation_job_items SET status = 'pending', worker_id = NULL, "
+                    "lease_expires_at = NULL, error = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (error, item_id, worker_id)
+                )
+            return cur.rowcount > 0
+        return self._finish_item(item_id, job_id, worker_id, "failed", error=error)
+
+    def _finish_item(
+        self,
+        item_id: int,
+        job_id: str,
+        worker_id: str,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
+                "UPDATE generation_job_items SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (status, result, error, now, item_id, worker_id)
+            )
+            if not cur.rowcount:
+                conn.execute("COMMIT")
+                return False
+            remaining = conn.execute(
+                "SELECT COUNT(*) FROM generation_job_items WHERE job_id = ? AND status IN ('pending', 'running')",
+                (job_id,)
+            ).fetchone()[0]
+            if remaining == 0:
+                conn.execute(
+                    "UPDATE generation_jobs SET status = 'completed', finished_at = ? "
+                    "WHERE id = ? AND status IN ('queued', 'running')",
+                    (now, job_id)
+                )
+            conn.execute("COMMIT")
+        return True
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        """Return items leased by crashed workers to the queue (or fail them after max attempts)."""
+        conn.execute(
+            "UPDATE generation_job_items SET status = 'failed', error = 'Exceeded maximum attempts', finished_at = ? "
+            "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+            (now, now, settings.JOB_MAX_ATTEMPTS)
+        )
+        conn.execute(
+            "UPDATE generation_job_items SET status = 'pending', worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = 'running' AND lease_expires_at < ?",
+            (now,)
+        )
+        conn.execute(
+            "UPDATE generation_jobs SET status = 'completed', finished_at = ? "
+            "WHERE status = 'running' AND NOT EXISTS ("
+            "SELECT 1 FROM generation_job_items i WHERE i.job_id = generation_jobs.id "
+            "AND i.status IN ('pending', 'running'))",
+            (now,)
+        )
+
+
+# Create singleton instance
+job_queue = JobQueue()
@@ -0,0 +1,284 @@
+"""
+Ledger of LLM calls (local SQLite) for token, latency and cost analytics.
+
+Calls are queued in memory and written by a background thread, so recording
+never blocks a request on disk I/O. Request-level attributes (endpoint,
+session, campaign, guide) come from a context variable set by the callers,
+so llm_service only has to report what it knows about the call itself.
+
+Report from the command line:
+
+    python -m app.llm_ledger --since-hours 24
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    model TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    prompt_tokens INTEGER,             -- NULL when the provider reported no usage (e.g. cancelled stream)
+    completion_tokens INTEGER,
+    latency_ms REAL NOT NULL,
+    call_type TEXT NOT NULL,           -- first, top_up, legacy, regenerate
+    iteration INTEGER NOT NULL DEFAULT 0,
+    endpoint TEXT,
+    outcome TEXT NOT NULL,             -- ok, empty, cancelled, error:<ExceptionType>
+    guide_id TEXT,                     -- groups the calls made for one guide
+    session_id TEXT,
+    campaign_id TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_llm_calls_created ON llm_calls(created_at);
+CREATE INDEX IF NOT EXISTS ix_llm_calls_campaign ON llm_calls(campaign_id);
+"""
+
+COLUMNS = (
+    "created_at", "model", "prompt_hash", "prompt_tokens", "completion_tokens", "latency_ms",
+    "call_type", "iteration", "endpoint", "outcome", "guide_id", "session_id", "campaign_id",
+)
+
+_context: ContextVar[Dict[str, Any]] = ContextVar("llm_ledger_context", default={})
+
+
+def prompt_hash(messages: List[Dict[str, str]]) -> str:
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def call_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """USD cost of a call from the LLM_PRICES table, or None for unpriced models."""
+    prices = settings.LLM_PRICES.get(model)
+    if prices is None:
+        return None
+    return ((prompt_tokens or 0) * prices.get("input", 0) + (completion_tokens or 0) * prices.get("output", 0)) / 1_000_000
+
+
+class LLMLedger:
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or settings.LLM_LEDGER_DB_PATH
+
+    @contextmanager
+    def context(self, **attributes: Any) -> Iterator[None]:
+        """
+        Attach attributes (endpoint, session_id, campaign_id, guide_id) to calls
+        made in the block. Also usable as a function decorator.
+        """
+        token = _context.set({**_context.get(), **{k: str(v) for k, v in attributes.items() if v is not None}})
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    def record(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        latency_seconds: float,
+        call_type: str,
+        iteration: int,
+        outcome: str
+    ) -> None:
+        """Queue a call for writing; never raises into the caller."""
+        if not settings.LLM_LEDGER_ENABLED:
+            return
+        try:
+            ctx = _context.get()
+            row = (
+                time.time(), model, prompt_hash(messages), prompt_tokens, completion_tokens,
+                round(latency_seconds * 1000, 1), call_type, iteration, ctx.get("endpoint"), outcome,
+                ctx.get("guide_id"), ctx.get("session_id"), ctx.get("campaign_id"),
+            )
+            self._ensure_writer()
+            self._queue.put(row)
+        except Exception as e:
+            logger.warning(f"Could not record LLM call in ledger: {e}")
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until queued rows are written (used at exit and by the report CLI)."""
+        if self._writer is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="llm-ledger-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            # Drain whatever else is queued so bursts are written in one transaction
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._connect() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(
+                        f"INSERT INTO llm_calls ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                        rows
+                    )
+                    conn.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"LLM ledger write failed, dropped {len(rows)} rows: {e}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def report(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregate latency percentiles, tokens per guide and cost per campaign."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM llm_calls WHERE created_at >= ? ORDER BY created_at",
+                (since or 0,)
+            ).fetchall()
+
+        by_call_type: Dict[str, List[sqlite3.Row]] = {}
+        guides: Dict[str, Dict[str, float]] = {}
+        campaigns: Dict[str, Dict[str, float]] = {}
+        unpriced_models = set()
+        for row in rows:
+            by_call_type.setdefault(row["call_type"], []).append(row)
+            cost = call_cost(row["model"], row["prompt_tokens"], row["completion_tokens"])
+            if cost is None:
+                unpriced_models.add(row["model"])
+            tokens = (row["prompt_tokens"] or 0) + (row["completion_tokens"] or 0)
+            if row["guide_id"]:
+                guide = guides.setdefault(row["guide_id"], {"tokens": 0, "calls": 0})
+                guide["tokens"] += tokens
+                guide["calls"] += 1
+            campaign = campaigns.setdefault(row["campaign_id"] or "unknown", {"calls": 0, "guides": set(), "tokens": 0, "cost_usd": 0.0})
+            campaign["calls"] += 1
+            campaign["tokens"] += tokens
+            campaign["cost_usd"] += cost or 0.0
+            if row["guide_id"]:
+                campaign["guides"].add(row["guide_id"])
+
+        guide_tokens = [g["tokens"] for g in guides.values()]
+        return {
+            "since": since,
+            "calls": len(rows),
+            "latency_ms": _latency_summary(rows),
+            "by_call_type": {
+                call_type: {
+                    "calls": len(type_rows),
+                    "latency_ms": _latency_summary(type_rows),
+                    "avg_prompt_tokens": _average([r["prompt_tokens"] for r in type_rows if r["prompt_tokens"] is not None]),
+                    "avg_completion_tokens": _average([r["completion_tokens"] for r in type_rows if r["completion_tokens"] is not None]),
+                    "outcomes": _count_by(type_rows, "outcome"),
+                }
+                for call_type, type_rows in sorted(by_call_type.items())
+            },
+            "tokens_per_guide": {
+                "guides": len(guides),
+                "avg": _average(guide_tokens),
+                "p50": percentile(guide_tokens, 50),
+                "p95": percentile(guide_tokens, 95),
+                "avg_calls": _average([g["calls"] for g in guides.values()]),
+            },
+            "cost_per_campaign": {
+                campaign_id: {
+                    "calls": c["calls"],
+                    "guides": len(c["guides"]),
+                    "tokens": c["tokens"],
+                    "cost_usd": round(c["cost_usd"], 4),
+                    "cost_per_guide_usd": round(c["cost_usd"] / len(c["guides"]), 4) if c["guides"] else None,
+                }
+                for campaign_id, c in sorted(campaigns.items(), key=lambda item: -item[1]["cost_usd"])
+            },
+            "unpriced_models": sorted(unpriced_models),
+        }
+
+
+def _latency_summary(rows: List[sqlite3.Row]) -> Dict[str, Optional[float]]:
+    latencies = [row["latency_ms"] for row in rows]
+    return {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "max": max(latencies) if latencies else None}
+
+
+def _average(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def _count_by(rows: List[sqlite3.Row], column: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for row in rows:
+        counts[row[column]] = counts.get(row[column], 0) + 1
+    return counts
+
+
+# Create singleton instance
+llm_ledger = LLMLedger()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the LLM call ledger")
+    parser.add_argument("--since-hours", type=float, default=None, help="Only include calls from the last N hours")
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    print(json.dumps(llm_ledger.report(since), indent=2))
+
+
+if __name__ == "__main__":
+    main()
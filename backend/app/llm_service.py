@@ -1,23 +1,117 @@
 import json
 import logging
-from typing import List, Optional, Dict, Any
-from openai import OpenAI
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from .cancellation import CancellationToken, DeadlineExceeded, GenerationCancelled
 from .config import settings
-from .schemas import SkillGap
+from . import compact_format, guide_profiles, timing
+from .llm_ledger import call_cost, llm_ledger
+from .degradation import GenerationPlan, degradation
+from .draft_engine import draft_engine
+from .metrics import metrics
+from .model_routing import CALL_TYPE_TASKS, InvalidModelOutput, model_router
+from .question_bank import question_bank, SOURCE as QUESTION_BANK_SOURCE
+from .schemas import AdditionalQuestionsOutput, AgenticGuideOutput, GuideQuestion, PackedGuidesOutput, SkillGap
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _is_timeout(error: Exception) -> bool:
+    """openai.APITimeoutError, httpx timeouts and the fake client's TimeoutError."""
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+@lru_cache(maxsize=None)
+def _strict_schema(output: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of `output` in the strict structured-outputs dialect (all properties required, no extras)."""
+    schema = output.model_json_schema()
+    
+    def tighten(node: Any) -> None:
+        if isinstance(node, dict):
+            node.pop("title", None)
+            node.pop("default", None)  # Defaults only fill fields a generation profile leaves out
+            if node.get("type") == "object" and "properties" in node:
+                node["additionalProperties"] = False
+                node["required"] = list(node["properties"])
+            for key, value in node.items():
+                # Keys of `properties` are field names, not schema keywords
+                if key == "properties":
+                    for prop in value.values():
+                        tighten(prop)
+                else:
+                    tighten(value)
+        elif isinstance(node, list):
+            for item in node:
+                tighten(item)
+    
+    tighten(schema)
+    return schema
+
+
+@lru_cache(maxsize=None)
+def _variant_schema(output: Type[BaseModel], profile: str, compact: bool) -> Dict[str, Any]:
+    schema = guide_profiles.prune_schema(_strict_schema(output), guide_profiles.omitted_fields(profile))
+    return compact_format.compact_schema(schema) if compact else schema
+
+
+def _response_schema(output: Type[BaseModel], profile: str = "full") -> Tuple[str, Dict[str, Any]]:
+    """
+    (name, schema) of the response `output` is requested as: without the
+    fields the generation profile omits, and compact with LLM_COMPACT_OUTPUT.
+    """
+    name = output.__name__ + (profile.title() if profile != "full" else "")
+    if settings.LLM_COMPACT_OUTPUT:
+        name += "Compact"
+    return name, _variant_schema(output, profile, settings.LLM_COMPACT_OUTPUT)
+
+
+def _response_format(output: Optional[Type[BaseModel]], profile: str = "full") -> Dict[str, Any]:
+    if output is None or not settings.LLM_STRUCTURED_OUTPUTS:
+        return {"type": "json_object"}
+    name, schema = _response_schema(output, profile)
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+_GUIDE_SYSTEM_MESSAGE = """You are an expert interview strategist who uses chain-of-thought reasoning to create highly targeted, evidence-based interview guides. 
+
+Your guides are known for:
+1. Citing specific evidence from evaluation data
+2. Clear reasoning chains that justify each question
+3. Practical, actionable interview guidance
+4. Balancing thorough assessment with time efficiency
+
+You must always respond with valid JSON only, no additional text or markdown."""
+
+
+def _legacy_problem(result: Any) -> Optional[str]:
+    if not isinstance(result, dict) or not isinstance(result.get("questions"), list):
+        return "missing_questions"
+    return None
+
+
 class LLMService:
     def __init__(self):
         self._client = None
     
+    @property
+    def available(self) -> bool:
+        """Whether real (or fake) LLM calls can be made, as opposed to mock fallbacks."""
+        return settings.LLM_PROVIDER == "fake" or bool(settings.OPENAI_API_KEY)
+    
     @property
     def client(self):
         """Lazy initialization of OpenAI client - checks API key on each access."""
-        if self._client is None and settings.OPENAI_API_KEY:
+        if self._client is None and settings.LLM_PROVIDER == "fake":
+            from .fake_llm import create_fake_client
+            self._client = create_fake_client()
+            logger.info("Using fake LLM client")
+        elif self._client is None and settings.OPENAI_API_KEY:
+            from openai import OpenAI  # Deferred: the SDK is slow to import
             self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
             logger.info("OpenAI client initialized successfully")
         return self._client
@@ -35,7 +129,13 @@ class LLMService:
         voice_summary: Optional[Dict[str, Any]] = None,
         custom_instructions: Optional[str] = None,
         num_questions: int = 8,
-        scenario_type: Optional[str] = None
+        scenario_type: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        mode: str = "llm",
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        plan: Optional[GenerationPlan] = None,
+        profile: str = "full",
+        packed: Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = None
     ) -> dict:
         """
         Generate agentic interview guide with chain-of-thought reasoning.
@@ -45,26 +145,81 @@ class LLMService:
         2. Determine significance of gaps relative to job requirements
         3. Generate targeted questions with full reasoning chains
         4. Include specific evidence citations from simulation data
+        
+        If `cancel_token` is cancelled, pending and in-flight LLM calls are
+        abandoned and GenerationCancelled is raised (no mock fallback).
+        
+        Matching questions from the question bank are used first (up to
+        QUESTION_BANK_MAX_SHARE of the guide); the LLM writes the reasoning
+        and the remaining questions, and its new questions are added to the bank.
+        
+        `mode="draft"` skips the LLM and returns the rule-based draft engine's
+        guide (milliseconds, deterministic). `on_progress` is called with the
+        partial guide after any LLM call that leaves it short of `num_questions`.
+        
+        `plan` (from the degradation controller; picked here when omitted)
+        sets the model, token limits and top-up iterations, or sends the
+        guide to the draft engine. LLM failures are recorded on it as well.
+        
+        `profile` ("full", "standard" or "fast", see guide_profiles) trims the
+        prompt, response schema and `max_tokens`. Only full guides feed the
+        question bank, since lighter ones leave question fields empty.
+        
+        `packed` is this candidate's (guide, bank questions) from a packed
+        call (see generate_packed_agentic_guides). The guide stands in for the
+        first LLM call and then goes through the usual count/trim, top-up and
+        bank merge; without one (None) the first call is made as usual.
         """
         
+        if mode == "draft":
+            with timing.stage("draft"):
+                return draft_engine.generate(
+                    candidate_name, verified_skills, skill_gaps, skills_not_tested,
+                    num_questions, role=role, scenario_type=scenario_type
+                )
+        
+        if plan is None:
+            plan = degradation.plan()
+        
         # Check if we have an API key
-        if not settings.OPENAI_API_KEY:
+        if not self.available:
             logger.warning("OPENAI_API_KEY not set - returning mock agentic response")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "agentic_guide", "reason": "no_api_key"})
+            plan.fall_back("no_api_key")
             return self._get_mock_agentic_response(
                 candidate_name, verified_skills, skill_gaps, 
                 skills_not_tested, num_questions
             )
         
-        # Build the evidence context
-        evidence_text = self._format_evidence(evaluation_evidence)
-        verified_text = self._format_verified_skills(verified_skills)
-        gaps_text = self._format_skill_gaps(skill_gaps)
-        not_tested_text = self._format_not_tested_skills(skills_not_tested)
-        feedback_text = self._format_feedback(feedback_summary)
-        voice_text = self._format_voice_summary(voice_summary)
+        if not plan.draft and plan.remaining() < settings.LLM_MIN_CALL_SECONDS:
+            plan.fall_back("deadline")
+        if plan.draft:
+            logger.warning(f"Generation degraded ({', '.join(plan.reasons)}) - returning draft guide for {candidate_name}")
+            with timing.stage("draft"):
+                return draft_engine.generate(
+                    candidate_name, verified_skills, skill_gaps, skills_not_tested,
+                    num_questions, role=role, scenario_type=scenario_type
+                )
+        
+        first_result, bank_questions = packed or (None, None)
+        if bank_questions is None:
+            bank_questions = self._retrieve_bank_questions(skill_gaps, skills_not_tested, role, scenario_type, num_questions)
+        new_questions = num_questions - len(bank_questions)
         
-        # Build the comprehensive prompt
-        prompt = f"""You are an expert interview strategist using chain-of-thought reasoning to generate a highly targeted, evidence-based interview guide.
+        prompt = ""  # A packed guide already has its first call
+        if first_result is None:
+            # Build the evidence context
+            prompt_started = time.perf_counter()
+            evidence_text = self._format_evidence(evaluation_evidence)
+            verified_text = self._format_verified_skills(verified_skills)
+            gaps_text = self._format_skill_gaps(skill_gaps)
+            not_tested_text = self._format_not_tested_skills(skills_not_tested)
+            feedback_text = self._format_feedback(feedback_summary)
+            voice_text = self._format_voice_summary(voice_summary)
+            bank_text = self._format_bank_questions(bank_questions)
+        
+            # Build the comprehensive prompt
+            prompt = f"""You are an expert interview strategist using chain-of-thought reasoning to generate a highly targeted, evidence-based interview guide.
 
 ## CANDIDATE CONTEXT
 - **Name**: {candidate_name}
@@ -94,97 +249,19 @@ class LLMService:
 
 {f"## RECRUITER CUSTOM INSTRUCTIONS{chr(10)}{custom_instructions}" if custom_instructions else ""}
 
+{f"## PRE-SELECTED QUESTIONS (already in the guide - do NOT repeat or rephrase them){chr(10)}{bank_text}" if bank_text else ""}
+
 ---
 
 ## YOUR TASK: Generate an Agentic Interview Guide
 
-For this interview guide, you must:
+{self._guide_task_instructions(profile)}
 
-1. **SECTION 1 - VERIFIED SKILLS**: For each verified skill (score 4+), provide a brief acknowledgment statement. These are NOT counted toward the num_questions target - they are quick confirmations only.
+Generate EXACTLY {new_questions} questions total from SKILL GAPS and SKILLS NOT TESTED sections only. Verified skills receive acknowledgments, NOT questions, and do NOT count toward this target.{f" The {len(bank_questions)} pre-selected questions complete the guide: still include the reasoning for their skills, with an empty questions list if a skill needs no new question." if bank_questions else ""}
 
-2. **SECTION 2 - SKILL GAPS**: For each skill gap, perform chain-of-thought reasoning:
-   - **Data Observation**: What specific score/evidence do we have?
-   - **Evidence from Transcript/Feedback**: Quote or cite specific observations
-   - **Gap Significance**: Why does this matter for THIS specific role?
-   - **Interview Strategy**: What approach will reveal true capability vs. simulation performance?
-   - **Question Rationale**: Why is this specific question the right one to ask?
-   
-   Then generate 1-2 targeted questions per gap with:
-   - The question text (behavioral/situational)
-   - What to listen for (3 specific indicators)
-   - Red flags (2-3 warning signs)
-   - Follow-up questions (2-3 probing questions)
-
-3. **SECTION 3 - SKILLS NOT TESTED**: For each skill required by the job but not tested in simulation:
-   - **Note**: Acknowledge it wasn't tested
-   - **Relevance to Role**: Why this skill matters for the job
-   - **Question Strategy**: Standard behavioral assessment approach
-   
-   Generate 1 question per untested skill.
+Respond with JSON following the response schema. Reasoning fields must cite this candidate's evidence, not generic text."""
 
-4. **EXECUTIVE SUMMARY**: 3-4 sentences synthesizing the candidate's profile and interview focus areas.
-
-Generate EXACTLY {num_questions} questions total from SKILL GAPS and SKILLS NOT TESTED sections only. Verified skills receive acknowledgments, NOT questions, and do NOT count toward this target.
-
-You MUST respond with valid JSON in this exact format:
-{{
-    "executive_summary": "3-4 sentence synthesis of candidate profile and interview strategy...",
-    "interview_duration_estimate": "30-45 minutes",
-    "sections": {{
-        "verified_skills": [
-            {{
-                "skill_name": "Skill Name",
-                "score": 4.5,
-                "acknowledgment": "Brief acknowledgment statement for this verified skill...",
-                "time_estimate": "1 minute"
-            }}
-        ],
-        "skill_gaps": [
-            {{
-                "skill_name": "Skill Name",
-                "current_score": 2,
-                "priority": "high",
-                "reasoning": {{
-                    "data_observation": "Scored 2/5 in EMAIL_CONVERSATION simulation",
-                    "evidence_from_evaluation": "User responses lacked context...",
-                    "gap_significance": "Critical for role - daily client communication required",
-                    "interview_strategy": "Behavioral questions to assess real-world application",
-                    "question_rationale": "STAR format to elicit concrete examples"
-                }},
-                "questions": [
-                    {{
-                        "question": "The interview question text...",
-                        "what_to_listen_for": ["indicator1", "indicator2", "indicator3"],
-                        "red_flags": ["warning1", "warning2"],
-                        "follow_ups": ["follow_up1", "follow_up2"],
-                        "time_estimate": "4-5 minutes"
-                    }}
-                ]
-            }}
-        ],
-        "skills_not_tested": [
-            {{
-                "skill_name": "Skill Name",
-                "priority": "medium",
-                "reasoning": {{
-                    "note": "This skill was not evaluated in simulation",
-                    "relevance_to_role": "Important because...",
-                    "question_strategy": "Standard behavioral assessment"
-                }},
-                "question": {{
-                    "question": "The interview question text...",
-                    "what_to_listen_for": ["indicator1", "indicator2", "indicator3"],
-                    "red_flags": ["warning1", "warning2"],
-                    "follow_ups": ["follow_up1", "follow_up2"],
-                    "time_estimate": "4-5 minutes"
-                }}
-            }}
-        ]
-    }},
-    "overall_red_flags": ["Overall concern 1", "Overall concern 2"],
-    "overall_strengths": ["Strength 1", "Strength 2", "Strength 3"],
-    "interview_tips": ["Tip 1 for conducting this interview", "Tip 2"]
-}}"""
+            timing.record_stage("prompt_build", time.perf_counter() - prompt_started)
 
         try:
             logger.info(f"Generating agentic guide for candidate: {candidate_name}, target questions: {num_questions}")
@@ -198,32 +275,296 @@ You MUST respond with valid JSON in this exact format:
                 job_description=job_description,
                 skill_gaps=skill_gaps,
                 skills_not_tested=skills_not_tested,
-                scenario_type=scenario_type
+                scenario_type=scenario_type,
+                cancel_token=cancel_token,
+                bank_questions=bank_questions,
+                skill_gap_details=skill_gaps,
+                on_progress=on_progress,
+                plan=plan,
+                profile=profile,
+                first_result=first_result
             )
             
             if result:
                 logger.info(f"Successfully generated agentic guide with {self._count_questions(result)} questions")
+                self._record_question_sources(result)
+                if profile == "full":
+                    question_bank.add_from_guide(result, skill_gaps, skills_not_tested, role, scenario_type)
                 return result
             else:
                 logger.error("Failed to generate guide after iterations")
+                metrics.inc("llm_mock_fallbacks_total", {"endpoint": "agentic_guide", "reason": "empty_response"})
+                plan.fall_back("empty_response")
                 return self._get_mock_agentic_response(
                     candidate_name, verified_skills, skill_gaps,
                     skills_not_tested, num_questions
                 )
                 
-        except json.JSONDecodeError as e:
+        except GenerationCancelled:
+            logger.info(f"Agentic guide generation cancelled for candidate: {candidate_name}")
+            raise
+        except DeadlineExceeded as e:
+            logger.warning(f"Agentic guide for {candidate_name} ran out of time: {e}")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "agentic_guide", "reason": "deadline"})
+            plan.fall_back("deadline")
+            return self._get_mock_agentic_response(
+                candidate_name, verified_skills, skill_gaps,
+                skills_not_tested, num_questions
+            )
+        except (json.JSONDecodeError, InvalidModelOutput) as e:
             logger.error(f"JSON parsing error in agentic guide: {e}")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "agentic_guide", "reason": "json_error"})
+            plan.fall_back("json_error")
             return self._get_mock_agentic_response(
                 candidate_name, verified_skills, skill_gaps,
                 skills_not_tested, num_questions
             )
         except Exception as e:
             logger.error(f"OpenAI API Error in agentic guide: {type(e).__name__}: {e}")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "agentic_guide", "reason": "api_error"})
+            plan.fall_back("api_error")
             return self._get_mock_agentic_response(
                 candidate_name, verified_skills, skill_gaps,
                 skills_not_tested, num_questions
             )
     
+    def _retrieve_bank_questions(
+        self,
+        skill_gaps: List[Dict[str, Any]],
+        skills_not_tested: List[Dict[str, Any]],
+        role: str,
+        scenario_type: Optional[str],
+        num_questions: int
+    ) -> List[Dict[str, Any]]:
+        with timing.stage("question_bank"):
+            return question_bank.retrieve(
+                skill_gaps, skills_not_tested, role, scenario_type,
+                budget=int(num_questions * settings.QUESTION_BANK_MAX_SHARE)
+            )
+    
+    def can_pack(self, evaluation_evidence: List[Dict[str, Any]]) -> bool:
+        """Whether a candidate's evidence is small enough to share a packed call (GUIDE_PACK_MAX_EVIDENCE_CHARS)."""
+        return len(self._format_evidence(evaluation_evidence)) <= settings.GUIDE_PACK_MAX_EVIDENCE_CHARS
+    
+    def generate_packed_agentic_guides(
+        self,
+        candidates: List[Dict[str, Any]],
+        job_description: str,
+        custom_instructions: Optional[str] = None,
+        num_questions: int = 8,
+        cancel_token: Optional[CancellationToken] = None,
+        profile: str = "full"
+    ) -> Dict[str, dict]:
+        """
+        Generate agentic guides for several candidates with one first LLM call.
+        
+        Each candidate is a dict of `generate_agentic_guide` arguments
+        (candidate_name, role, verified_skills, skill_gaps, skills_not_tested,
+        evaluation_evidence, feedback_summary, voice_summary, scenario_type
+        and its own `plan`) plus its `session_id`. The job description, custom
+        instructions and task instructions are sent once, followed by each
+        candidate's evidence, and the response is keyed by session_id. Each
+        guide then goes through generate_agentic_guide as if it came from the
+        candidate's own first call: count/trim, top-ups and the question bank.
+        
+        The first candidate's plan picks the model and timeout of the packed
+        call; each plan's deadline restarts after it, less the time it took.
+        Candidates missing from the response, and all of them when the packed
+        call fails, are generated individually. Returns session_id -> guide
+        for every candidate.
+        """
+        def generate(candidate: Dict[str, Any], guide: Optional[Dict[str, Any]] = None, bank_questions: Optional[List[Dict[str, Any]]] = None) -> dict:
+            args = {key: value for key, value in candidate.items() if key != "session_id"}
+            return self.generate_agentic_guide(
+                job_description=job_description,
+                custom_instructions=custom_instructions,
+                num_questions=num_questions,
+                cancel_token=cancel_token,
+                profile=profile,
+                packed=(guide, bank_questions),
+                **args
+            )
+        
+        plan = candidates[0]["plan"] if candidates else None
+        if len(candidates) < 2 or not self.available or plan.draft or plan.remaining() < settings.LLM_MIN_CALL_SECONDS:
+            return {candidate["session_id"]: generate(candidate) for candidate in candidates}
+        
+        bank = {
+            candidate["session_id"]: self._retrieve_bank_questions(
+                candidate["skill_gaps"], candidate["skills_not_tested"], candidate["role"],
+                candidate.get("scenario_type"), num_questions
+            )
+            for candidate in candidates
+        }
+        with timing.stage("prompt_build"):
+            prompt = self._build_packed_guide_prompt(candidates, bank, job_description, custom_instructions, num_questions, profile)
+        
+        logger.info(f"Generating packed agentic guides for {len(candidates)} candidates, target questions: {num_questions} each")
+        metrics.inc("guide_packed_calls_total")
+        metrics.inc("guide_packed_candidates_total", value=len(candidates))
+        started = time.monotonic()
+        try:
+            response = self._complete_json(
+                messages=[
+                    {"role": "system", "content": _GUIDE_SYSTEM_MESSAGE},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=min(
+                    guide_profiles.max_tokens(profile, plan.max_tokens_first, "first") * len(candidates),
+                    settings.GUIDE_PACK_MAX_TOKENS
+                ),
+                output=PackedGuidesOutput,
+                profile=profile,
+                cancel_token=cancel_token,
+                model=plan.model,
+                call_type="packed",
+                timeout=plan.remaining() * (settings.GUIDE_FIRST_CALL_SHARE if plan.max_iterations else 1.0)
+            )
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            if isinstance(e, DeadlineExceeded):
+                reason = "deadline"
+            elif isinstance(e, (json.JSONDecodeError, InvalidModelOutput)):
+                reason = "json_error"
+            else:
+                reason = "api_error"
+            logger.error(f"Packed guide call failed ({reason}), generating {len(candidates)} guides individually: {type(e).__name__}: {e}")
+            metrics.inc("guide_packed_fallbacks_total", {"reason": reason}, len(candidates))
+            response = None
+        shared_seconds = time.monotonic() - started
+        
+        guides = {entry["session_id"]: entry["guide"] for entry in (response or {}).get("guides", [])}
+        results = {}
+        for candidate in candidates:
+            session_id = candidate["session_id"]
+            if response is not None and session_id not in guides:
+                logger.warning(f"Packed response has no guide for session {session_id}, generating it individually")
+                metrics.inc("guide_packed_fallbacks_total", {"reason": "missing_candidate"})
+            candidate["plan"].restart(shared_seconds)
+            with llm_ledger.context(session_id=session_id):
+                results[session_id] = generate(candidate, guides.get(session_id), bank[session_id])
+        return results
+    
+    def _build_packed_guide_prompt(
+        self,
+        candidates: List[Dict[str, Any]],
+        bank: Dict[str, List[Dict[str, Any]]],
+        job_description: str,
+        custom_instructions: Optional[str],
+        num_questions: int,
+        profile: str = "full"
+    ) -> str:
+        """Prompt for a packed call: shared context once, then one evidence block and question target per candidate."""
+        blocks = []
+        targets = []
+        for n, candidate in enumerate(candidates, 1):
+            session_id = candidate["session_id"]
+            bank_questions = bank[session_id]
+            feedback_text = self._format_feedback(candidate.get("feedback_summary"))
+            voice_text = self._format_voice_summary(candidate.get("voice_summary"))
+            bank_text = self._format_bank_questions(bank_questions)
+            blocks.append(f"""## CANDIDATE {n} (session_id `{session_id}`)
+- **Name**: {candidate["candidate_name"]}
+- **Role Applied**: {candidate["role"]}
+- **Simulation Type**: {candidate.get("scenario_type") or "General Assessment"}
+
+### EVALUATION EVIDENCE FROM SIMULATION
+{self._format_evidence(candidate["evaluation_evidence"])}
+
+### VERIFIED SKILLS (Score >= 4/5)
+{self._format_verified_skills(candidate["verified_skills"])}
+
+### SKILL GAPS (Score < 4/5 - Need probing)
+{self._format_skill_gaps(candidate["skill_gaps"])}
+
+### SKILLS NOT TESTED IN SIMULATION (Required by job but not evaluated)
+{self._format_not_tested_skills(candidate["skills_not_tested"])}
+
+{f"### FEEDBACK SUMMARY{chr(10)}{feedback_text}" if feedback_text else ""}
+
+{f"### VOICE/COMMUNICATION ASSESSMENT{chr(10)}{voice_text}" if voice_text else ""}
+
+{f"### PRE-SELECTED QUESTIONS (already in the guide - do NOT repeat or rephrase them){chr(10)}{bank_text}" if bank_text else ""}""")
+            targets.append(
+                f"- session_id `{session_id}`: generate EXACTLY {num_questions - len(bank_questions)} questions total"
+                + (f" ({len(bank_questions)} pre-selected questions complete the guide)" if bank_questions else "")
+            )
+        candidate_text = "\n\n".join(blocks)
+        target_text = "\n".join(targets)
+        
+        return f"""You are an expert interview strategist using chain-of-thought reasoning to generate highly targeted, evidence-based interview guides for {len(candidates)} candidates who applied for the same job. Each candidate gets their own guide.
+
+## JOB DESCRIPTION
+{job_description}
+
+{f"## RECRUITER CUSTOM INSTRUCTIONS{chr(10)}{custom_instructions}" if custom_instructions else ""}
+
+---
+
+{candidate_text}
+
+---
+
+## YOUR TASK: Generate an Agentic Interview Guide for EACH candidate
+
+{self._guide_task_instructions(profile)}
+
+Question targets, counted from each candidate's SKILL GAPS and SKILLS NOT TESTED sections only. Verified skills receive acknowledgments, NOT questions, and do NOT count toward the targets:
+{target_text}
+
+Respond with JSON following the response schema: one entry in `guides` per candidate, with its session_id. Reasoning fields must cite that candidate's own evidence, never another candidate's or generic text."""
+    
+    def _guide_task_instructions(self, profile: str = "full") -> str:
+        """The task section of the guide prompt for a generation profile (see guide_profiles)."""
+        if profile == "fast":
+            return """This is a FAST screening guide: questions only, no reasoning chains.
+
+1. **SKILL GAPS**: For each skill gap, generate 1-2 targeted behavioral/situational questions, each with 2-3 specific things to listen for.
+
+2. **SKILLS NOT TESTED**: Generate 1 question per skill required by the job but not tested in simulation, with 2-3 things to listen for.
+
+3. **EXECUTIVE SUMMARY**: 1-2 sentences on what this interview should focus on."""
+        if profile == "standard":
+            return """For this interview guide, you must:
+
+1. **SECTION 1 - VERIFIED SKILLS**: For each verified skill (score 4+), provide a brief acknowledgment statement. These are NOT counted toward the num_questions target.
+
+2. **SECTION 2 - SKILL GAPS**: For each skill gap, give short reasoning:
+   - **Evidence from Transcript/Feedback**: Quote or cite specific observations
+   - **Question Rationale**: Why this question will reveal true capability
+   
+   Then generate 1-2 targeted questions per gap with what to listen for (3 indicators), red flags (2-3) and follow-up questions (2-3).
+
+3. **SECTION 3 - SKILLS NOT TESTED**: For each skill required by the job but not tested, note its relevance to the role and generate 1 question.
+
+4. **EXECUTIVE SUMMARY**: 2-3 sentences synthesizing the candidate's profile and interview focus areas."""
+        return """For this interview guide, you must:
+
+1. **SECTION 1 - VERIFIED SKILLS**: For each verified skill (score 4+), provide a brief acknowledgment statement. These are NOT counted toward the num_questions target - they are quick confirmations only.
+
+2. **SECTION 2 - SKILL GAPS**: For each skill gap, perform chain-of-thought reasoning:
+   - **Data Observation**: What specific score/evidence do we have?
+   - **Evidence from Transcript/Feedback**: Quote or cite specific observations
+   - **Gap Significance**: Why does this matter for THIS specific role?
+   - **Interview Strategy**: What approach will reveal true capability vs. simulation performance?
+   - **Question Rationale**: Why is this specific question the right one to ask?
+   
+   Then generate 1-2 targeted questions per gap with:
+   - The question text (behavioral/situational)
+   - What to listen for (3 specific indicators)
+   - Red flags (2-3 warning signs)
+   - Follow-up questions (2-3 probing questions)
+
+3. **SECTION 3 - SKILLS NOT TESTED**: For each skill required by the job but not tested in simulation:
+   - **Note**: Acknowledge it wasn't tested
+   - **Relevance to Role**: Why this skill matters for the job
+   - **Question Strategy**: Standard behavioral assessment approach
+   
+   Generate 1 question per untested skill.
+
+4. **EXECUTIVE SUMMARY**: 3-4 sentences synthesizing the candidate's profile and interview focus areas."""
+    
     def _format_evidence(self, evidence: List[Dict]) -> str:
         """Format evaluation evidence for the prompt."""
         if not evidence:
@@ -338,52 +679,75 @@ You MUST respond with valid JSON in this exact format:
         skill_gaps: List[Dict[str, Any]],
         skills_not_tested: List[Dict[str, Any]],
         scenario_type: Optional[str] = None,
-        max_iterations: int = 3
+        max_iterations: int = 3,
+        cancel_token: Optional[CancellationToken] = None,
+        bank_questions: Optional[List[Dict[str, Any]]] = None,
+        skill_gap_details: Optional[List[Dict[str, Any]]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        plan: Optional[GenerationPlan] = None,
+        profile: str = "full",
+        first_result: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Generate interview guide iteratively, calling LLM again if needed to reach target question count.
         
         This approach ensures the LLM generates all required questions rather than using fallback templates.
+        `bank_questions` are merged in after the first call and count toward the target.
+        `plan` overrides the model, token limits and `max_iterations`, and its
+        deadline is split into per-call timeouts: the first call gets
+        GUIDE_FIRST_CALL_SHARE of it when top-ups may follow, each top-up gets
+        what is left. When the budget runs out the loop stops and the partial
+        guide is returned with `remaining_deficit` (raises DeadlineExceeded if
+        even the first call timed out). `profile` caps `max_tokens` and trims
+        the response schemas. A `first_result` (from a packed call) replaces
+        the first call.
         """
-        system_message = """You are an expert interview strategist who uses chain-of-thought reasoning to create highly targeted, evidence-based interview guides. 
-
-Your guides are known for:
-1. Citing specific evidence from evaluation data
-2. Clear reasoning chains that justify each question
-3. Practical, actionable interview guidance
-4. Balancing thorough assessment with time efficiency
-
-You must always respond with valid JSON only, no additional text or markdown."""
+        if plan is not None:
+            max_iterations = plan.max_iterations
+        model = plan.model if plan else model_router.model_for("guide")
+        top_up_model = plan.top_up_model if plan else model_router.model_for("top_up")
+        first_timeout = None
+        if plan is not None:
+            first_timeout = plan.remaining() * (settings.GUIDE_FIRST_CALL_SHARE if max_iterations else 1.0)
+        system_message = _GUIDE_SYSTEM_MESSAGE
 
         # First iteration - generate initial guide
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
+        result = first_result or self._complete_json(
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=6000,
-            temperature=0.7,
-            response_format={"type": "json_object"}
+            max_tokens=guide_profiles.max_tokens(profile, plan.max_tokens_first if plan else 6000, "first"),
+            output=AgenticGuideOutput,
+            profile=profile,
+            cancel_token=cancel_token,
+            model=model,
+            call_type="first",
+            timeout=first_timeout
         )
         
-        content = response.choices[0].message.content
-        if not content:
+        if not result:
             return None
         
-        result = json.loads(content)
+        if bank_questions:
+            with timing.stage("trim_merge"):
+                self._merge_bank_questions(result, bank_questions, skill_gap_details or [])
         current_count = self._count_questions(result)
         logger.info(f"Initial generation: {current_count}/{num_questions} questions")
         
         # If we have more than needed, trim
         if current_count > num_questions:
-            self._trim_questions(result.get("sections", {}), num_questions)
+            with timing.stage("trim_merge"):
+                self._trim_questions(result.get("sections", {}), num_questions)
             return result
         
         # If we have exact count, return
         if current_count == num_questions:
             return result
         
+        if on_progress:
+            on_progress(result)
+        
         # Iteratively generate more questions until we reach the target
         for iteration in range(max_iterations):
             needed = num_questions - self._count_questions(result)
@@ -391,44 +755,306 @@ You must always respond with valid JSON only, no additional text or markdown."""
                 break
             
             logger.info(f"Iteration {iteration + 1}: Need {needed} more questions")
+            top_up_timeout = None
+            if plan is not None:
+                top_up_timeout = plan.remaining()
+                if top_up_timeout < settings.LLM_MIN_CALL_SECONDS:
+                    logger.warning(f"Deadline reached, returning guide {needed} questions short")
+                    plan.mark("deadline_partial")
+                    break
             
             # Build prompt for additional questions
-            additional_prompt = self._build_additional_questions_prompt(
-                candidate_name=candidate_name,
-                role=role,
-                job_description=job_description,
-                skill_gaps=skill_gaps,
-                skills_not_tested=skills_not_tested,
-                existing_questions=self._extract_existing_questions(result),
-                needed=needed,
-                scenario_type=scenario_type
-            )
+            with timing.stage("prompt_build"):
+                additional_prompt = self._build_additional_questions_prompt(
+                    candidate_name=candidate_name,
+                    role=role,
+                    job_description=job_description,
+                    skill_gaps=skill_gaps,
+                    skills_not_tested=skills_not_tested,
+                    existing_questions=self._extract_existing_questions(result),
+                    needed=needed,
+                    scenario_type=scenario_type,
+                    profile=profile
+                )
             
             # Call LLM for additional questions
-            additional_response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": additional_prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
+            try:
+                additional_result = self._complete_json(
+                    messages=[
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": additional_prompt}
+                    ],
+                    max_tokens=guide_profiles.max_tokens(profile, plan.max_tokens_top_up if plan else 4000, "top_up"),
+                    output=AdditionalQuestionsOutput,
+                    profile=profile,
+                    cancel_token=cancel_token,
+                    model=top_up_model,
+                    call_type="top_up",
+                    iteration=iteration + 1,
+                    timeout=top_up_timeout
+                )
+            except DeadlineExceeded:
+                logger.warning(f"Top-up {iteration + 1} timed out, returning guide {needed} questions short")
+                plan.mark("deadline_partial")
+                break
             
-            additional_content = additional_response.choices[0].message.content
-            if additional_content:
-                additional_result = json.loads(additional_content)
-                self._merge_additional_questions(result, additional_result)
+            if additional_result:
+                with timing.stage("trim_merge"):
+                    self._merge_additional_questions(result, additional_result)
                 logger.info(f"After iteration {iteration + 1}: {self._count_questions(result)} questions")
+                if on_progress and self._count_questions(result) < num_questions:
+                    on_progress(result)
         
         # Final trim if we overshot
         final_count = self._count_questions(result)
         if final_count > num_questions:
-            self._trim_questions(result.get("sections", {}), num_questions)
+            with timing.stage("trim_merge"):
+                self._trim_questions(result.get("sections", {}), num_questions)
+        elif final_count < num_questions:
+            result["remaining_deficit"] = num_questions - final_count
         
         return result
     
+    def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        cancel_token: Optional[CancellationToken] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        call_type: str = "first",
+        iteration: int = 0,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Run a JSON-mode chat completion and return the message content.
+        
+        With a cancellation token the response is streamed, and cancelling
+        closes the stream so the provider stops generating (and billing)
+        immediately rather than after the full completion.
+        
+        `call_type` ("first", "top_up", "legacy" or "regenerate") and
+        `iteration` label the latency/token metrics and the LLM ledger entry.
+        
+        `timeout` (seconds) bounds the whole call, streamed or not; running
+        past it raises DeadlineExceeded. `response_format` defaults to JSON mode.
+        """
+        if cancel_token is not None and cancel_token.cancelled:
+            metrics.inc("llm_calls_cancelled_total", {"stage": "pending"})
+            cancel_token.raise_if_cancelled()
+        
+        task = CALL_TYPE_TASKS.get(call_type, call_type)
+        model = model or model_router.model_for(task)
+        response_format = response_format or {"type": "json_object"}
+        started = time.perf_counter()
+        content, usage, outcome = None, None, "ok"
+        try:
+            if cancel_token is None:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format=response_format,
+                    timeout=timeout
+                )
+                usage = getattr(response, "usage", None)
+                content = response.choices[0].message.content
+            else:
+                content, usage = self._stream_completion(messages, max_tokens, cancel_token, model, temperature, timeout, response_format)
+            if not content:
+                outcome = "empty"
+            return content
+        except GenerationCancelled:
+            outcome = "cancelled"
+            raise
+        except DeadlineExceeded:
+            outcome = "timeout"
+            raise
+        except Exception as e:
+            if timeout is not None and _is_timeout(e):
+                outcome = "timeout"
+                raise DeadlineExceeded(f"{call_type} call exceeded {timeout:.1f}s") from e
+            outcome = f"error:{type(e).__name__}"
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            prompt_tokens, completion_tokens = self._usage_tokens(usage)
+            timing.record_llm_call(call_type, latency)
+            metrics.observe("llm_task_duration_seconds", latency, {"task": task, "model": model})
+            cost = call_cost(model, prompt_tokens, completion_tokens)
+            if cost:
+                metrics.inc("llm_task_cost_usd_total", {"task": task, "model": model}, cost)
+            if outcome == "timeout":
+                metrics.inc("llm_calls_timed_out_total", {"call_type": call_type})
+            if outcome != "cancelled":
+                degradation.observe(call_type, model, latency)
+            if prompt_tokens:
+                timing.record_tokens("prompt", call_type, prompt_tokens)
+            if completion_tokens:
+                timing.record_tokens("completion", call_type, completion_tokens)
+            llm_ledger.record(
+                model=model,
+                messages=messages,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency_seconds=latency,
+                call_type=call_type,
+                iteration=iteration,
+                outcome=outcome
+            )
+    
+    def _complete_json(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        output: Optional[Type[BaseModel]] = None,
+        validate: Optional[Callable[[Any], Optional[str]]] = None,
+        model: Optional[str] = None,
+        call_type: str = "first",
+        timeout: Optional[float] = None,
+        profile: str = "full",
+        **kwargs: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run `_create_completion` on the task's routed model and parse the JSON.
+        
+        With an `output` model the call requests that model as a strict JSON
+        schema (LLM_STRUCTURED_OUTPUTS; otherwise the schema goes into the
+        system message) and the response is parsed into it, returned as a
+        dict. With LLM_COMPACT_OUTPUT the schema uses short keys and the
+        response is expanded (see compact_format) before validation. A
+        generation `profile` leaves fields out of the schema; the model's
+        defaults fill them in. Without one, `validate` returns a problem description for
+        unusable JSON-mode output, or None.
+        
+        Output that does not parse or validate is retried once on the
+        escalation model (see model_routing), within the same `timeout`.
+        Returns None for an empty response; raises json.JSONDecodeError or
+        InvalidModelOutput when the output is still unusable.
+        """
+        task = CALL_TYPE_TASKS.get(call_type, call_type)
+        model = model or model_router.model_for(task)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        compact = output is not None and settings.LLM_COMPACT_OUTPUT
+        if output is not None and not settings.LLM_STRUCTURED_OUTPUTS:
+            name, schema = _response_schema(output, profile)
+            schema_text = json.dumps(schema, separators=(",", ":"))
+            messages = [{**messages[0], "content": f"{messages[0]['content']}\n\nJSON schema of the response ({name}):\n{schema_text}"}, *messages[1:]]
+        while True:
+            content = self._create_completion(
+                messages, max_tokens, model=model, call_type=call_type, timeout=timeout,
+                response_format=_response_format(output, profile), **kwargs
+            )
+            if not content:
+                return None
+            try:
+                with timing.stage("json_parse"):
+                    if output is None:
+                        result = json.loads(content)
+                    elif compact:
+                        result = output.model_validate(compact_format.expand(json.loads(content))).model_dump()
+                    else:
+                        result = output.model_validate_json(content).model_dump()
+            except ValidationError as e:
+                error = InvalidModelOutput(f"{task} output from {model} does not match {output.__name__}: {e.error_count()} errors")
+                problem = "schema_error"
+            except json.JSONDecodeError as e:
+                error = e
+                problem = "json_error"
+            else:
+                problem = validate(result) if validate else None
+                if problem is None:
+                    return result
+                error = InvalidModelOutput(f"{task} output from {model}: {problem}")
+            metrics.inc("llm_validation_failures_total", {"task": task, "model": model, "reason": problem})
+            
+            escalate_to = model_router.escalation_for(model)
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout < settings.LLM_MIN_CALL_SECONDS:
+                    escalate_to = None
+            if escalate_to is None:
+                raise error
+            logger.warning(f"Invalid {task} output from {model} ({problem}), retrying on {escalate_to}")
+            metrics.inc("llm_escalations_total", {"task": task, "from_model": model, "to_model": escalate_to})
+            model = escalate_to
+    
+    def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        cancel_token: CancellationToken,
+        model: str,
+        temperature: float,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Any]:
+        """
+        Streamed completion that can be aborted mid-response. Returns (content, usage).
+        
+        The client's `timeout` only bounds each read, so a timer closes the
+        response once the whole call has taken `timeout` seconds.
+        """
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            response_format=response_format or {"type": "json_object"},
+            stream=True,
+            # Ask for a final usage chunk so streamed calls still report tokens
+            extra_body={"stream_options": {"include_usage": True}},
+            timeout=timeout
+        )
+        # Closing the HTTP response from the cancelling thread unblocks the read below
+        unregister = cancel_token.on_cancel(stream.response.close)
+        timed_out = threading.Event()
+        timer = None
+        if timeout is not None:
+            def expire() -> None:
+                timed_out.set()
+                stream.response.close()
+            timer = threading.Timer(max(timeout - (time.perf_counter() - started), 0), expire)
+            timer.daemon = True
+            timer.start()
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                if cancel_token.cancelled or timed_out.is_set():
+                    break
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+        except Exception:
+            if not (cancel_token.cancelled or timed_out.is_set()):
+                raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            unregister()
+            stream.response.close()
+        
+        if timed_out.is_set() and not cancel_token.cancelled:
+            raise DeadlineExceeded(f"stream exceeded {timeout:.1f}s")
+        
+        if cancel_token.cancelled:
+            metrics.inc("llm_calls_cancelled_total", {"stage": "in_flight"})
+            cancel_token.raise_if_cancelled()
+        return "".join(parts), usage
+    
+    def _usage_tokens(self, usage: Any) -> Tuple[Optional[int], Optional[int]]:
+        """(prompt_tokens, completion_tokens) from a response or final stream chunk usage block."""
+        if not usage:
+            return None, None
+        if isinstance(usage, dict):
+            return usage.get("prompt_tokens"), usage.get("completion_tokens")
+        return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    
     def _build_additional_questions_prompt(
         self,
         candidate_name: str,
@@ -438,12 +1064,18 @@ You must always respond with valid JSON only, no additional text or markdown."""
         skills_not_tested: List[Dict[str, Any]],
         existing_questions: List[str],
         needed: int,
-        scenario_type: Optional[str] = None
+        scenario_type: Optional[str] = None,
+        profile: str = "full"
     ) -> str:
         """Build prompt to generate additional questions."""
         gaps_text = self._format_skill_gaps(skill_gaps)
         not_tested_text = self._format_not_tested_skills(skills_not_tested)
         existing_text = "\n".join([f"- {q}" for q in existing_questions]) if existing_questions else "None yet"
+        if profile == "fast":
+            requirements = "4. Include 2-3 things to listen for (no reasoning, red flags or follow-ups)"
+        else:
+            requirements = f"""4. Include what to listen for, red flags, and follow-ups
+5. Include specific reasoning for why this question is important for THIS candidate in the {role} role"""
         
         return f"""You are generating ADDITIONAL interview questions for a candidate using chain-of-thought reasoning.
 
@@ -469,34 +1101,73 @@ Generate EXACTLY {needed} NEW interview questions that:
 1. Are DIFFERENT from the existing questions listed above
 2. Target the skill gaps or untested skills
 3. Use behavioral/situational format (STAR method)
-4. Include what to listen for, red flags, and follow-ups
-5. Include specific reasoning for why this question is important for THIS candidate
+{requirements}
 
-Respond with valid JSON in this format:
-{{
-    "additional_questions": [
-        {{
-            "skill_name": "The skill this question targets",
-            "priority": "high/medium/low",
-            "reasoning": {{
-                "data_observation": "What specific gap or need this question addresses for this candidate",
-                "evidence_from_evaluation": "What evidence or context led to identifying this skill need",
-                "gap_significance": "Why this skill matters for the {role} role specifically",
-                "interview_strategy": "The approach for this question (behavioral/situational/technical)",
-                "question_rationale": "Why this specific question will reveal the candidate's capability"
-            }},
-            "question": {{
-                "question": "The interview question text...",
-                "what_to_listen_for": ["indicator1", "indicator2", "indicator3"],
-                "red_flags": ["warning1", "warning2"],
-                "follow_ups": ["follow_up1", "follow_up2"],
-                "time_estimate": "4-5 minutes"
-            }}
-        }}
-    ]
-}}
-
-Generate EXACTLY {needed} questions with unique, specific reasoning for each. No more, no less."""
+Generate EXACTLY {needed} questions{" with unique, specific reasoning for each" if profile != "fast" else ""}. No more, no less."""
+    
+    def _format_bank_questions(self, bank_questions: List[Dict[str, Any]]) -> str:
+        """Format pre-selected question bank questions for the prompt."""
+        return "\n".join(f"- [{item['skill_name']}] {item['question'].get('question', '')}" for item in bank_questions)
+    
+    def _merge_bank_questions(
+        self,
+        result: Dict[str, Any],
+        bank_questions: List[Dict[str, Any]],
+        skill_gaps: List[Dict[str, Any]]
+    ) -> None:
+        """Place question bank questions under their skill in the LLM's guide, adding sections the LLM left out."""
+        sections = result.setdefault("sections", {})
+        gaps = sections.setdefault("skill_gaps", [])
+        not_tested = sections.setdefault("skills_not_tested", [])
+        gap_details = {g.get("skill_name", "").lower(): g for g in skill_gaps}
+        
+        for item in bank_questions:
+            skill_name = item["skill_name"]
+            if item["kind"] == "not_tested":
+                entry = next((s for s in not_tested if s.get("skill_name", "").lower() == skill_name.lower()), None)
+                if entry is None:
+                    not_tested.append({
+                        "skill_name": skill_name,
+                        "priority": "medium",
+                        "reasoning": {
+                            "note": "This skill was not evaluated in simulation",
+                            "relevance_to_role": f"{skill_name} is required by the job description",
+                            "question_strategy": "Standard behavioral assessment"
+                        },
+                        "question": item["question"]
+                    })
+                elif not entry.get("question"):
+                    entry["question"] = item["question"]
+                continue
+            
+            entry = next((g for g in gaps if g.get("skill_name", "").lower() == skill_name.lower()), None)
+            if entry is None:
+                detail = gap_details.get(skill_name.lower(), {})
+                entry = {
+                    "skill_name": skill_name,
+                    "current_score": detail.get("current_score", 0),
+                    "priority": detail.get("priority", "medium"),
+                    "reasoning": {
+                        "data_observation": f"Scored {detail.get('current_score', 'N/A')}/5 in simulation assessment",
+                        "evidence_from_evaluation": (detail.get("evidence") or "Performance below expected threshold")[:150],
+                        "gap_significance": f"This skill is {detail.get('priority', 'important')} priority for the role",
+                        "interview_strategy": "Behavioral questions to assess real-world application",
+                        "question_rationale": "Proven question for this gap from earlier guides"
+                    },
+                    "questions": []
+                }
+                gaps.append(entry)
+            entry.setdefault("questions", []).append(item["question"])
+    
+    def _record_question_sources(self, result: Dict[str, Any]) -> None:
+        sections = result.get("sections", {})
+        questions = [q for gap in sections.get("skill_gaps", []) for q in gap.get("questions", []) or []]
+        questions += [s.get("question") for s in sections.get("skills_not_tested", []) if s.get("question")]
+        from_bank = sum(1 for q in questions if isinstance(q, dict) and q.get("source") == QUESTION_BANK_SOURCE)
+        if from_bank:
+            metrics.inc("guide_questions_total", {"source": "question_bank"}, from_bank)
+        if len(questions) > from_bank:
+            metrics.inc("guide_questions_total", {"source": "llm"}, len(questions) - from_bank)
     
     def _extract_existing_questions(self, result: Dict[str, Any]) -> List[str]:
         """Extract all existing question texts from a guide result (excludes verified skill acknowledgments)."""
@@ -596,112 +1267,9 @@ Generate EXACTLY {needed} questions with unique, specific reasoning for each. No
         skills_not_tested: List[Dict],
         num_questions: int
     ) -> dict:
-        """Generate mock agentic response for testing without API key."""
+        """Generate mock agentic response for testing without API key (the rule-based draft guide)."""
         logger.info("Generating mock agentic response")
-        
-        # Build verified skills section
-        verified_section = []
-        for skill in verified_skills[:3]:
-            verified_section.append({
-                "skill_name": skill.get('skill_name', 'Unknown Skill'),
-                "score": skill.get('score', 4),
-                "acknowledgment": f"Strong performance in {skill.get('skill_name', 'this skill')} - demonstrated competency in simulation.",
-                "time_estimate": "1 minute"
-            })
-        
-        # Build skill gaps section with reasoning
-        gaps_section = []
-        for gap in skill_gaps[:3]:
-            gaps_section.append({
-                "skill_name": gap.get('skill_name', 'Unknown Skill'),
-                "current_score": gap.get('current_score', 2),
-                "priority": gap.get('priority', 'medium'),
-                "reasoning": {
-                    "data_observation": f"Scored {gap.get('current_score', 2)}/5 in simulation assessment",
-                    "evidence_from_evaluation": gap.get('evidence', 'Performance below expected threshold')[:150],
-                    "gap_significance": f"This skill is {gap.get('priority', 'important')} for the role",
-                    "interview_strategy": "Use behavioral questions to assess real-world application",
-                    "question_rationale": "STAR format questions will help reveal actual experience depth"
-                },
-                "questions": [
-                    {
-                        "question": f"Tell me about a specific situation where you had to apply {gap.get('skill_name', 'this skill')} under pressure. What was the context, and what approach did you take?",
-                        "what_to_listen_for": [
-                            "Specific, detailed example with context",
-                            "Clear problem-solving approach",
-                            "Measurable outcomes or results"
-                        ],
-                        "red_flags": [
-                            "Vague or hypothetical answers",
-                            "Blaming others for failures",
-                            "Cannot articulate specific actions taken"
-                        ],
-                        "follow_ups": [
-                            "What was the outcome?",
-                            "What would you do differently now?",
-                            "How did you measure success?"
-                        ],
-                        "time_estimate": "4-5 minutes"
-                    }
-                ]
-            })
-        
-        # Build not tested section
-        not_tested_section = []
-        for skill in skills_not_tested[:2]:
-            not_tested_section.append({
-                "skill_name": skill.get('skill_name', 'Unknown Skill'),
-                "priority": skill.get('priority', 'medium'),
-                "reasoning": {
-                    "note": "This skill was not evaluated in the simulation",
-                    "relevance_to_role": "This skill is required based on job description",
-                    "question_strategy": "Standard behavioral assessment approach"
-                },
-                "question": {
-                    "question": f"Describe a time when you had to demonstrate {skill.get('skill_name', 'this skill')} in a professional setting.",
-                    "what_to_listen_for": [
-                        "Clear understanding of the skill",
-                        "Relevant experience examples",
-                        "Positive outcomes"
-                    ],
-                    "red_flags": [
-                        "No relevant experience",
-                        "Misunderstanding of skill requirements"
-                    ],
-                    "follow_ups": [
-                        "How did you develop this skill?",
-                        "What challenges did you face?"
-                    ],
-                    "time_estimate": "4-5 minutes"
-                }
-            })
-        
-        gap_names = [g.get('skill_name', 'key area') for g in skill_gaps[:2]]
-        
-        return {
-            "executive_summary": f"{candidate_name} demonstrated mixed performance in the simulation assessment. Strong performance was noted in verified skill areas, while gaps in {', '.join(gap_names) if gap_names else 'certain areas'} warrant deeper exploration during the interview. Focus on behavioral questions to distinguish between simulation performance and actual capability.",
-            "interview_duration_estimate": "30-40 minutes",
-            "sections": {
-                "verified_skills": verified_section,
-                "skill_gaps": gaps_section,
-                "skills_not_tested": not_tested_section
-            },
-            "overall_red_flags": [
-                f"Performance gaps in {gap_names[0]}" if gap_names else "Limited simulation data",
-                "Verify depth of practical experience",
-                "Assess learning agility and adaptability"
-            ],
-            "overall_strengths": [
-                "Completed simulation assessment",
-                "Demonstrated engagement with evaluation process",
-                "Shows willingness to be assessed"
-            ],
-            "interview_tips": [
-                "Start with verified skills to build rapport before probing gaps",
-                "Use silence after questions to encourage elaboration",
-                "Take notes on specific examples provided for reference checks"
-            ]
-        }
+        return draft_engine.generate(candidate_name, verified_skills, skill_gaps, skills_not_tested, num_questions)
     
     def generate_interview_questions(
         self,
@@ -717,8 +1285,9 @@ Generate EXACTLY {needed} questions with unique, specific reasoning for each. No
         """Generate personalized interview questions based on simulation results (legacy method)."""
         
         # Check if we have an API key
-        if not settings.OPENAI_API_KEY:
+        if not self.available:
             logger.warning("OPENAI_API_KEY not set - returning mock data")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "legacy_guide", "reason": "no_api_key"})
             return self._get_mock_response(candidate_name, skill_gaps, num_questions)
         
         # Format skill gaps for the prompt
@@ -797,8 +1366,7 @@ You MUST respond with valid JSON in this exact format:
         try:
             logger.info(f"Calling OpenAI API for candidate: {candidate_name}")
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
+            result = self._complete_json(
                 messages=[
                     {
                         "role": "system",
@@ -810,30 +1378,60 @@ You MUST respond with valid JSON in this exact format:
                     }
                 ],
                 max_tokens=4096,
-                temperature=0.7,
-                response_format={"type": "json_object"}
+                validate=_legacy_problem,
+                call_type="legacy"
             )
             
-            # Parse JSON from response
-            content = response.choices[0].message.content
-            logger.info(f"OpenAI API response received, length: {len(content) if content else 0}")
-            
-            if content:
-                result = json.loads(content)
+            if result:
                 logger.info(f"Successfully generated {len(result.get('questions', []))} questions")
                 return result
             else:
                 logger.error("OpenAI returned empty content")
+                metrics.inc("llm_mock_fallbacks_total", {"endpoint": "legacy_guide", "reason": "empty_response"})
                 return self._get_mock_response(candidate_name, skill_gaps, num_questions)
                 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, InvalidModelOutput) as e:
             logger.error(f"JSON parsing error: {e}")
-            logger.error(f"Raw content: {content[:500] if content else 'None'}")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "legacy_guide", "reason": "json_error"})
             return self._get_mock_response(candidate_name, skill_gaps, num_questions)
         except Exception as e:
             logger.error(f"OpenAI API Error: {type(e).__name__}: {e}")
+            metrics.inc("llm_mock_fallbacks_total", {"endpoint": "legacy_guide", "reason": "api_error"})
             return self._get_mock_response(candidate_name, skill_gaps, num_questions)
     
+    def regenerate_question(
+        self,
+        original_question: str,
+        skill_name: str,
+        instruction: Optional[str] = None,
+        candidate_context: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Regenerate a single interview question. Raises on API or JSON errors."""
+        prompt = f"""You are an expert interview question designer. Regenerate the following interview question to make it more effective.
+
+Original Question: "{original_question}"
+Target Skill: {skill_name}
+{f"Additional Instructions: {instruction}" if instruction else ""}
+{f"Candidate Context: {candidate_context}" if candidate_context else ""}
+
+Generate a NEW, IMPROVED interview question that:
+1. Better assesses the target skill
+2. Uses behavioral/situational format (STAR method)
+3. Is clear and specific
+4. Encourages detailed responses
+
+Respond with JSON following the response schema."""
+
+        return self._complete_json(
+            messages=[
+                {"role": "system", "content": "You are an expert interview coach. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1000,
+            output=GuideQuestion,
+            call_type="regenerate"
+        )
+    
     def _get_mock_response(self, candidate_name: str, skill_gaps: List[SkillGap], num_questions: int) -> dict:
         """Generate mock response for testing without API key."""
         logger.info("Generating mock response")
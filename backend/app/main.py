@@ -1,12 +1,43 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp
+
+from .compression import CompressionMiddleware
+from .config import settings
+from .database import warm_up
+from .executors import request_threadpool
+from .llm_ledger import llm_ledger
+from .metrics import metrics
+from .routes import evaluations, generation_jobs
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings.log_summary()
+    request_threadpool.configure()
+    if settings.DB_WARMUP_CONNECTIONS > 0:
+        try:
+            await run_in_threadpool(warm_up, settings.DB_WARMUP_CONNECTIONS)
+        except Exception as e:
+            # Serve anyway: connections are opened on demand as usual
+            logger.error(f"Database warm-up failed: {e}")
+    yield
 
-from .routes import evaluations
 
 app = FastAPI(
     title="Interview Guide Generator",
     description="AI-powered interview question generator based on Skillfully simulation results",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend
@@ -18,8 +49,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def _compression(app: ASGIApp) -> ASGIApp:
+    """CompressionMiddleware as configured; built with the middleware stack on the first request."""
+    if not settings.COMPRESSION_ENABLED:
+        return app
+    return CompressionMiddleware(
+        app,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_enabled=settings.COMPRESSION_BROTLI_ENABLED,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        sse_mode=settings.COMPRESSION_SSE_MODE,
+    )
+
+
+# Compress JSON listings/guides; SSE streams are flushed per event
+app.add_middleware(_compression)
+
 # Include routers
 app.include_router(evaluations.router, prefix="/api")
+app.include_router(generation_jobs.router, prefix="/api")
 
 
 @app.get("/")
@@ -34,3 +84,16 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus metrics in text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/llm-report")
+def llm_report(since_hours: Optional[float] = None):
+    """LLM ledger summary: latency percentiles, tokens per guide and cost per campaign."""
+    since = time.time() - since_hours * 3600 if since_hours else None
+    return llm_ledger.report(since)
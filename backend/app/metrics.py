@@ -0,0 +1,147 @@
+"""In-process metrics registry rendered in Prometheus text format."""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+GaugeSamples = List[Tuple[Dict[str, str], float]]
+
+# Latency buckets (seconds) spanning DB lookups through multi-call LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_bucket(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[LabelSet, _Histogram]] = defaultdict(dict)
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self._help: Dict[str, str] = {}
+        self._gauges: Dict[str, Callable[[], GaugeSamples]] = {}
+
+    def describe(self, name: str, help_text: str, buckets: Optional[Sequence[float]] = None) -> None:
+        """Set the HELP text; pass `buckets` to declare a histogram with non-default buckets."""
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = tuple(sorted(buckets))
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], GaugeSamples]) -> None:
+        """Register a gauge whose (labels, value) samples are read from `collect` at render time."""
+        self._help[name] = help_text
+        self._gauges[name] = collect
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name][_label_key(labels)] += value
+
+    def get(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            if key not in series:
+                series[key] = _Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, labels: Optional[Dict[str, str]] = None) -> Iterator[None]:
+        """Observe the wall time of the block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def histogram_count(self, name: str, labels: Optional[Dict[str, str]] = None) -> int:
+        with self._lock:
+            series = self._histograms.get(name, {}).get(_label_key(labels))
+            return series.count if series else 0
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_bucket(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+            gauges = sorted(self._gauges.items())
+        # Collected outside the lock: callbacks may take their own locks
+        for name, collect in gauges:
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(collect(), key=lambda sample: _label_key(sample[0])):
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# Create singleton instance
+metrics = MetricsRegistry()
+
+metrics.describe("guide_generations_cancelled_total", "Guide generation requests cancelled before finishing")
+metrics.describe("guide_sessions_cancelled_total", "Candidate sessions skipped or aborted because the request was cancelled")
+metrics.describe("llm_calls_cancelled_total", "LLM calls aborted in flight or before being sent")
+metrics.describe("llm_calls_timed_out_total", "LLM calls aborted because they ran past their share of the guide deadline")
+metrics.describe("guide_stage_duration_seconds", "Time spent in each guide generation pipeline stage")
+metrics.describe("llm_call_duration_seconds", "LLM call latency by call type (first guide call vs top-up iterations)")
+metrics.describe("llm_tokens_total", "Tokens reported by the LLM provider")
+metrics.describe("llm_mock_fallbacks_total", "Generations that fell back to mock output instead of LLM results")
+metrics.describe("guide_packed_calls_total", "First guide calls shared by several candidates of a packed batch")
+metrics.describe("guide_packed_candidates_total", "Candidates sent in packed guide calls")
+metrics.describe("guide_packed_fallbacks_total", "Candidates of a packed call generated individually instead, by reason")
+metrics.describe("cache_requests_total", "Lookups in response caches (idempotency store, single-flight) by result")
+metrics.describe("db_pool_wait_seconds", "Time spent waiting to check a connection out of the database pool")
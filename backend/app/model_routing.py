@@ -0,0 +1,63 @@
+"""
+Per-task model routing for LLM calls.
+
+Each kind of call (task) runs on its own model:
+
+- guide: first call of an agentic guide, or of a packed batch of guides (LLM_MODEL)
+- top_up: follow-up calls for missing guide questions (LLM_FAST_MODEL)
+- regenerate: single-question rewrites (LLM_FAST_MODEL)
+- legacy_guide: the legacy /generate-guide questions (LLM_MODEL)
+
+LLM_ROUTES overrides any of these. When a cheaper model's output does not
+parse or fails validation, the call is retried once on LLM_ESCALATION_MODEL
+(LLM_MODEL by default).
+"""
+
+from typing import Dict, Optional
+
+from .config import settings
+from .metrics import metrics
+
+TASKS = ("guide", "top_up", "regenerate", "legacy_guide")
+SMALL_TASKS = {"top_up", "regenerate"}  # Default to the fast model
+
+# `call_type` label of LLM calls -> routing task
+CALL_TYPE_TASKS = {
+    "first": "guide",
+    "packed": "guide",
+    "top_up": "top_up",
+    "regenerate": "regenerate",
+    "legacy": "legacy_guide",
+}
+
+
+class InvalidModelOutput(ValueError):
+    """LLM output that parsed but does not have the structure the task needs."""
+
+
+class ModelRouter:
+    def model_for(self, task: str) -> str:
+        """Model a task runs on before any escalation."""
+        routed = settings.LLM_ROUTES.get(task)
+        if routed:
+            return routed
+        return settings.LLM_FAST_MODEL if task in SMALL_TASKS else settings.LLM_MODEL
+
+    def routes(self) -> Dict[str, str]:
+        return {task: self.model_for(task) for task in TASKS}
+
+    def escalation_for(self, model: str) -> Optional[str]:
+        """Model to retry invalid output on, or None when `model` already is it."""
+        if not settings.LLM_ESCALATION_ENABLED:
+            return None
+        target = settings.LLM_ESCALATION_MODEL or settings.LLM_MODEL
+        return target if target != model else None
+
+
+# Create singleton instance
+model_router = ModelRouter()
+
+metrics.describe("llm_task_duration_seconds", "LLM call latency by routing task and model")
+metrics.describe("llm_task_cost_usd_total", "Estimated LLM spend (LLM_PRICES) by routing task and model")
+metrics.describe("llm_validation_failures_total", "LLM outputs that did not parse or failed validation, by task, model and reason")
+metrics.describe("llm_escalations_total", "Calls retried on the escalation model after invalid output, by task")
@@ -0,0 +1,253 @@
+"""
+Question bank (local SQLite) filled from generated guides.
+
+Candidates in one campaign tend to share skill gaps at similar severities.
+Questions the LLM wrote for earlier guides are stored under (skill, gap
+severity, scenario type, role). A new guide retrieves matching questions
+first, so the LLM only writes the personalized reasoning plus any coverage
+the bank is missing.
+
+Harvested questions are written for one candidate and may quote their
+evidence, so they are stored as `pending` and only served once a reviewer
+approves them (`python -m app.question_bank pending|approve|reject`).
+Regenerating a question marks the original as rejected, and it is never
+served again.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question_hash TEXT NOT NULL UNIQUE,  -- skill + normalized question text
+    skill TEXT NOT NULL,                 -- lower-cased skill name
+    severity TEXT NOT NULL,              -- minor, moderate, significant, not_tested
+    scenario_type TEXT NOT NULL DEFAULT '',
+    role TEXT NOT NULL DEFAULT '',
+    question TEXT NOT NULL,              -- question object as JSON
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, approved, rejected (pre-review rows: active, never served)
+    served INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_served_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS ix_questions_lookup ON questions(skill, severity, status);
+"""
+
+SOURCE = "question_bank"  # `source` tag on questions served from the bank
+NOT_TESTED = "not_tested"
+
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def question_hash(skill_name: str, question_text: str) -> str:
+    return hashlib.sha256(f"{_normalize(skill_name)}|{_normalize(question_text)}".encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._initialized = False
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or settings.QUESTION_BANK_DB_PATH
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def retrieve(
+        self,
+        skill_gaps: List[Dict[str, Any]],
+        skills_not_tested: List[Dict[str, Any]],
+        role: Optional[str],
+        scenario_type: Optional[str],
+        budget: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Pick up to `budget` approved questions for the guide's gaps (at most
+        QUESTION_BANK_MAX_PER_SKILL per gap, one per untested skill). Matches
+        for the same role and scenario type come first, then the least-served.
+
+        Returns [{"skill_name", "kind" ("gap"/"not_tested"), "question"}].
+        """
+        if not settings.QUESTION_BANK_ENABLED or budget <= 0:
+            return []
+        wanted = [(gap.get("skill_name", ""), gap.get("gap_severity", "moderate"), "gap", settings.QUESTION_BANK_MAX_PER_SKILL) for gap in skill_gaps]
+        wanted += [(skill.get("skill_name", ""), NOT_TESTED, "not_tested", 1) for skill in skills_not_tested]
+        role_key, scenario_key = _normalize(role), _normalize(scenario_type)
+
+        picked, picked_ids = [], []
+        try:
+            with self._connect() as conn:
+                for skill_name, severity, kind, per_skill in wanted:
+                    limit = min(per_skill, budget - len(picked))
+                    if limit <= 0:
+                        break
+                    rows = conn.execute(
+                        """
+                        SELECT id, question FROM questions
+                        WHERE skill = ? AND severity = ? AND status = 'approved' AND scenario_type IN (?, '')
+                        ORDER BY role = ? DESC, scenario_type = ? DESC, served, id
+                        LIMIT ?
+                        """,
+                        (_normalize(skill_name), severity, scenario_key, role_key, scenario_key, limit)
+                    ).fetchall()
+                    for row in rows:
+                        picked_ids.append(row["id"])
+                        picked.append({
+                            "skill_name": skill_name,
+                            "kind": kind,
+                            "question": {**json.loads(row["question"]), "source": SOURCE}
+                        })
+                if picked_ids:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute(
+                        f"UPDATE questions SET served = served + 1, last_served_at = ? WHERE id IN ({', '.join('?' for _ in picked_ids)})",
+                        (time.time(), *picked_ids)
+                    )
+                    conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Question bank lookup failed, generating all questions: {e}")
+            return []
+
+        metrics.inc("cache_requests_total", {"cache": "question_bank", "result": "hit" if picked else "miss"})
+        return picked
+
+    def add_from_guide(
+        self,
+        guide: Dict[str, Any],
+        skill_gaps: List[Dict[str, Any]],
+        skills_not_tested: List[Dict[str, Any]],
+        role: Optional[str],
+        scenario_type: Optional[str]
+    ) -> int:
+        """
+        Store the LLM-written questions of a finished guide as `pending`, for
+        review. Returns how many were new; a question already in the bank
+        (same skill and text, in any status) is not added again.
+        """
+        if not settings.QUESTION_BANK_ENABLED:
+            return 0
+        severities = {_normalize(gap.get("skill_name")): gap.get("gap_severity", "moderate") for gap in skill_gaps}
+        severities.update({_normalize(skill.get("skill_name")): NOT_TESTED for skill in skills_not_tested})
+
+        sections = guide.get("sections", {})
+        entries = [(gap.get("skill_name"), q) for gap in sections.get("skill_gaps", []) for q in gap.get("questions", []) or []]
+        entries += [(skill.get("skill_name"), skill.get("question")) for skill in sections.get("skills_not_tested", [])]
+
+        now = time.time()
+        rows = []
+        for skill_name, question in entries:
+            severity = severities.get(_normalize(skill_name))
+            # Skip bank questions, malformed items and skills outside this candidate's gaps
+            if not isinstance(question, dict) or not question.get("question") or question.get("source") == SOURCE or severity is None:
+                continue
+            rows.append((
+                question_hash(skill_name, question["question"]), _normalize(skill_name), severity,
+                _normalize(scenario_type), _normalize(role), json.dumps(question), now
+            ))
+        if not rows:
+            return 0
+        try:
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO questions (question_hash, skill, severity, scenario_type, role, question, status, created_at) VALUES (?, ?, ?, ?, ?, ?, 'pending', ?)",
+                    rows
+                )
+                added = conn.total_changes - before
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not add questions to the question bank: {e}")
+            return 0
+        return added
+
+    def pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Questions awaiting review, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, skill, severity, scenario_type, role, question FROM questions WHERE status IN ('pending', 'active') ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [{**dict(row), "question": json.loads(row["question"])} for row in rows]
+
+    def review(self, question_id: int, approved: bool) -> bool:
+        """Approve (start serving) or reject a stored question. Returns whether it exists."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE questions SET status = ? WHERE id = ?",
+                ("approved" if approved else "rejected", question_id)
+            )
+        return cursor.rowcount > 0
+
+    def reject(self, skill_name: str, question_text: str) -> bool:
+        """Stop serving a question (e.g. a recruiter regenerated it). Returns whether it was in the bank."""
+        if not settings.QUESTION_BANK_ENABLED:
+            return False
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "UPDATE questions SET status = 'rejected' WHERE question_hash = ?",
+                    (question_hash(skill_name, question_text),)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not reject question in the question bank: {e}")
+            return False
+        return cursor.rowcount > 0
+
+
+# Create singleton instance
+question_bank = QuestionBank()
+
+metrics.describe("guide_questions_total", "Questions in generated guides by source (question bank or LLM)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Review harvested question bank entries")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("pending", help="List questions awaiting review")
+    listing.add_argument("--limit", type=int, default=50)
+    for name in ("approve", "reject"):
+        commands.add_parser(name, help=f"{name.title()} questions by id").add_argument("ids", type=int, nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "pending":
+        for entry in question_bank.pending(args.limit):
+            print(f"{entry['id']}\t{entry['skill']}\t{entry['severity']}\t{entry['question'].get('question')}")
+        return
+    for question_id in args.ids:
+        if not question_bank.review(question_id, approved=args.command == "approve"):
+            print(f"No question with id {question_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,51 @@
 """Routes for fetching evaluation data from existing Skillfully database."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Header, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, distinct
-from typing import List, Optional, Dict, Generator
+from typing import Any, Callable, List, Literal, Optional, Dict
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import copy
 import json
 import asyncio
+import time
+import uuid
 
-from ..database import get_db
+from ..admission import guide_admission, regenerate_admission
+from ..cancellation import CancellationToken, GenerationCancelled
+from ..config import settings
+from ..database import get_db, SessionLocal
+from ..degradation import GenerationPlan, degradation
+from ..draft_engine import draft_engine
+from ..executors import llm_executor
+from ..idempotency import idempotency_store
 from ..models_existing import Evaluation, EvaluationFeedback, EvaluationVoiceElsa, SkillsMap
+from ..llm_ledger import llm_ledger
 from ..llm_service import llm_service
+from ..metrics import metrics
+from ..question_bank import question_bank
+from .. import timing
 from ..schemas import SkillGap
+from ..singleflight import guide_flights, input_key
+from ..stream_runs import StreamRun, stream_runs, format_sse, parse_last_event_id
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records body serialization time."""
+
+    def render(self, content) -> bytes:
+        with timing.stage("serialization"):
+            return super().render(content)
 
-router = APIRouter(prefix="/evaluations", tags=["evaluations"])
+
+router = APIRouter(
+    prefix="/evaluations",
+    tags=["evaluations"],
+    default_response_class=TimedJSONResponse,
+    route_class=timing.ServerTimingRoute
+)
 
 
 # ============================================================================
@@ -35,6 +65,10 @@ class AgenticGuideRequest(BaseModel):
     custom_instructions: Optional[str] = None  # Global instructions for all
     per_candidate_instructions: Optional[Dict[str, str]] = None  # session_id -> instruction
     num_questions: int = 8
+    mode: Literal["llm", "draft"] = "llm"  # draft = rule-based guide in milliseconds, no LLM
+    deadline_seconds: Optional[float] = Field(None, gt=0)  # Per-guide deadline (defaults to GUIDE_DEADLINE_SECONDS)
+    profile: Literal["full", "standard", "fast"] = "full"  # fast = questions and what to listen for only
+    pack: bool = False  # Share first LLM calls between small-evidence candidates (non-streaming endpoint only)
 
 
 # ============================================================================
@@ -114,18 +148,9 @@ def get_campaign_candidates(
             ).all()
             
             for ev in evals:
-                score = None
-                if ev.result and isinstance(ev.result, dict):
-                    score = ev.result.get('score') or ev.result.get('overall_score') or ev.result.get('rating')
-                    if isinstance(score, str) and '/' in score:
-                        try:
-                            num, denom = score.split('/')
-                            score = float(num) / float(denom) * 5
-                        except:
-                            score = None
                 skill_scores.append({
                     "skill": ev.skill,
-                    "score": float(score) if score is not None else None
+                    "score": _parse_result_score(ev.result)
                 })
         
         # Calculate average score
@@ -149,6 +174,23 @@ def get_campaign_candidates(
     return results
 
 
+def _parse_result_score(result) -> Optional[float]:
+    """Extract a 0-5 score from an evaluation result ("3/5" style scores are normalized)."""
+    score = None
+    if result and isinstance(result, dict):
+        score = result.get('score') or result.get('overall_score') or result.get('rating')
+        if isinstance(score, str) and '/' in score:
+            try:
+                num, denom = score.split('/')
+                score = float(num) / float(denom) * 5
+            except:
+                score = None
+    try:
+        return float(score) if score is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 # ============================================================================
 # Skills Endpoint
 # ============================================================================
@@ -173,9 +215,11 @@ def get_all_skills(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/generate-agentic-guide")
-def generate_agentic_guide(
+async def generate_agentic_guide(
     request: AgenticGuideRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Generate agentic interview guides with chain-of-thought reasoning.
@@ -186,44 +230,54 @@ def generate_agentic_guide(
     - required_skills: List of skills with priority and min_score
     - custom_instructions: Optional additional context for generation
     - num_questions: Number of questions to generate per candidate
+    - mode: "llm" (default) or "draft" for an instant rule-based guide
+    - deadline_seconds: Per-guide time budget; slow LLM latency degrades to
+      cheaper strategies, flagged as `degraded` in each guide's metadata
+    - profile: "full" (default), "standard" (shorter reasoning, no tips or
+      time estimates) or "fast" (questions and what to listen for only)
+    - pack: Generate small-evidence candidates several to an LLM call,
+      sending the job description and instructions once per call
+    
+    If the client disconnects, remaining and in-flight generation is cancelled.
+    With an `Idempotency-Key` header the generation instead runs to completion,
+    and retries with the same key wait for or replay the original response.
+    
+    Returns 429 with `Retry-After` when guide generation is at capacity.
     """
     
-    results = []
+    if idempotency_key:
+        async def generate() -> dict:
+            async with guide_admission.slot():
+                results = await llm_executor.run(_in_session, _generate_guides_batch, request, cancel_token=CancellationToken())
+            return _agentic_guide_response(request, results)
+        
+        body, replayed = await idempotency_store.run("generate-agentic-guide", idempotency_key, request.model_dump(), generate)
+        _mark_replayed(response, replayed)
+        return body
     
-    for session_id in request.session_ids:
-        try:
-            # Combine global instructions with per-candidate instructions
-            combined_instructions = request.custom_instructions or ""
-            if request.per_candidate_instructions and session_id in request.per_candidate_instructions:
-                candidate_instruction = request.per_candidate_instructions[session_id]
-                if candidate_instruction:
-                    if combined_instructions:
-                        combined_instructions = f"{combined_instructions}\n\n[Candidate-Specific Instructions]: {candidate_instruction}"
-                    else:
-                        combined_instructions = f"[Candidate-Specific Instructions]: {candidate_instruction}"
-            
-            guide = _generate_single_agentic_guide(
-                session_id=session_id,
-                job_description=request.job_description,
-                required_skills=request.required_skills,
-                custom_instructions=combined_instructions if combined_instructions else None,
-                num_questions=request.num_questions,
-                db=db
-            )
-            results.append(guide)
-        except HTTPException as e:
-            results.append({
-                "session_id": session_id,
-                "error": e.detail,
-                "success": False
-            })
-        except Exception as e:
-            results.append({
-                "session_id": session_id,
-                "error": str(e),
-                "success": False
-            })
+    async with guide_admission.slot():
+        cancel_token = CancellationToken()
+        work = asyncio.ensure_future(llm_executor.run(_in_session, _generate_guides_batch, request, cancel_token=cancel_token))
+        await _cancel_on_disconnect(http_request, work, cancel_token)
+        results = await work
     
+    return _agentic_guide_response(request, results)
+
+
+def _in_session(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call `fn(*args, db=..., **kwargs)` with a database session of its own.
+    Generation endpoints open it once admitted, rather than through `get_db`,
+    so requests that are queued or waiting on an Idempotency-Key hold none.
+    """
+    db = SessionLocal()
+    try:
+        return fn(*args, db=db, **kwargs)
+    finally:
+        db.close()
+
+
+def _agentic_guide_response(request: AgenticGuideRequest, results: List[dict]) -> dict:
     return {
         "generated_at": datetime.utcnow().isoformat(),
         "job_description_provided": bool(request.job_description),
@@ -233,277 +287,225 @@ def generate_agentic_guide(
     }
 
 
+def _mark_replayed(response: Response, replayed: bool) -> None:
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+
+
+@llm_ledger.context(endpoint="generate-agentic-guide")
+def _generate_guides_batch(
+    request: AgenticGuideRequest,
+    db: Session,
+    cancel_token: CancellationToken
+) -> List[dict]:
+    """
+    Generate guides for every session in order, stopping early once cancelled.
+    
+    With `pack`, small-evidence sessions are generated first, in packed LLM
+    calls; the rest go through the usual one-guide path, reusing the
+    classifications packing already made. Guides finished before a
+    cancellation are still returned.
+    """
+    results = []
+    classified = {}
+    finished = {}
+    
+    try:
+        if request.pack:
+            _generate_packed_guides(request, db, cancel_token, classified, finished)
+        for session_id in request.session_ids:
+            cancel_token.raise_if_cancelled()
+            results.append(finished.get(session_id) or _generate_guide_result(
+                request, session_id, db, cancel_token=cancel_token, candidate=classified.get(session_id)
+            ))
+    except GenerationCancelled:
+        remaining = [sid for sid in request.session_ids[len(results):] if sid not in finished]
+        metrics.inc("guide_generations_cancelled_total", {"endpoint": "batch", "reason": cancel_token.reason})
+        metrics.inc("guide_sessions_cancelled_total", {"endpoint": "batch"}, len(remaining))
+        results.extend(
+            finished.get(sid) or {"session_id": sid, "error": "Cancelled", "success": False, "cancelled": True}
+            for sid in request.session_ids[len(results):]
+        )
+    
+    return results
+
+
+def _generate_packed_guides(
+    request: AgenticGuideRequest,
+    db: Session,
+    cancel_token: CancellationToken,
+    classified: Dict[str, dict],
+    finished: Dict[str, dict]
+) -> None:
+    """
+    Guides for the request's small-evidence sessions (GUIDE_PACK_MAX_EVIDENCE_CHARS),
+    up to GUIDE_PACK_MAX_CANDIDATES per first LLM call. Sessions with their own
+    instructions or larger evidence are left for the one-guide path.
+
+    Fills `classified` with each session's classification and `finished` with
+    its result entry (a packed guide, or the error for a session that failed
+    to load) as it goes, so both survive a cancellation.
+    """
+    if request.mode != "llm" or not llm_service.available:
+        return
+    
+    candidates = []
+    for session_id in dict.fromkeys(request.session_ids):
+        if _combine_instructions(request, session_id) != (request.custom_instructions or None):
+            continue
+        try:
+            candidate = _classify_session(session_id, request.required_skills, db)
+        except HTTPException as e:
+            finished[session_id] = {"session_id": session_id, "error": e.detail, "success": False}
+            continue
+        classified[session_id] = candidate
+        if llm_service.can_pack(candidate["evaluation_evidence"]):
+            candidates.append((session_id, candidate))
+    if len(candidates) < 2:
+        return
+    
+    # Even pack sizes, so no candidate is left alone in a pack of one
+    pack_count = -(-len(candidates) // max(settings.GUIDE_PACK_MAX_CANDIDATES, 2))
+    for n in range(pack_count):
+        cancel_token.raise_if_cancelled()
+        pack = candidates[n * len(candidates) // pack_count:(n + 1) * len(candidates) // pack_count]
+        plans = {session_id: degradation.plan(request.deadline_seconds, request.mode) for session_id, _ in pack}
+        with llm_ledger.context(campaign_id=pack[0][1]["campaign_id"]):
+            guides = llm_service.generate_packed_agentic_guides(
+                [{"session_id": session_id, "plan": plans[session_id], **_guide_args(candidate)} for session_id, candidate in pack],
+                job_description=request.job_description,
+                custom_instructions=request.custom_instructions,
+                num_questions=request.num_questions,
+                cancel_token=cancel_token,
+                profile=request.profile
+            )
+        for session_id, candidate in pack:
+            finished[session_id] = _agentic_guide_entry(
+                session_id, candidate, guides[session_id], plans[session_id],
+                request.custom_instructions, request.mode, request.profile, packed=True
+            )
+
+
+async def _cancel_on_disconnect(http_request: Request, work: asyncio.Future, cancel_token: CancellationToken) -> None:
+    """Wait for `work`, cancelling its token if the client goes away first."""
+    while not work.done():
+        done, _ = await asyncio.wait({work}, timeout=settings.DISCONNECT_POLL_SECONDS)
+        if not done and await http_request.is_disconnected():
+            cancel_token.cancel("client_disconnect")
+            return
+
+
 # ============================================================================
 # Streaming Agentic Guide Generation Endpoint (SSE)
 # ============================================================================
 
 @router.post("/generate-agentic-guide-stream")
-async def generate_agentic_guide_stream(
-    request: AgenticGuideRequest,
-    db: Session = Depends(get_db)
-):
+async def generate_agentic_guide_stream(request: AgenticGuideRequest):
     """
     Generate agentic interview guides with real-time progress streaming via SSE.
     
     Emits events for each step:
+    - run: Run ID to resume this stream with after a dropped connection
     - step: Current progress step with message
+    - draft: An instant rule-based guide for a candidate, right after classification
+    - upgrade: Guide fields to replace in that draft as LLM output arrives;
+      `replace` maps dotted paths such as `sections.skill_gaps` to new values
+      (null removes a draft-only field), `final` marks the last one
+    - result: A finished candidate's guide
     - complete: Final result with all generated guides
     - error: Any errors that occurred
-    """
     
-    def sse_event(event_type: str, data: dict) -> str:
-        """Format data as an SSE event."""
-        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    Generation runs server-side independently of the connection. Every event
+    carries an SSE `id`; reconnect to `/generate-agentic-guide-stream/{run_id}`
+    with a `Last-Event-ID` header to replay missed events and keep following.
+    If nobody reattaches within STREAM_DISCONNECT_GRACE_SECONDS the run is
+    cancelled and its pending LLM work is dropped (emits `cancelled`).
     
-    def generate_events() -> Generator[str, None, None]:
-        """Generator that yields SSE events as processing progresses."""
-        results = []
-        total_candidates = len(request.session_ids)
-        
-        for idx, session_id in enumerate(request.session_ids):
-            candidate_num = idx + 1
-            
+    Returns 429 with `Retry-After` when guide generation is at capacity; an
+    admitted run holds its slot until generation finishes.
+    """
+    granted_at = await guide_admission.acquire()
+    run = stream_runs.create()
+    run.publish("run", {
+        "run_id": run.run_id,
+        "resume_url": f"{router.prefix}/generate-agentic-guide-stream/{run.run_id}"
+    })
+    work = llm_executor.submit(_run_guide_stream, run, request)
+    work.add_done_callback(lambda _: guide_admission.release(granted_at))
+    return _stream_run_response(run, last_event_id=0)
+
+
+@router.get("/generate-agentic-guide-stream/{run_id}")
+async def resume_agentic_guide_stream(
+    run_id: str,
+    last_event_id: Optional[str] = Header(None)
+):
+    """Reattach to a stream run, replaying events after `Last-Event-ID`."""
+    run = stream_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Stream run not found or expired")
+    return _stream_run_response(run, last_event_id=parse_last_event_id(last_event_id))
+
+
+@router.post("/generate-agentic-guide-stream/{run_id}/cancel")
+def cancel_agentic_guide_stream(run_id: str):
+    """Explicitly cancel a stream run, aborting in-flight LLM calls."""
+    run = stream_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Stream run not found or expired")
+    if run.done:
+        raise HTTPException(status_code=409, detail="Stream run already finished")
+    run.cancel_token.cancel("client_request")
+    return {"run_id": run_id, "cancelled": True}
+
+
+def _stream_run_response(run: StreamRun, last_event_id: int) -> StreamingResponse:
+    async def event_stream():
+        async for seq, event_type, data in run.subscribe(last_event_id):
+            yield format_sse(seq, event_type, data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+            "X-Run-ID": run.run_id
+        }
+    )
+
+
+@llm_ledger.context(endpoint="generate-agentic-guide-stream")
+def _run_guide_stream(run: StreamRun, request: AgenticGuideRequest) -> None:
+    """Generation thread for a stream run - publishes progress events into the run's buffer."""
+    db = SessionLocal()
+    try:
+        _publish_guide_stream(run, request, db)
+    except Exception as e:
+        run.publish("error", {"error": str(e)})
+    finally:
+        db.close()
+        run.finish()
+
+
+def _publish_guide_stream(run: StreamRun, request: AgenticGuideRequest, db: Session) -> None:
+    """Generate guides session by session, publishing step/result/error/complete events."""
+    results = []
+    candidate_timings = []
+    cancel_token = run.cancel_token
+
+    for idx, session_id in enumerate(request.session_ids):
+        if cancel_token.cancelled:
+            break
+
+        with timing.collect() as candidate_timing:
             try:
-                # Step 1: Fetching data
-                yield sse_event("step", {
-                    "step": "fetching_data",
-                    "message": f"Fetching evaluation data for candidate {candidate_num}/{total_candidates}...",
-                    "candidate_index": idx,
-                    "progress": (idx * 5) / (total_candidates * 5) * 100
-                })
-                
-                # Get all evaluations for this session
-                evaluations = db.query(Evaluation).filter(
-                    Evaluation.session_id == session_id
-                ).all()
-                
-                if not evaluations:
-                    results.append({
-                        "session_id": session_id,
-                        "error": f"Session {session_id} not found",
-                        "success": False
-                    })
-                    continue
-                
-                # Step 2: Classifying skills
-                yield sse_event("step", {
-                    "step": "classifying_skills",
-                    "message": f"Classifying skills (verified/gaps/not tested) for candidate {candidate_num}/{total_candidates}...",
-                    "candidate_index": idx,
-                    "progress": (idx * 5 + 1) / (total_candidates * 5) * 100
-                })
-                
-                # Get additional data
-                feedback = db.query(EvaluationFeedback).filter(
-                    EvaluationFeedback.session_id == session_id
-                ).first()
-                
-                voice_eval = db.query(EvaluationVoiceElsa).filter(
-                    EvaluationVoiceElsa.session_id == session_id
-                ).first()
-                
-                first_eval = evaluations[0]
-                candidate_email = first_eval.email or "Candidate"
-                candidate_name = candidate_email.split('@')[0].replace('.', ' ').replace('_', ' ').title() if '@' in candidate_email else candidate_email
-                role = first_eval.scenario_name or first_eval.campaign_name or "Unknown Role"
-                scenario_type = first_eval.scenario_type
-                
-                # Auto-derive skills from evaluations if none provided
-                required_skills_list = list(request.required_skills)
-                if not required_skills_list:
-                    derived_skills = set()
-                    for eval in evaluations:
-                        if eval.skill:
-                            derived_skills.add(eval.skill)
-                    
-                    required_skills_list = [
-                        SkillRequirement(
-                            skill_name=skill,
-                            priority="medium",
-                            min_score=4
-                        )
-                        for skill in derived_skills
-                    ]
-                
-                # Build required skills lookup
-                required_skills_map = {s.skill_name.lower().replace('-', '_').replace(' ', '_'): s for s in required_skills_list}
-                
-                # Process evaluation results to classify skills
-                verified_skills = []
-                skill_gaps = []
-                skills_evaluated = []
-                evaluation_evidence = []
-                
-                for eval in evaluations:
-                    skill_name = eval.skill or "General Assessment"
-                    result = eval.result or {}
-                    transcript = eval.transcript
-                    
-                    score = None
-                    reason = None
-                    
-                    if isinstance(result, dict):
-                        score = result.get('score', result.get('overall_score', result.get('rating')))
-                        reason = result.get('reason', result.get('rationale', result.get('feedback', '')))
-                        
-                        if isinstance(score, str) and '/' in score:
-                            try:
-                                num, denom = score.split('/')
-                                score = float(num)
-                            except:
-                                score = 2.5
-                    
-                    if score is None:
-                        score = 2.5
-                    
-                    skill_key = skill_name.lower().replace('-', '_').replace(' ', '_')
-                    requirement = required_skills_map.get(skill_key)
-                    min_score = requirement.min_score if requirement else 4
-                    priority = requirement.priority if requirement else "medium"
-                    
-                    evidence = {
-                        "skill_name": skill_name,
-                        "score": score,
-                        "max_score": 5,
-                        "reason": reason,
-                        "scenario_type": scenario_type,
-                        "transcript_snippet": transcript[:300] if transcript else None,
-                        "is_required": requirement is not None,
-                        "priority": priority
-                    }
-                    evaluation_evidence.append(evidence)
-                    skills_evaluated.append(skill_name)
-                    
-                    if score >= min_score:
-                        verified_skills.append({
-                            "skill_name": skill_name,
-                            "score": score,
-                            "evidence": reason
-                        })
-                    else:
-                        gap_severity = "minor" if score >= 3 else "moderate" if score >= 2 else "significant"
-                        skill_gaps.append({
-                            "skill_name": skill_name,
-                            "current_score": score,
-                            "required_score": min_score,
-                            "gap_severity": gap_severity,
-                            "priority": priority,
-                            "evidence": reason,
-                            "transcript_snippet": transcript[:200] if transcript else None
-                        })
-                
-                # Identify skills NOT tested
-                skills_not_tested = []
-                evaluated_skill_keys = {s.lower().replace('-', '_').replace(' ', '_') for s in skills_evaluated}
-                
-                for req_skill in required_skills_list:
-                    skill_key = req_skill.skill_name.lower().replace('-', '_').replace(' ', '_')
-                    if skill_key not in evaluated_skill_keys:
-                        skills_not_tested.append({
-                            "skill_name": req_skill.skill_name,
-                            "priority": req_skill.priority,
-                            "reason": "This skill was not evaluated in the simulation"
-                        })
-                
-                # Step 3: Building context
-                yield sse_event("step", {
-                    "step": "building_context",
-                    "message": f"Building interview context for candidate {candidate_num}/{total_candidates}...",
-                    "candidate_index": idx,
-                    "progress": (idx * 5 + 2) / (total_candidates * 5) * 100,
-                    "details": {
-                        "verified_skills_count": len(verified_skills),
-                        "skill_gaps_count": len(skill_gaps),
-                        "skills_not_tested_count": len(skills_not_tested)
-                    }
-                })
-                
-                # Get feedback summary
-                feedback_summary = None
-                if feedback and feedback.feedback:
-                    if isinstance(feedback.feedback, dict):
-                        key_strengths = feedback.feedback.get('Key_Strengths', [])
-                        if key_strengths:
-                            feedback_summary = {
-                                "key_strengths": [
-                                    {"title": s.get('title'), "detail": s.get('strength')}
-                                    for s in key_strengths if isinstance(s, dict)
-                                ]
-                            }
-                
-                # Get voice evaluation summary
-                voice_summary = None
-                if voice_eval and voice_eval.elsa_score:
-                    voice_summary = {
-                        "elsa_score": voice_eval.elsa_score,
-                        "attributes": voice_eval.result.get('reasons', []) if voice_eval.result else []
-                    }
-                
-                # Combine instructions
-                combined_instructions = request.custom_instructions or ""
-                if request.per_candidate_instructions and session_id in request.per_candidate_instructions:
-                    candidate_instruction = request.per_candidate_instructions[session_id]
-                    if candidate_instruction:
-                        if combined_instructions:
-                            combined_instructions = f"{combined_instructions}\n\n[Candidate-Specific Instructions]: {candidate_instruction}"
-                        else:
-                            combined_instructions = f"[Candidate-Specific Instructions]: {candidate_instruction}"
-                
-                # Step 4: Generating questions with AI
-                yield sse_event("step", {
-                    "step": "generating_questions",
-                    "message": f"Generating interview questions with AI for candidate {candidate_num}/{total_candidates}...",
-                    "candidate_index": idx,
-                    "progress": (idx * 5 + 3) / (total_candidates * 5) * 100
-                })
-                
-                # Generate the guide using LLM
-                guide = llm_service.generate_agentic_guide(
-                    candidate_name=candidate_name,
-                    role=role,
-                    job_description=request.job_description,
-                    verified_skills=verified_skills,
-                    skill_gaps=skill_gaps,
-                    skills_not_tested=skills_not_tested,
-                    evaluation_evidence=evaluation_evidence,
-                    feedback_summary=feedback_summary,
-                    voice_summary=voice_summary,
-                    custom_instructions=combined_instructions if combined_instructions else None,
-                    num_questions=request.num_questions,
-                    scenario_type=scenario_type
-                )
-                
-                # Step 5: Finalizing
-                yield sse_event("step", {
-                    "step": "validating_output",
-                    "message": f"Validating and finalizing guide for candidate {candidate_num}/{total_candidates}...",
-                    "candidate_index": idx,
-                    "progress": (idx * 5 + 4) / (total_candidates * 5) * 100
-                })
-                
-                results.append({
-                    "session_id": session_id,
-                    "candidate_name": candidate_name,
-                    "candidate_email": candidate_email,
-                    "role": role,
-                    "scenario_type": scenario_type,
-                    "success": True,
-                    "classification": {
-                        "verified_skills": verified_skills,
-                        "skill_gaps": skill_gaps,
-                        "skills_not_tested": skills_not_tested
-                    },
-                    "guide": guide,
-                    "metadata": {
-                        "total_skills_evaluated": len(skills_evaluated),
-                        "feedback_available": feedback is not None,
-                        "voice_evaluation_available": voice_eval is not None,
-                        "custom_instructions_provided": bool(combined_instructions)
-                    }
-                })
-                
+                _publish_candidate_guide(run, request, db, idx, session_id, results)
+            except GenerationCancelled:
+                break
             except Exception as e:
-                yield sse_event("error", {
+                run.publish("error", {
                     "session_id": session_id,
                     "error": str(e),
                     "candidate_index": idx
@@ -513,25 +515,260 @@ async def generate_agentic_guide_stream(
                     "error": str(e),
                     "success": False
                 })
-        
-        # Final complete event with all results
-        yield sse_event("complete", {
-            "generated_at": datetime.utcnow().isoformat(),
-            "job_description_provided": bool(request.job_description),
-            "required_skills_count": len(request.required_skills),
-            "candidates_processed": len(request.session_ids),
-            "guides": results
+            finally:
+                candidate_timings.append({"session_id": session_id, **candidate_timing.summary()})
+
+    if cancel_token.cancelled:
+        skipped = len(request.session_ids) - len(results)
+        metrics.inc("guide_generations_cancelled_total", {"endpoint": "stream", "reason": cancel_token.reason})
+        metrics.inc("guide_sessions_cancelled_total", {"endpoint": "stream"}, skipped)
+        run.publish("cancelled", {
+            "reason": cancel_token.reason,
+            "candidates_completed": len(results),
+            "candidates_cancelled": skipped,
+            "guides": results,
+            "timing": {"candidates": candidate_timings}
         })
-    
-    return StreamingResponse(
-        generate_events(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        return
+
+    # Final complete event with all results
+    run.publish("complete", {
+        "generated_at": datetime.utcnow().isoformat(),
+        "job_description_provided": bool(request.job_description),
+        "required_skills_count": len(request.required_skills),
+        "candidates_processed": len(request.session_ids),
+        "guides": results,
+        "timing": {
+            "candidates": candidate_timings,
+            "llm_calls": sum(t["llm_calls"] for t in candidate_timings),
+            "tokens": {
+                token_type: sum(t["tokens"].get(token_type, 0) for t in candidate_timings)
+                for token_type in ("prompt", "completion")
+            }
         }
+    })
+
+
+def _publish_candidate_guide(
+    run: StreamRun,
+    request: AgenticGuideRequest,
+    db: Session,
+    idx: int,
+    session_id: str,
+    results: List[dict]
+) -> None:
+    """Run the pipeline for one candidate of a stream run, publishing its step and result events."""
+    candidate_num = idx + 1
+    total_candidates = len(request.session_ids)
+    cancel_token = run.cancel_token
+
+    # Step 1: Fetching data
+    _publish_step(run, {
+        "step": "fetching_data",
+        "message": f"Fetching evaluation data for candidate {candidate_num}/{total_candidates}...",
+        "candidate_index": idx,
+        "progress": (idx * 5) / (total_candidates * 5) * 100
+    })
+
+    # Step 2 is published once the session's evaluations are found
+    def classifying() -> None:
+        _publish_step(run, {
+            "step": "classifying_skills",
+            "message": f"Classifying skills (verified/gaps/not tested) for candidate {candidate_num}/{total_candidates}...",
+            "candidate_index": idx,
+            "progress": (idx * 5 + 1) / (total_candidates * 5) * 100
+        })
+
+    try:
+        candidate = _classify_session(session_id, request.required_skills, db, on_fetched=classifying)
+    except HTTPException as e:
+        results.append({
+            "session_id": session_id,
+            "error": e.detail,
+            "success": False
+        })
+        return
+    combined_instructions = _combine_instructions(request, session_id)
+
+    # Instant draft while the LLM works; `upgrade` events replace its fields as content arrives
+    upgrades = None
+    if request.mode == "llm":
+        with timing.stage("draft"):
+            draft = draft_engine.generate(
+                candidate["candidate_name"], candidate["verified_skills"], candidate["skill_gaps"],
+                candidate["skills_not_tested"], request.num_questions,
+                role=candidate["role"], scenario_type=candidate["scenario_type"]
+            )
+        upgrades = _GuideUpgrades(run, idx, session_id)
+        upgrades.draft({
+            "candidate_name": candidate["candidate_name"],
+            "candidate_email": candidate["candidate_email"],
+            "role": candidate["role"],
+            "scenario_type": candidate["scenario_type"],
+            "classification": {
+                "verified_skills": candidate["verified_skills"],
+                "skill_gaps": candidate["skill_gaps"],
+                "skills_not_tested": candidate["skills_not_tested"]
+            },
+            "guide": draft
+        })
+
+    # Step 3: Building context
+    _publish_step(run, {
+        "step": "building_context",
+        "message": f"Building interview context for candidate {candidate_num}/{total_candidates}...",
+        "candidate_index": idx,
+        "progress": (idx * 5 + 2) / (total_candidates * 5) * 100,
+        "details": {
+            "verified_skills_count": len(candidate["verified_skills"]),
+            "skill_gaps_count": len(candidate["skill_gaps"]),
+            "skills_not_tested_count": len(candidate["skills_not_tested"])
+        }
+    })
+
+    # Step 4: Generating questions with AI
+    _publish_step(run, {
+        "step": "generating_questions",
+        "message": f"Generating interview questions with AI for candidate {candidate_num}/{total_candidates}...",
+        "candidate_index": idx,
+        "progress": (idx * 5 + 3) / (total_candidates * 5) * 100
+    })
+
+    # Generate the guide using LLM
+    plan = degradation.plan(request.deadline_seconds, request.mode)
+    with llm_ledger.context(guide_id=uuid.uuid4().hex, session_id=session_id, campaign_id=candidate["campaign_id"]):
+        guide = llm_service.generate_agentic_guide(
+            job_description=request.job_description,
+            custom_instructions=combined_instructions,
+            num_questions=request.num_questions,
+            cancel_token=cancel_token,
+            mode=request.mode,
+            on_progress=upgrades.upgrade if upgrades else None,
+            plan=plan,
+            profile=request.profile,
+            **_guide_args(candidate)
+        )
+    if upgrades:
+        upgrades.upgrade(guide, final=True)
+
+    # Step 5: Finalizing
+    _publish_step(run, {
+        "step": "validating_output",
+        "message": f"Validating and finalizing guide for candidate {candidate_num}/{total_candidates}...",
+        "candidate_index": idx,
+        "progress": (idx * 5 + 4) / (total_candidates * 5) * 100
+    })
+
+    result = _agentic_guide_entry(
+        session_id, candidate, guide, plan, combined_instructions, request.mode, request.profile
     )
+    results.append(result)
+    run.add_result(session_id, result)
+    collector = timing.current()
+    run.publish("result", {"candidate_index": idx, **result, "timing": collector.summary() if collector else None})
+
+
+
+def _guide_fields(guide: dict) -> Dict[str, object]:
+    """Copy of a guide's fields keyed by dotted path (top-level keys and `sections.<name>`)."""
+    fields = {}
+    for key, value in guide.items():
+        if key == "sections" and isinstance(value, dict):
+            fields.update({f"sections.{name}": copy.deepcopy(section) for name, section in value.items()})
+        else:
+            fields[key] = copy.deepcopy(value)
+    return fields
+
+
+class _GuideUpgrades:
+    """Publishes one candidate's draft, then only the guide fields that changed since the client last saw them."""
+
+    def __init__(self, run: StreamRun, candidate_index: int, session_id: str):
+        self.run = run
+        self.candidate_index = candidate_index
+        self.session_id = session_id
+        self._sent: Dict[str, object] = {}
+
+    def draft(self, data: dict) -> None:
+        self._sent = _guide_fields(data["guide"])
+        self.run.publish("draft", {"candidate_index": self.candidate_index, "session_id": self.session_id, **data})
+
+    def upgrade(self, guide: dict, final: bool = False) -> None:
+        fields = _guide_fields(guide)
+        if final:
+            # Draft-only fields the final guide does not have
+            fields.update({path: None for path in self._sent if path not in fields})
+        changed = {path: value for path, value in fields.items() if self._sent.get(path) != value}
+        if not changed:
+            return
+        self._sent.update(changed)
+        self.run.publish("upgrade", {
+            "candidate_index": self.candidate_index,
+            "session_id": self.session_id,
+            "replace": changed,
+            "final": final
+        })
+
+
+def _publish_step(run: StreamRun, data: dict) -> None:
+    """Publish a step event with the stage durations of the current candidate so far."""
+    collector = timing.current()
+    run.publish("step", {**data, "stages_ms": collector.stages_ms() if collector else {}})
+
+
+def _combine_instructions(request: AgenticGuideRequest, session_id: str) -> Optional[str]:
+    """Combine global instructions with per-candidate instructions for one session."""
+    combined_instructions = request.custom_instructions or ""
+    if request.per_candidate_instructions and session_id in request.per_candidate_instructions:
+        candidate_instruction = request.per_candidate_instructions[session_id]
+        if candidate_instruction:
+            if combined_instructions:
+                combined_instructions = f"{combined_instructions}\n\n[Candidate-Specific Instructions]: {candidate_instruction}"
+            else:
+                combined_instructions = f"[Candidate-Specific Instructions]: {candidate_instruction}"
+    return combined_instructions if combined_instructions else None
+
+
+def _generate_guide_result(
+    request: AgenticGuideRequest,
+    session_id: str,
+    db: Session,
+    cancel_token: Optional[CancellationToken] = None,
+    candidate: Optional[dict] = None
+) -> dict:
+    """
+    Generate the guide for one session of a request, returning an error entry instead of raising.
+
+    `candidate` is the session's classification when the caller already has it.
+    """
+    try:
+        return _generate_single_agentic_guide(
+            session_id=session_id,
+            job_description=request.job_description,
+            required_skills=request.required_skills,
+            custom_instructions=_combine_instructions(request, session_id),
+            num_questions=request.num_questions,
+            db=db,
+            cancel_token=cancel_token,
+            mode=request.mode,
+            deadline_seconds=request.deadline_seconds,
+            profile=request.profile,
+            candidate=candidate
+        )
+    except GenerationCancelled:
+        raise
+    except HTTPException as e:
+        return {
+            "session_id": session_id,
+            "error": e.detail,
+            "success": False
+        }
+    except Exception as e:
+        return {
+            "session_id": session_id,
+            "error": str(e),
+            "success": False
+        }
 
 
 def _generate_single_agentic_guide(
@@ -540,17 +777,126 @@ def _generate_single_agentic_guide(
     required_skills: List[SkillRequirement],
     custom_instructions: Optional[str],
     num_questions: int,
-    db: Session
+    db: Session,
+    cancel_token: Optional[CancellationToken] = None,
+    mode: str = "llm",
+    deadline_seconds: Optional[float] = None,
+    profile: str = "full",
+    candidate: Optional[dict] = None
+) -> dict:
+    """
+    Generate agentic guide for a single session with chain-of-thought reasoning.
+
+    Identical concurrent calls (same session and normalized inputs) share one
+    generation, so duplicate clicks from a hiring panel don't double the LLM spend.
+    """
+    def generate() -> dict:
+        return _build_single_agentic_guide(
+            session_id, job_description, required_skills, custom_instructions, num_questions, db, cancel_token,
+            mode, deadline_seconds, profile, candidate
+        )
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return generate()
+    key = _guide_input_key(session_id, job_description, required_skills, custom_instructions, num_questions, mode, profile)
+    return guide_flights.do(key, generate, cancel_token=cancel_token)
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+
+def _guide_input_key(
+    session_id: str,
+    job_description: str,
+    required_skills: List[SkillRequirement],
+    custom_instructions: Optional[str],
+    num_questions: int,
+    mode: str = "llm",
+    profile: str = "full"
+) -> str:
+    """Hash of the generation inputs, insensitive to whitespace and skill order."""
+    skills = sorted(
+        (_normalize_text(s.skill_name).lower(), s.priority, s.min_score)
+        for s in required_skills
+    )
+    return input_key(
+        session_id,
+        _normalize_text(job_description),
+        skills,
+        _normalize_text(custom_instructions),
+        num_questions,
+        mode,
+        profile
+    )
+
+
+def _build_single_agentic_guide(
+    session_id: str,
+    job_description: str,
+    required_skills: List[SkillRequirement],
+    custom_instructions: Optional[str],
+    num_questions: int,
+    db: Session,
+    cancel_token: Optional[CancellationToken] = None,
+    mode: str = "llm",
+    deadline_seconds: Optional[float] = None,
+    profile: str = "full",
+    candidate: Optional[dict] = None
 ) -> dict:
-    """Generate agentic guide for a single session with chain-of-thought reasoning."""
+    if candidate is None:
+        candidate = _classify_session(session_id, required_skills, db)
     
+    # Generate the agentic guide using LLM
+    plan = degradation.plan(deadline_seconds, mode)
+    with llm_ledger.context(guide_id=uuid.uuid4().hex, session_id=session_id, campaign_id=candidate["campaign_id"]):
+        guide = llm_service.generate_agentic_guide(
+            job_description=job_description,
+            custom_instructions=custom_instructions,
+            num_questions=num_questions,
+            cancel_token=cancel_token,
+            mode=mode,
+            plan=plan,
+            profile=profile,
+            **_guide_args(candidate)
+        )
+    
+    return _agentic_guide_entry(session_id, candidate, guide, plan, custom_instructions, mode, profile)
+
+
+# generate_agentic_guide arguments that come from a session's classification
+_GUIDE_ARGS = (
+    "candidate_name", "role", "verified_skills", "skill_gaps", "skills_not_tested",
+    "evaluation_evidence", "feedback_summary", "voice_summary", "scenario_type"
+)
+
+
+def _guide_args(candidate: dict) -> dict:
+    return {name: candidate[name] for name in _GUIDE_ARGS}
+
+
+def _classify_session(
+    session_id: str,
+    required_skills: List[SkillRequirement],
+    db: Session,
+    on_fetched: Optional[Callable[[], None]] = None
+) -> dict:
+    """
+    Fetch a session's evaluations and classify its skills against the requirements.
+
+    Raises 404 for an unknown session. `on_fetched` is called once the
+    evaluations are found (the stream publishes its classifying step).
+    """
     # Get all evaluations for this session
+    stage_started = time.perf_counter()
     evaluations = db.query(Evaluation).filter(
         Evaluation.session_id == session_id
     ).all()
     
     if not evaluations:
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    if on_fetched:
+        on_fetched()
     
     # Get feedback if available
     feedback = db.query(EvaluationFeedback).filter(
@@ -561,6 +907,8 @@ def _generate_single_agentic_guide(
     voice_eval = db.query(EvaluationVoiceElsa).filter(
         EvaluationVoiceElsa.session_id == session_id
     ).first()
+    timing.record_stage("db_fetch", time.perf_counter() - stage_started)
+    stage_started = time.perf_counter()
     
     first_eval = evaluations[0]
     candidate_email = first_eval.email or "Candidate"
@@ -692,41 +1040,58 @@ def _generate_single_agentic_guide(
             "elsa_score": voice_eval.elsa_score,
             "attributes": voice_eval.result.get('reasons', []) if voice_eval.result else []
         }
-    
-    # Generate the agentic guide using LLM
-    guide = llm_service.generate_agentic_guide(
-        candidate_name=candidate_name,
-        role=role,
-        job_description=job_description,
-        verified_skills=verified_skills,
-        skill_gaps=skill_gaps,
-        skills_not_tested=skills_not_tested,
-        evaluation_evidence=evaluation_evidence,
-        feedback_summary=feedback_summary,
-        voice_summary=voice_summary,
-        custom_instructions=custom_instructions,
-        num_questions=num_questions,
-        scenario_type=scenario_type
-    )
+    timing.record_stage("classification", time.perf_counter() - stage_started)
     
     return {
-        "session_id": session_id,
         "candidate_name": candidate_name,
         "candidate_email": candidate_email,
         "role": role,
         "scenario_type": scenario_type,
+        "campaign_id": first_eval.campaign_id,
+        "verified_skills": verified_skills,
+        "skill_gaps": skill_gaps,
+        "skills_not_tested": skills_not_tested,
+        "evaluation_evidence": evaluation_evidence,
+        "feedback_summary": feedback_summary,
+        "voice_summary": voice_summary,
+        "skills_evaluated": skills_evaluated,
+        "feedback_available": feedback is not None,
+        "voice_evaluation_available": voice_eval is not None
+    }
+
+
+def _agentic_guide_entry(
+    session_id: str,
+    candidate: dict,
+    guide: dict,
+    plan: GenerationPlan,
+    custom_instructions: Optional[str],
+    mode: str,
+    profile: str,
+    packed: bool = False
+) -> dict:
+    return {
+        "session_id": session_id,
+        "candidate_name": candidate["candidate_name"],
+        "candidate_email": candidate["candidate_email"],
+        "role": candidate["role"],
+        "scenario_type": candidate["scenario_type"],
         "success": True,
         "classification": {
-            "verified_skills": verified_skills,
-            "skill_gaps": skill_gaps,
-            "skills_not_tested": skills_not_tested
+            "verified_skills": candidate["verified_skills"],
+            "skill_gaps": candidate["skill_gaps"],
+            "skills_not_tested": candidate["skills_not_tested"]
         },
         "guide": guide,
         "metadata": {
-            "total_skills_evaluated": len(skills_evaluated),
-            "feedback_available": feedback is not None,
-            "voice_evaluation_available": voice_eval is not None,
-            "custom_instructions_provided": bool(custom_instructions)
+            "total_skills_evaluated": len(candidate["skills_evaluated"]),
+            "feedback_available": candidate["feedback_available"],
+            "voice_evaluation_available": candidate["voice_evaluation_available"],
+            "custom_instructions_provided": bool(custom_instructions),
+            "mode": mode,
+            "profile": profile,
+            "packed": packed,
+            **plan.metadata()
         }
     }
 
@@ -870,55 +1235,44 @@ class RegenerateQuestionRequest(BaseModel):
 
 
 @router.post("/regenerate-question")
-def regenerate_question(request: RegenerateQuestionRequest):
-    """Regenerate a single interview question using AI."""
+async def regenerate_question(
+    request: RegenerateQuestionRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Regenerate a single interview question using AI (429 with `Retry-After` at capacity)."""
+    async def regenerate() -> dict:
+        async with regenerate_admission.slot():
+            return await llm_executor.run(_regenerate_question, request)
     
-    if not settings.OPENAI_API_KEY:
+    body, replayed = await idempotency_store.run(
+        "regenerate-question",
+        idempotency_key,
+        request.model_dump(),
+        regenerate,
+        should_store=lambda result: result.get("success", False)
+    )
+    _mark_replayed(response, replayed)
+    return body
+
+
+@llm_ledger.context(endpoint="regenerate-question")
+def _regenerate_question(request: RegenerateQuestionRequest) -> dict:
+    if not llm_service.available:
         return {
             "success": False,
             "error": "OpenAI API key not configured"
         }
     
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        
-        prompt = f"""You are an expert interview question designer. Regenerate the following interview question to make it more effective.
-
-Original Question: "{request.original_question}"
-Target Skill: {request.skill_name}
-{f"Additional Instructions: {request.instruction}" if request.instruction else ""}
-{f"Candidate Context: {request.candidate_context}" if request.candidate_context else ""}
-
-Generate a NEW, IMPROVED interview question that:
-1. Better assesses the target skill
-2. Uses behavioral/situational format (STAR method)
-3. Is clear and specific
-4. Encourages detailed responses
-
-Respond with valid JSON:
-{{
-    "question": "The new interview question...",
-    "what_to_listen_for": ["indicator1", "indicator2", "indicator3"],
-    "red_flags": ["warning1", "warning2"],
-    "follow_ups": ["follow_up1", "follow_up2"],
-    "time_estimate": "4-5 minutes"
-}}"""
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert interview coach. Respond only with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.7,
-            response_format={"type": "json_object"}
+        result = llm_service.regenerate_question(
+            original_question=request.original_question,
+            skill_name=request.skill_name,
+            instruction=request.instruction,
+            candidate_context=request.candidate_context
         )
-        
-        import json
-        content = response.choices[0].message.content
-        result = json.loads(content) if content else None
+        # The recruiter replaced this question, so stop reusing it
+        question_bank.reject(request.skill_name, request.original_question)
         
         return {
             "success": True,
@@ -932,25 +1286,38 @@ Respond with valid JSON:
         }
 
 
-# Import settings for the regenerate endpoint
-from ..config import settings
-
-
 # ============================================================================
 # Legacy Generate Guide Endpoint (for session detail page)
 # ============================================================================
 
 @router.post("/generate-guide/{session_id}")
-def generate_guide_for_session(
+async def generate_guide_for_session(
     session_id: str,
+    response: Response,
     num_questions: int = Query(8, ge=3, le=15),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Generate interview guide for a single session (legacy endpoint).
-    Used by the session detail page.
+    Used by the session detail page. Shares the guide generation capacity
+    limit (429 with `Retry-After` when saturated).
     """
+    async def generate() -> dict:
+        async with guide_admission.slot():
+            return await llm_executor.run(_in_session, _generate_legacy_guide, session_id, num_questions)
     
+    body, replayed = await idempotency_store.run(
+        "generate-guide",
+        idempotency_key,
+        {"session_id": session_id, "num_questions": num_questions},
+        generate
+    )
+    _mark_replayed(response, replayed)
+    return body
+
+
+@llm_ledger.context(endpoint="generate-guide")
+def _generate_legacy_guide(session_id: str, num_questions: int, db: Session) -> dict:
     # Get all evaluations for this session
     evaluations = db.query(Evaluation).filter(
         Evaluation.session_id == session_id
@@ -998,13 +1365,14 @@ def generate_guide_for_session(
                 ))
     
     # Generate the guide using LLM service
-    result = llm_service.generate_interview_questions(
-        candidate_name=candidate_name,
-        role=role,
-        skill_gaps=skill_gaps,
-        verified_skills=verified_skills,
-        num_questions=num_questions
-    )
+    with llm_ledger.context(guide_id=uuid.uuid4().hex, session_id=session_id, campaign_id=first_eval.campaign_id):
+        result = llm_service.generate_interview_questions(
+            candidate_name=candidate_name,
+            role=role,
+            skill_gaps=skill_gaps,
+            verified_skills=verified_skills,
+            num_questions=num_questions
+        )
     
     return {
         "session_id": session_id,
@@ -0,0 +1,182 @@
+"""Routes for background (campaign-wide) guide generation jobs."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+from ..config import settings
+from ..database import get_db
+from ..job_queue import job_queue
+from ..metrics import metrics
+from ..models_existing import Evaluation
+from .evaluations import AgenticGuideRequest, SkillRequirement, _parse_result_score
+
+router = APIRouter(prefix="/generation-jobs", tags=["generation-jobs"])
+
+
+class CampaignGenerateRequest(BaseModel):
+    job_description: str
+    required_skills: List[SkillRequirement] = []
+    custom_instructions: Optional[str] = None
+    num_questions: int = 8
+    mode: Literal["llm", "draft"] = "llm"
+    profile: Literal["full", "standard", "fast"] = "full"
+    # Session filters
+    scenario_type: Optional[str] = None
+    min_average_score: Optional[float] = None  # Average skill score (out of 5)
+    max_average_score: Optional[float] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    shards: Optional[int] = None  # Concurrent workers for this job (defaults to CAMPAIGN_JOB_SHARDS)
+
+
+@router.post("")
+def submit_generation_job(request: AgenticGuideRequest):
+    """
+    Queue guide generation for a list of sessions.
+
+    Work is picked up by the worker processes (`python -m app.worker`), so it
+    survives browser disconnects and server restarts. Poll the job for
+    progress and fetch results when it completes.
+    """
+    if not request.session_ids:
+        raise HTTPException(status_code=400, detail="session_ids must not be empty")
+
+    job_id = job_queue.submit(request.model_dump(), request.session_ids)
+    return job_queue.get_job(job_id)
+
+
+@router.post("/campaigns/{campaign_id}")
+def submit_campaign_generation_job(
+    campaign_id: str,
+    request: CampaignGenerateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue guide generation for every matching session in a campaign.
+
+    Sessions are resolved server-side (no 300-candidate listing cap) and
+    sharded across `shards` concurrent workers. More than
+    CAMPAIGN_JOB_MAX_SESSIONS matching sessions is rejected with 400; narrow
+    the filters or split the campaign by date range.
+    """
+    session_ids = _resolve_campaign_sessions(campaign_id, request, db)
+    if not session_ids:
+        raise HTTPException(status_code=404, detail="No sessions match the given campaign and filters")
+    if len(session_ids) > settings.CAMPAIGN_JOB_MAX_SESSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"{len(session_ids)} sessions match, above the limit of {settings.CAMPAIGN_JOB_MAX_SESSIONS} "
+                "(CAMPAIGN_JOB_MAX_SESSIONS) per job; narrow the filters (e.g. date_from/date_to)"
+            )
+        )
+
+    shards = min(max(request.shards or settings.CAMPAIGN_JOB_SHARDS, 1), settings.CAMPAIGN_JOB_MAX_SHARDS)
+    guide_request = AgenticGuideRequest(
+        session_ids=session_ids,
+        job_description=request.job_description,
+        required_skills=request.required_skills,
+        custom_instructions=request.custom_instructions,
+        num_questions=request.num_questions,
+        mode=request.mode,
+        profile=request.profile
+    )
+    payload = guide_request.model_dump()
+    payload["campaign"] = {
+        "campaign_id": campaign_id,
+        "filters": request.model_dump(
+            mode="json",
+            include={"scenario_type", "min_average_score", "max_average_score", "date_from", "date_to"}
+        )
+    }
+
+    job_id = job_queue.submit(payload, session_ids, shards=shards)
+    return job_queue.get_job(job_id)
+
+
+def _resolve_campaign_sessions(campaign_id: str, request: CampaignGenerateRequest, db: Session) -> List[str]:
+    """Resolve the campaign's sessions matching the filters with a single query."""
+    query = db.query(
+        Evaluation.session_id,
+        Evaluation.result
+    ).filter(
+        Evaluation.campaign_id == campaign_id,
+        Evaluation.session_id.isnot(None)
+    )
+    if request.scenario_type:
+        query = query.filter(Evaluation.scenario_type == request.scenario_type)
+    if request.date_from:
+        query = query.filter(Evaluation.created_at >= request.date_from)
+    if request.date_to:
+        query = query.filter(Evaluation.created_at <= request.date_to)
+
+    # Average skill score per session, preserving first-seen (chronological) order
+    session_scores: Dict[str, List[float]] = {}
+    for row in query.order_by(Evaluation.created_at).all():
+        scores = session_scores.setdefault(row.session_id, [])
+        score = _parse_result_score(row.result)
+        if score is not None:
+            scores.append(score)
+
+    session_ids = []
+    for session_id, scores in session_scores.items():
+        if request.min_average_score is not None or request.max_average_score is not None:
+            if not scores:
+                continue
+            average = sum(scores) / len(scores)
+            if request.min_average_score is not None and average < request.min_average_score:
+                continue
+            if request.max_average_score is not None and average > request.max_average_score:
+                continue
+        session_ids.append(session_id)
+
+    return session_ids
+
+
+@router.get("/{job_id}")
+def get_generation_job(job_id: str):
+    """Get job status and progress."""
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+
+@router.get("/{job_id}/results")
+def get_generation_job_results(job_id: str):
+    """Get the per-candidate results checkpointed so far."""
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+
+    guides = job_queue.get_results(job_id)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "generated_at": datetime.utcnow().isoformat(),
+        "candidates_processed": len(guides),
+        "guides": guides
+    }
+
+
+@router.post("/{job_id}/cancel")
+def cancel_generation_job(job_id: str):
+    """
+    Cancel a queued or running job. Completed candidates keep their results.
+
+    Like the batch and stream endpoints, this counts one cancelled generation
+    plus the sessions it skipped (pending items dropped here); workers add
+    the running items they abort.
+    """
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    dropped = job_queue.cancel(job_id)
+    if dropped is None:
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}")
+    metrics.inc("guide_generations_cancelled_total", {"endpoint": "job", "reason": "client_request"})
+    metrics.inc("guide_sessions_cancelled_total", {"endpoint": "job"}, dropped)
+    return job_queue.get_job(job_id)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -134,3 +134,86 @@ class GenerateGuideRequest(BaseModel):
     num_questions: int = 8
     focus_areas: Optional[List[str]] = None
 
+
+# LLM structured outputs (sent to the model as strict JSON schemas). Fields
+# that the lighter generation profiles leave out of the schema have defaults.
+Priority = Literal["high", "medium", "low"]
+
+
+class GuideQuestion(BaseModel):
+    question: str = Field(description="Behavioral or situational question (STAR format)")
+    what_to_listen_for: List[str] = Field(description="3 specific indicators of a strong answer")
+    red_flags: List[str] = Field(default_factory=list, description="2-3 warning signs")
+    follow_ups: List[str] = Field(default_factory=list, description="2-3 probing follow-up questions")
+    time_estimate: str = Field("", description='e.g. "4-5 minutes"')
+
+
+class GapReasoning(BaseModel):
+    data_observation: str = Field("", description="Score and simulation behind the gap")
+    evidence_from_evaluation: str = Field("", description="Quote or cite the transcript/feedback")
+    gap_significance: str = Field("", description="Why it matters for this role")
+    interview_strategy: str = ""
+    question_rationale: str = Field("", description="Why this question reveals the true capability")
+
+
+class NotTestedReasoning(BaseModel):
+    note: str = ""
+    relevance_to_role: str = ""
+    question_strategy: str = ""
+
+
+class VerifiedSkillOutput(BaseModel):
+    skill_name: str
+    score: float
+    acknowledgment: str
+    time_estimate: str = Field("", description='e.g. "1 minute"')
+
+
+class SkillGapOutput(BaseModel):
+    skill_name: str
+    current_score: float
+    priority: Priority
+    reasoning: GapReasoning = Field(default_factory=GapReasoning)
+    questions: List[GuideQuestion]
+
+
+class SkillNotTestedOutput(BaseModel):
+    skill_name: str
+    priority: Priority
+    reasoning: NotTestedReasoning = Field(default_factory=NotTestedReasoning)
+    question: GuideQuestion
+
+
+class GuideSectionsOutput(BaseModel):
+    verified_skills: List[VerifiedSkillOutput] = Field(default_factory=list)
+    skill_gaps: List[SkillGapOutput]
+    skills_not_tested: List[SkillNotTestedOutput]
+
+
+class AgenticGuideOutput(BaseModel):
+    executive_summary: str
+    interview_duration_estimate: str = Field("", description='e.g. "30-45 minutes"')
+    sections: GuideSectionsOutput
+    overall_red_flags: List[str] = Field(default_factory=list)
+    overall_strengths: List[str] = Field(default_factory=list)
+    interview_tips: List[str] = Field(default_factory=list)
+
+
+class AdditionalQuestionOutput(BaseModel):
+    skill_name: str
+    priority: Priority
+    reasoning: GapReasoning = Field(default_factory=GapReasoning)
+    question: GuideQuestion
+
+
+class AdditionalQuestionsOutput(BaseModel):
+    additional_questions: List[AdditionalQuestionOutput]
+
+
+class PackedGuideOutput(BaseModel):
+    session_id: str = Field(description="session_id of the candidate this guide is for")
+    guide: AgenticGuideOutput
+
+
+class PackedGuidesOutput(BaseModel):
+    guides: List[PackedGuideOutput]
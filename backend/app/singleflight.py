@@ -0,0 +1,102 @@
+"""
+Single-flight coalescing of identical concurrent generation calls.
+
+When several requests ask for the same work at the same time (e.g. two
+panel members generating a guide for the same candidate), only the first
+caller runs it; the others wait for and share its result. Coalescing is
+per process and only covers calls that overlap in time - nothing is cached
+once the leader finishes.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .cancellation import CancellationToken, GenerationCancelled
+from .metrics import metrics
+
+# How often waiting followers check their own cancellation token
+_FOLLOWER_POLL_SECONDS = 0.25
+
+
+def input_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable inputs (dict keys are sorted)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: str, fn: Callable[[], Any], cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run `fn` once per key among overlapping callers and return its result.
+
+        Followers get a deep copy of the leader's result, or its exception.
+        If the leader was cancelled (its client went away), followers retry
+        and one of them takes over. A follower's own cancel_token stops it
+        waiting without affecting the leader.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.followers += 1
+
+            if leader:
+                metrics.inc("cache_requests_total", {"cache": "single_flight", "result": "miss"})
+                return self._lead(key, call, fn)
+
+            metrics.inc("cache_requests_total", {"cache": "single_flight", "result": "hit"})
+            metrics.inc("guide_generations_coalesced_total", {"group": self.name})
+            while not call.done.wait(_FOLLOWER_POLL_SECONDS):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+
+            if isinstance(call.error, GenerationCancelled):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+    def _lead(self, key: str, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+            # Followers copy from a snapshot so the leader's caller can mutate its own result
+            call.result = copy.deepcopy(result)
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Create singleton instance
+guide_flights = SingleFlight("agentic_guide")
+
+metrics.describe("guide_generations_coalesced_total", "Generation calls that attached to an identical in-flight call instead of running their own")
@@ -0,0 +1,173 @@
+"""
+Server-side runs for the streaming guide endpoint.
+
+Generation for a stream runs in a background thread and publishes
+sequence-numbered events into a buffer. SSE connections only follow that
+buffer, so a dropped connection can reconnect with `Last-Event-ID` and
+replay what it missed instead of restarting the batch.
+
+Runs live in process memory: with several web workers, reconnects must
+reach the same worker (sticky sessions).
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from .cancellation import CancellationToken
+from . import timing
+from .config import settings
+
+
+class StreamRun:
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.created_at = time.time()
+        self._started = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+        self.results: Dict[str, Dict[str, Any]] = {}  # session_id -> per-candidate result
+        self.cancel_token = CancellationToken()
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._subscribers = 0
+        self._detach_timer: Optional[threading.Timer] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def last_event_id(self) -> int:
+        return self.events[-1][0] if self.events else 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Append an event (called from the generation thread) and wake subscribers."""
+        data = {**data, "elapsed_ms": round((time.perf_counter() - self._started) * 1000, 1)}
+        with self._lock:
+            seq = len(self.events) + 1
+            self.events.append((seq, event_type, data))
+            waiters, self._waiters = self._waiters, []
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        return seq
+
+    def add_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        self.results[session_id] = result
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished_at = time.time()
+            waiters, self._waiters = self._waiters, []
+            if self._detach_timer:
+                self._detach_timer.cancel()
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def _attach(self) -> None:
+        with self._lock:
+            self._subscribers += 1
+            if self._detach_timer:
+                self._detach_timer.cancel()
+                self._detach_timer = None
+
+    def _detach(self) -> None:
+        """Last subscriber gone: cancel the run unless someone reattaches within the grace period."""
+        with self._lock:
+            self._subscribers -= 1
+            if self._subscribers > 0 or self.finished_at is not None:
+                return
+            self._detach_timer = threading.Timer(settings.STREAM_DISCONNECT_GRACE_SECONDS, self._cancel_if_detached)
+            self._detach_timer.daemon = True
+            self._detach_timer.start()
+
+    def _cancel_if_detached(self) -> None:
+        with self._lock:
+            if self._subscribers > 0 or self.finished_at is not None:
+                return
+        self.cancel_token.cancel("client_disconnect")
+
+    def events_after(self, last_event_id: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+        with self._lock:
+            return self.events[last_event_id:]
+
+    def _waiter(self, after: int) -> Optional[asyncio.Event]:
+        """Register for the next publish, or None if there is already something to read."""
+        event = asyncio.Event()
+        with self._lock:
+            if len(self.events) > after or self.finished_at is not None:
+                return None
+            self._waiters.append((asyncio.get_running_loop(), event))
+        return event
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncGenerator[Tuple[int, str, Dict[str, Any]], None]:
+        """Yield buffered events after `last_event_id`, then live events until the run ends."""
+        cursor = last_event_id
+        self._attach()
+        try:
+            while True:
+                for seq, event_type, data in self.events_after(cursor):
+                    cursor = seq
+                    yield seq, event_type, data
+                if self.done and cursor >= self.last_event_id:
+                    return
+                waiter = self._waiter(cursor)
+                if waiter is None:
+                    continue
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout=settings.STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield 0, "keepalive", {}
+        finally:
+            # Runs on normal completion and when the client disconnects mid-stream
+            self._detach()
+
+
+class StreamRunRegistry:
+    def __init__(self):
+        self._runs: Dict[str, StreamRun] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> StreamRun:
+        self._evict_expired()
+        run = StreamRun(uuid.uuid4().hex)
+        with self._lock:
+            self._runs[run.run_id] = run
+        return run
+
+    def get(self, run_id: str) -> Optional[StreamRun]:
+        self._evict_expired()
+        return self._runs.get(run_id)
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - settings.STREAM_RUN_TTL_SECONDS
+        with self._lock:
+            expired = [
+                run_id for run_id, run in self._runs.items()
+                if run.finished_at is not None and run.finished_at < cutoff
+            ]
+            for run_id in expired:
+                del self._runs[run_id]
+
+
+def format_sse(seq: int, event_type: str, data: Dict[str, Any]) -> str:
+    """Format an event for the wire; keepalives are SSE comments."""
+    if event_type == "keepalive":
+        return ": keepalive\n\n"
+    with timing.stage("serialization"):
+        payload = json.dumps(data)
+    return f"id: {seq}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
+
+
+# Create singleton instance
+stream_runs = StreamRunRegistry()
@@ -0,0 +1,129 @@
+"""
+Per-request timing breakdown for guide generation.
+
+Pipeline stages report their durations here instead of straight to the
+metrics registry: each duration is observed in the Prometheus histograms and
+also added to the collector of the current request (a context variable), which
+feeds the `Server-Timing` header and the timing fields of SSE events.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .metrics import metrics
+
+_current: ContextVar[Optional["TimingCollector"]] = ContextVar("guide_timing", default=None)
+
+
+class TimingCollector:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # stage -> seconds (summed over repeats)
+        self.llm_calls = 0
+        self.tokens = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_llm_call(self, call_type: str, seconds: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            key = f"llm_{call_type}"
+            self.stages[key] = self.stages.get(key, 0.0) + seconds
+
+    def add_tokens(self, token_type: str, count: int) -> None:
+        with self._lock:
+            self.tokens[token_type] = self.tokens.get(token_type, 0) + count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def stages_ms(self) -> Dict[str, float]:
+        with self._lock:
+            return {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly breakdown for API responses and SSE events."""
+        return {
+            "total_ms": round(self.elapsed() * 1000, 1),
+            "stages_ms": self.stages_ms(),
+            "llm_calls": self.llm_calls,
+            "tokens": dict(self.tokens)
+        }
+
+    def server_timing(self) -> str:
+        entries = [f"{stage};dur={ms}" for stage, ms in self.stages_ms().items()]
+        if self.llm_calls:
+            entries.append(f'llm;desc="{self.llm_calls} calls"')
+        entries.append(f"total;dur={round(self.elapsed() * 1000, 1)}")
+        return ", ".join(entries)
+
+
+def current() -> Optional[TimingCollector]:
+    return _current.get()
+
+
+@contextmanager
+def collect() -> Iterator[TimingCollector]:
+    """Make a fresh collector current for the block (e.g. one candidate of a stream)."""
+    collector = TimingCollector()
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    metrics.observe("guide_stage_duration_seconds", seconds, {"stage": stage})
+    collector = _current.get()
+    if collector is not None:
+        collector.add_stage(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as a pipeline stage (also when it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_llm_call(call_type: str, seconds: float) -> None:
+    metrics.observe("llm_call_duration_seconds", seconds, {"call_type": call_type})
+    collector = _current.get()
+    if collector is not None:
+        collector.add_llm_call(call_type, seconds)
+
+
+def record_tokens(token_type: str, call_type: str, count: int) -> None:
+    metrics.inc("llm_tokens_total", {"type": token_type, "call_type": call_type}, count)
+    collector = _current.get()
+    if collector is not None:
+        collector.add_tokens(token_type, count)
+
+
+class ServerTimingRoute(APIRoute):
+    """Route class that adds a `Server-Timing` header with the request's stage durations."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            with collect() as collector:
+                response = await handler(request)
+            response.headers["Server-Timing"] = collector.server_timing()
+            response.headers["Timing-Allow-Origin"] = "*"
+            return response
+
+        return timed_handler
@@ -0,0 +1,139 @@
+"""
+Worker pool for background guide generation jobs.
+
+Run separately from the web server so it can be scaled independently:
+
+    python -m app.worker --processes 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from fastapi import HTTPException
+
+from .cancellation import CancellationToken, GenerationCancelled
+from .config import settings
+from .job_queue import job_queue
+from .llm_ledger import llm_ledger
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _heartbeat(item: dict, worker_id: str, done: threading.Event, cancel_token: CancellationToken) -> None:
+    """Keep the item's lease alive and watch for job cancellation while generation runs."""
+    lease_interval = max(settings.JOB_LEASE_SECONDS / 3, 1)
+    last_extended = time.monotonic()
+    while not done.wait(settings.JOB_CANCEL_POLL_SECONDS):
+        if job_queue.is_cancelled(item["job_id"]):
+            cancel_token.cancel("job_cancelled")
+            return
+        if time.monotonic() - last_extended >= lease_interval:
+            job_queue.extend_lease(item["item_id"], worker_id)
+            last_extended = time.monotonic()
+
+
+@llm_ledger.context(endpoint="generation-job")
+def process_item(item: dict, worker_id: str) -> None:
+    """Generate the guide for one claimed item and checkpoint the result."""
+    from .database import SessionLocal
+    from .routes.evaluations import AgenticGuideRequest, _combine_instructions, _generate_single_agentic_guide
+
+    item_id, job_id, session_id = item["item_id"], item["job_id"], item["session_id"]
+    if job_queue.is_cancelled(job_id):
+        if job_queue.mark_cancelled(item_id, job_id, worker_id):
+            metrics.inc("guide_sessions_cancelled_total", {"endpoint": "job"})
+        return
+
+    request = AgenticGuideRequest(**item["payload"])
+    cancel_token = CancellationToken()
+    done = threading.Event()
+    threading.Thread(target=_heartbeat, args=(item, worker_id, done, cancel_token), daemon=True).start()
+    db = SessionLocal()
+    try:
+        result = _generate_single_agentic_guide(
+            session_id=session_id,
+            job_description=request.job_description,
+            required_skills=request.required_skills,
+            custom_instructions=_combine_instructions(request, session_id),
+            num_questions=request.num_questions,
+            db=db,
+            cancel_token=cancel_token,
+            mode=request.mode,
+            deadline_seconds=request.deadline_seconds,
+            profile=request.profile
+        )
+        recorded = job_queue.complete(item_id, job_id, worker_id, result)
+    except GenerationCancelled:
+        # The job's cancelled generation itself is counted by the cancel endpoint
+        recorded = job_queue.mark_cancelled(item_id, job_id, worker_id)
+        if recorded:
+            metrics.inc("guide_sessions_cancelled_total", {"endpoint": "job"})
+    except HTTPException as e:
+        # Request-level problems (e.g. unknown session) will not succeed on retry
+        recorded = job_queue.fail(item_id, job_id, worker_id, str(e.detail), retry=False)
+    except Exception as e:
+        retry = item["attempt"] < settings.JOB_MAX_ATTEMPTS and not job_queue.is_cancelled(job_id)
+        logger.error(f"Worker {worker_id} failed on session {session_id} (attempt {item['attempt']}): {type(e).__name__}: {e}")
+        recorded = job_queue.fail(item_id, job_id, worker_id, str(e), retry=retry)
+    finally:
+        done.set()
+        db.close()
+    if not recorded:
+        logger.warning(f"Worker {worker_id} lost the lease on job {job_id} item {item['idx']}; its outcome was discarded")
+
+
+def run_worker(worker_id: str, stop_event) -> None:
+    """Claim and process items until asked to stop."""
+    logging.basicConfig(level=logging.INFO)
+    # The parent process handles signals and sets stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logger.info(f"Worker {worker_id} started")
+
+    while not stop_event.is_set():
+        item = job_queue.claim(worker_id)
+        if item is None:
+            stop_event.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        logger.info(f"Worker {worker_id} processing job {item['job_id']} item {item['idx']} (session {item['session_id']})")
+        process_item(item, worker_id)
+
+    logger.info(f"Worker {worker_id} stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background guide generation workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES, help="Number of worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings.log_summary()
+    stop_event = multiprocessing.Event()
+    host = socket.gethostname()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(f"{host}-{os.getpid()}-{n}", stop_event), daemon=False)
+        for n in range(args.processes)
+    ]
+    for p in processes:
+        p.start()
+
+    def _shutdown(signum, frame):
+        logger.info("Shutting down workers after their current item...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
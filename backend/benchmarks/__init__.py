@@ -0,0 +1,19 @@
+"""
+Benchmark suite: every evaluations route plus the LLMService helpers, run
+against a local SQLite fixture and the deterministic fake LLM.
+
+    cd backend
+    python -m benchmarks.run --scales small,medium
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+
+import os
+
+# The app reads its settings when they are first used: point it at the fake LLM
+# and give the (unused) Postgres URL placeholder values before anything reads them.
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_LEDGER_ENABLED", "false")
+os.environ.setdefault("QUESTION_BANK_ENABLED", "false")  # Keep runs independent of earlier ones
+os.environ.setdefault("COMPRESSION_ENABLED", "false")
+for _name in ("PG_HOST", "PG_DBNAME", "PG_USERNAME", "PG_PASSWORD"):
+    os.environ.setdefault(_name, "benchmark")
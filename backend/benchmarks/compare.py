@@ -0,0 +1,89 @@
+"""
+Diff two benchmark baselines written by benchmarks.run.
+
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json --threshold 10
+
+Prints the change of every shared metric and exits with status 1 when a
+latency or memory metric got worse (or throughput dropped) by more than the
+threshold percentage.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# metric -> True when a higher value is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput_rps": True,
+    "peak_memory_kb": False,
+    "output_tokens_per_guide": False,
+}
+
+
+def _entries(report: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for name, stats in report.get("startup", {}).items():
+        yield f"[startup] {name}", stats
+    for scale, routes in report.get("routes", {}).items():
+        for route, stats in routes.items():
+            yield f"[{scale}] {route}", stats
+    for helper, stats in report.get("llm_helpers", {}).items():
+        yield f"[helper] {helper}", stats
+    for wire_format, stats in report.get("wire_format", {}).items():
+        yield f"[wire] {wire_format}", stats
+
+
+def change_pct(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the regressions."""
+    new_entries = dict(_entries(new))
+    regressions = []
+    print(f"{'benchmark':<70} {'metric':<15} {'old':>10} {'new':>10} {'change':>9}")
+    for name, old_stats in _entries(old):
+        new_stats = new_entries.get(name)
+        if new_stats is None:
+            print(f"{name:<70} missing from new baseline")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            pct = change_pct(old_stats.get(metric), new_stats.get(metric))
+            if pct is None:
+                continue
+            worse = -pct if higher_is_better else pct
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric} {pct:+.1f}%")
+            print(f"{name:<70} {metric:<15} {old_stats[metric]:>10} {new_stats[metric]:>10} {pct:>+8.1f}%{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark baselines")
+    parser.add_argument("old", help="Baseline JSON (e.g. from the previous commit)")
+    parser.add_argument("new", help="JSON to check against the baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    old = json.loads(Path(args.old).read_text())
+    new = json.loads(Path(args.new).read_text())
+    print(f"Comparing {old['meta'].get('commit')} -> {new['meta'].get('commit')}\n")
+    regressions = compare(old, new, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+SQLite stand-in for the Skillfully tables, seeded at several data scales.
+
+The production models use Postgres types (JSONB, UUID, array_agg). The shims
+below let the same models and queries run on SQLite so the routes can be
+benchmarked without a database server.
+"""
+
+import datetime
+import json
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import String, create_engine
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import sqltypes
+from sqlalchemy.sql.functions import array_agg
+
+from app.database import Base
+from app.models_existing import Evaluation, EvaluationFeedback, EvaluationVoiceElsa, SkillsMap
+
+
+@dataclass(frozen=True)
+class Scale:
+    campaigns: int
+    sessions_per_campaign: int
+    skills_per_session: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(campaigns=2, sessions_per_campaign=25, skills_per_session=4),
+    "medium": Scale(campaigns=5, sessions_per_campaign=200, skills_per_session=6),
+    "large": Scale(campaigns=20, sessions_per_campaign=500, skills_per_session=8),
+}
+
+SKILLS = [
+    "Communication", "Problem Solving", "Empathy", "Active Listening", "Conflict Resolution",
+    "Time Management", "Product Knowledge", "Stakeholder Management", "Negotiation", "Adaptability",
+]
+SCENARIO_TYPES = ["EMAIL", "CHAT", "VOICE"]
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "VARCHAR(36)"
+
+
+@compiles(array_agg, "sqlite")
+def _compile_array_agg(element, compiler, **kw):
+    return "json_group_array(%s)" % compiler.process(element.clauses, **kw)
+
+
+class _JSONArray(sqltypes.ARRAY):
+    """array_agg results come back from SQLite as JSON text; decode them to lists."""
+
+    def bind_processor(self, dialect):
+        return None
+
+    def result_processor(self, dialect, coltype):
+        return lambda value: json.loads(value) if value is not None else None
+
+
+def _use_string_uuids() -> None:
+    # Postgres UUID columns hold plain strings on SQLite
+    for table in (Evaluation.__table__, EvaluationVoiceElsa.__table__):
+        for column in ("user_id", "campaign_id", "scenario_id"):
+            table.c[column].type = String(36)
+
+
+@dataclass
+class Fixture:
+    scale_name: str
+    sessionmaker: sessionmaker
+    campaign_ids: List[str]
+    session_ids: List[str]
+
+
+def build_fixture(scale_name: str, seed: int = 42, path: Optional[str] = None) -> Fixture:
+    """
+    Create a database populated at the given scale. In memory by default; with
+    `path`, a fresh file database behind the production pool sizes, so
+    concurrent load sees realistic pool contention.
+    """
+    scale = SCALES[scale_name]
+    _use_string_uuids()
+    if path is None:
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool  # One shared in-memory connection for all threads
+        )
+    else:
+        if os.path.exists(path):
+            os.remove(path)
+        engine = create_engine(
+            f"sqlite:///{path}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+            pool_size=5,
+            max_overflow=10
+        )
+    engine.dialect.colspecs = {**engine.dialect.colspecs, sqltypes.ARRAY: _JSONArray}
+    Base.metadata.create_all(
+        engine,
+        tables=[Evaluation.__table__, EvaluationFeedback.__table__, EvaluationVoiceElsa.__table__, SkillsMap.__table__]
+    )
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 1, 1)
+    campaign_ids, session_ids = [], []
+    evaluations, feedback, voice = [], [], []
+    for c in range(scale.campaigns):
+        campaign_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        campaign_ids.append(campaign_id)
+        scenario_type = SCENARIO_TYPES[c % len(SCENARIO_TYPES)]
+        for s in range(scale.sessions_per_campaign):
+            session_id = f"bench-{c}-{s}"
+            session_ids.append(session_id)
+            email = f"candidate.{c}.{s}@example.com"
+            created_at = start + datetime.timedelta(hours=c * scale.sessions_per_campaign + s)
+            for skill in rng.sample(SKILLS, scale.skills_per_session):
+                score = rng.randint(1, 5)
+                evaluations.append({
+                    "session_id": session_id,
+                    "email": email,
+                    "skill": skill,
+                    "result": {"score": f"{score}/5" if rng.random() < 0.3 else score, "reason": f"{skill}: observed behaviour " * 4},
+                    "transcript": "Customer: I need help with my order. Agent: Happy to help. " * 20,
+                    "created_at": created_at,
+                    "campaign_id": campaign_id,
+                    "campaign_name": f"Campaign {c}",
+                    "scenario_name": f"Support Scenario {c}",
+                    "scenario_type": scenario_type,
+                })
+            if rng.random() < 0.5:
+                feedback.append({
+                    "session_id": session_id,
+                    "feedback": {"Key_Strengths": [{"title": "Empathy", "strength": "Acknowledged the customer's frustration"}]},
+                    "created_at": created_at,
+                })
+            if scenario_type == "VOICE":
+                voice.append({
+                    "session_id": session_id,
+                    "elsa_score": {"overall": rng.randint(60, 95)},
+                    "result": {"reasons": ["Clear pronunciation", "Steady pace"]},
+                    "created_at": created_at,
+                    "campaign_id": campaign_id,
+                })
+
+    with engine.begin() as conn:
+        conn.execute(Evaluation.__table__.insert(), evaluations)
+        if feedback:
+            conn.execute(EvaluationFeedback.__table__.insert(), feedback)
+        if voice:
+            conn.execute(EvaluationVoiceElsa.__table__.insert(), voice)
+        conn.execute(SkillsMap.__table__.insert(), [
+            {"skill_id": i + 1, "skill_name": name, "skill_prompt": f"Assess {name}", "version_number": 1}
+            for i, name in enumerate(SKILLS)
+        ])
+
+    return Fixture(scale_name, SessionLocal, campaign_ids, session_ids)
@@ -0,0 +1,368 @@
+"""
+Load generator replaying recruiter flows at increasing arrival rates.
+
+    # Local instance on a file-backed fixture, fake LLM at 800 ms per call
+    python -m benchmarks.load --local --scale medium --llm-latency-ms 800 --rates 0.5,1,2,4,8 --duration 30
+
+    # Any running instance (start it with LLM_PROVIDER=fake)
+    python -m benchmarks.load --url http://localhost:8000 --rates 1,2,4
+
+Users arrive open-loop (Poisson) at each rate and run one flow picked by
+`--mix`. Each rate step reports achieved throughput, latency per request
+type, errors and deltas of the server's /metrics: pool wait, LLM call time
+and stage time. These deltas show whether the DB pool, the LLM or the
+request threadpool saturates first.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from . import fixtures  # noqa: F401  (imports the benchmark environment first)
+from .run import RESULTS_DIR, _git_commit, percentile
+
+API = "/api/evaluations"
+DEFAULT_MIX = "browse=5,generate=2,regenerate=2,detail=1"
+
+_METRIC_LINE = re.compile(r'^(\w+?)(_sum|_count)(?:\{(.*)\})? ([0-9.eE+-]+)$')
+_POOL_GAUGE = re.compile(r'^executor_(busy_threads|queued_tasks)\{pool="(\w+)"\} ([0-9.eE+-]+)$')
+SAMPLE_INTERVAL_SECONDS = 1.0
+
+
+class Recorder:
+    """Latencies and failures per request name for one rate step."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.rejected = 0  # 429s from admission control
+
+    def add(self, name: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(name, []).append(seconds)
+        if status == 429:
+            self.rejected += 1
+        if status is None or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "p50_ms": round(percentile([v * 1000 for v in values], 50), 1),
+                "p95_ms": round(percentile([v * 1000 for v in values], 95), 1),
+                "p99_ms": round(percentile([v * 1000 for v in values], 99), 1),
+            }
+            for name, values in sorted(self.latencies.items())
+        }
+
+
+class Flows:
+    """Recruiter flows; each one is a short sequence of API calls."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.campaign_ids: List[str] = []
+        self.session_ids: Dict[str, List[str]] = {}
+
+    async def _call(self, name: str, method: str, path: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            return response
+        except httpx.HTTPError:
+            return None
+        finally:
+            self.recorder.add(name, time.perf_counter() - started, response.status_code if response is not None else None)
+
+    async def _campaign(self) -> Optional[str]:
+        response = await self._call("list_campaigns", "GET", f"{API}/campaigns")
+        if response is not None and response.status_code == 200:
+            self.campaign_ids = [c["campaign_id"] for c in response.json()] or self.campaign_ids
+        return self.rng.choice(self.campaign_ids) if self.campaign_ids else None
+
+    async def _sessions(self, campaign_id: str) -> List[str]:
+        response = await self._call("open_campaign", "GET", f"{API}/campaigns/{campaign_id}/candidates")
+        if response is not None and response.status_code == 200:
+            self.session_ids[campaign_id] = [c["latest_session_id"] for c in response.json() if c.get("latest_session_id")]
+        return self.session_ids.get(campaign_id, [])
+
+    async def browse(self) -> None:
+        campaign_id = await self._campaign()
+        if campaign_id:
+            sessions = await self._sessions(campaign_id)
+            for session_id in self.rng.sample(sessions, min(2, len(sessions))):
+                await self._call("open_session", "GET", f"{API}/session/{session_id}")
+
+    async def detail(self) -> None:
+        await self._call("list_sessions", "GET", f"{API}/sessions", params={"limit": 50})
+        await self._call("list_candidates", "GET", f"{API}/candidates", params={"limit": 50})
+
+    async def generate(self) -> None:
+        campaign_id = await self._campaign()
+        sessions = await self._sessions(campaign_id) if campaign_id else []
+        if not sessions:
+            return
+        body = {
+            "session_ids": self.rng.sample(sessions, min(2, len(sessions))),
+            "job_description": "Customer support specialist handling escalations across email, chat and phone.",
+            "required_skills": [{"skill_name": "Communication", "priority": "high", "min_score": 4}],
+            "num_questions": 8,
+        }
+        started = time.perf_counter()
+        first_event = None
+        status = None
+        try:
+            async with self.client.stream("POST", f"{API}/generate-agentic-guide-stream", json=body) as response:
+                status = response.status_code
+                async for line in response.aiter_lines():
+                    if first_event is None and line.startswith("event:"):
+                        first_event = time.perf_counter() - started
+                    if line.startswith("event: error"):
+                        status = 500
+        except httpx.HTTPError:
+            status = None
+        self.recorder.add("stream_generation", time.perf_counter() - started, status)
+        if first_event is not None:
+            self.recorder.add("stream_first_event", first_event, status)
+
+    async def regenerate(self) -> None:
+        for instruction in ("Make it more situational", "Focus on de-escalation"):
+            await self._call("regenerate_question", "POST", f"{API}/regenerate-question", json={
+                "original_question": "Tell me about a time you handled a difficult customer.",
+                "skill_name": "Conflict Resolution",
+                "instruction": instruction,
+            })
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Flows, name.strip()):
+            raise SystemExit(f"Unknown flow '{name}' (browse, detail, generate, regenerate)")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+def parse_metrics(text: str) -> Dict[Tuple[str, str], float]:
+    """Histogram `_sum`/`_count` samples keyed by (name + suffix, labels)."""
+    samples = {}
+    for line in text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            name, suffix, labels, value = match.groups()
+            samples[(name + suffix, labels or "")] = float(value)
+    return samples
+
+
+def metric_means(before: Dict, after: Dict) -> Dict[str, Dict[str, float]]:
+    """Mean seconds (in ms) and count per histogram series over the step."""
+    means = {}
+    for (key, labels), total in after.items():
+        if not key.endswith("_sum"):
+            continue
+        name = key[:-4]
+        count = after.get((name + "_count", labels), 0) - before.get((name + "_count", labels), 0)
+        if count <= 0:
+            continue
+        series = f"{name}{{{labels}}}" if labels else name
+        means[series] = {
+            "count": int(count),
+            "mean_ms": round((total - before.get((key, labels), 0)) / count * 1000, 1),
+        }
+    return means
+
+
+def sample_pools(text: str, peaks: Dict[str, Dict[str, float]]) -> None:
+    """Fold one /metrics scrape into the peak busy/queued counts per workload pool."""
+    for line in text.splitlines():
+        match = _POOL_GAUGE.match(line)
+        if match:
+            field, pool, value = match.groups()
+            pool_peaks = peaks.setdefault(pool, {"busy_threads": 0, "queued_tasks": 0})
+            pool_peaks[field] = max(pool_peaks[field], float(value))
+
+
+def bottleneck_hint(step: Dict[str, Any], llm_latency_ms: Optional[float]) -> str:
+    """
+    Rough attribution from the step's numbers: pool wait means the DB pool is
+    short, tasks queued for a workload pool mean that pool is full, LLM calls
+    slower than the fake's fixed latency mean LLM concurrency (threads waiting
+    inside the call), and a throughput shortfall with none of these points at
+    the CPU.
+    """
+    server = step["server"]
+    pools = step.get("pool_peaks", {})
+    pool_wait = server.get("db_pool_wait_seconds", {}).get("mean_ms", 0)
+    llm_means = [v["mean_ms"] for k, v in server.items() if k.startswith("llm_call_duration_seconds")]
+    llm_mean = max(llm_means) if llm_means else None
+    if pool_wait > 50:
+        return "db_pool"
+    if pools.get("request", {}).get("queued_tasks", 0) > 0:
+        return "request_threadpool"
+    if pools.get("llm", {}).get("queued_tasks", 0) > 0:
+        return "llm_executor"
+    if llm_latency_ms and llm_mean and llm_mean > llm_latency_ms * 1.5 + 50:
+        return "llm_concurrency"
+    if step["achieved_rps"] < step["offered_rps"] * 0.9 or step["in_flight_at_end"] > step["offered_rps"] * 5:
+        return "cpu"
+    return "none"
+
+
+async def run_step(base_url: str, rate: float, duration: float, mix: List[Tuple[str, float]], seed: int, llm_latency_ms: Optional[float]) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        before = parse_metrics((await client.get("/metrics")).text)
+        flows = Flows(client, recorder, rng)
+        names, weights = zip(*mix)
+        tasks: List[asyncio.Task] = []
+        flow_latencies: List[float] = []
+        pool_peaks: Dict[str, Dict[str, float]] = {}
+
+        async def sampler() -> None:
+            while True:
+                await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+                try:
+                    sample_pools((await client.get("/metrics")).text, pool_peaks)
+                except httpx.HTTPError:
+                    pass
+
+        async def user(flow: Callable[[], Awaitable[None]]) -> None:
+            started = time.perf_counter()
+            await flow()
+            flow_latencies.append(time.perf_counter() - started)
+
+        sampling = asyncio.create_task(sampler())
+        started = time.perf_counter()
+        next_arrival = started
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - started >= duration:
+                break
+            await asyncio.sleep(max(next_arrival - time.perf_counter(), 0))
+            flow = getattr(flows, rng.choices(names, weights)[0])
+            tasks.append(asyncio.create_task(user(flow)))
+        in_flight = sum(1 for task in tasks if not task.done())
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        sampling.cancel()
+        after = parse_metrics((await client.get("/metrics")).text)
+
+    step = {
+        "offered_rps": rate,
+        "users": len(tasks),
+        "achieved_rps": round(len(flow_latencies) / elapsed, 3),
+        "in_flight_at_end": in_flight,
+        "drain_seconds": round(elapsed - duration, 2),
+        "flow_p50_ms": round(percentile([v * 1000 for v in flow_latencies], 50), 1) if flow_latencies else None,
+        "flow_p95_ms": round(percentile([v * 1000 for v in flow_latencies], 95), 1) if flow_latencies else None,
+        "rejected": recorder.rejected,
+        "errors": sum(recorder.errors.values()),
+        "requests": recorder.summary(),
+        "server": metric_means(before, after),
+        "pool_peaks": pool_peaks,
+    }
+    step["bottleneck"] = bottleneck_hint(step, llm_latency_ms)
+    return step
+
+
+def start_local_server(scale: str, port: int) -> Tuple[str, Any]:
+    """Serve the app on a file-backed fixture from a background thread."""
+    import uvicorn
+
+    from app.main import app
+
+    from .run import install_fixture
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    fixture = fixtures.build_fixture(scale, path=str(RESULTS_DIR / f"load-{scale}.sqlite3"))
+    install_fixture(fixture)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="load-server", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def print_curve(steps: List[Dict[str, Any]]) -> None:
+    print(f"\n{'offered':>8} {'achieved':>9} {'users':>6} {'flow p50':>10} {'flow p95':>10} {'errors':>7} {'429':>5} {'pool wait':>10} {'llm busy':>9}  bottleneck")
+    for step in steps:
+        pool_wait = step["server"].get("db_pool_wait_seconds", {}).get("mean_ms", 0)
+        llm_busy = step["pool_peaks"].get("llm", {}).get("busy_threads", 0)
+        print(
+            f"{step['offered_rps']:>8} {step['achieved_rps']:>9} {step['users']:>6} "
+            f"{step['flow_p50_ms'] or 0:>8.0f}ms {step['flow_p95_ms'] or 0:>8.0f}ms "
+            f"{step['errors']:>7} {step['rejected']:>5} {pool_wait:>8.1f}ms {llm_busy:>9.0f}  {step['bottleneck']}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recruiter flows at increasing arrival rates")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running instance")
+    target.add_argument("--local", action="store_true", help="Start an instance in-process on a fixture and the fake LLM")
+    parser.add_argument("--scale", default="medium", help="Fixture scale for --local")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --local")
+    parser.add_argument("--llm-latency-ms", type=float, default=None, help="Fake LLM latency for --local (also used for attribution)")
+    parser.add_argument("--rates", default="0.5,1,2,4,8", help="Comma-separated user arrival rates (users/second)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of arrivals per rate")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Flow weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Output JSON path (default: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    base_url = args.url
+    if args.local:
+        from app.config import settings
+        from app.llm_service import llm_service
+
+        if args.llm_latency_ms is not None:
+            settings.FAKE_LLM_LATENCY_MS = args.llm_latency_ms
+            llm_service._client = None
+        base_url, _ = start_local_server(args.scale, args.port)
+
+    steps = []
+    for rate in [float(r) for r in args.rates.split(",") if r.strip()]:
+        print(f"Rate {rate}/s for {args.duration}s...", file=sys.stderr)
+        steps.append(asyncio.run(run_step(base_url, rate, args.duration, mix, args.seed, args.llm_latency_ms)))
+        print_curve(steps[-1:])
+
+    print_curve(steps)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "target": base_url,
+            "local": args.local,
+            "scale": args.scale if args.local else None,
+            "llm_latency_ms": args.llm_latency_ms,
+            "duration": args.duration,
+            "mix": dict(mix),
+        },
+        "steps": steps,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
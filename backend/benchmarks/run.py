@@ -0,0 +1,340 @@
+"""
+Run the benchmark suite and write a JSON baseline.
+
+    python -m benchmarks.run --scales small,medium --iterations 30 --llm-latency-ms 0
+
+Each evaluations route is called sequentially through the ASGI app (no
+network) with the fake LLM; results report throughput, p50/p95/p99 latency
+and peak traced memory per route and scale. The wire format section compares
+guide latency and output tokens for the verbose and compact LLM responses.
+"""
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import fixtures  # noqa: F401  (imports the benchmark environment first)
+from .fixtures import SCALES, Fixture, build_fixture
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[Any, Fixture, int], Any]  # (client, fixture, iteration) -> response
+    expected_status: Iterable[int] = (200,)
+    iterations_divisor: int = 1  # Slow cases (LLM pipeline) run fewer iterations
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], total_seconds: float, peak_bytes: Optional[int]) -> Dict[str, Any]:
+    ms = [value * 1000 for value in latencies]
+    return {
+        "iterations": len(ms),
+        "throughput_rps": round(len(ms) / total_seconds, 2) if total_seconds else None,
+        "mean_ms": round(statistics.mean(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "peak_memory_kb": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+    }
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 2, trace_memory: bool = True) -> Dict[str, Any]:
+    """Time `fn(i)` sequentially, then run it once more under tracemalloc for peak memory."""
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        fn(warmup + i)
+        latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn(warmup + iterations)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return summarize(latencies, total, peak)
+
+
+# ---------------------------------------------------------------------------
+# Route cases
+# ---------------------------------------------------------------------------
+
+def _session(fixture: Fixture, i: int) -> str:
+    return fixture.session_ids[i % len(fixture.session_ids)]
+
+
+def _sessions(fixture: Fixture, i: int, count: int) -> List[str]:
+    return [_session(fixture, i * count + n) for n in range(count)]
+
+
+def _guide_body(fixture: Fixture, i: int, count: int) -> Dict[str, Any]:
+    return {
+        "session_ids": _sessions(fixture, i, count),
+        "job_description": "Customer support specialist handling escalations across email, chat and phone.",
+        "required_skills": [{"skill_name": "Communication", "priority": "high", "min_score": 4}],
+        "num_questions": 8,
+    }
+
+
+def _cancel_stream_run(client, fixture: Fixture, i: int):
+    from app.stream_runs import stream_runs
+    run = stream_runs.create()
+    return client.post(f"/api/evaluations/generate-agentic-guide-stream/{run.run_id}/cancel")
+
+
+def _resume_stream_run(client, fixture: Fixture, i: int):
+    from app.stream_runs import stream_runs
+    run = stream_runs.create()
+    for n in range(20):
+        run.publish("step", {"step": "fetching_data", "candidate_index": n, "progress": n * 5})
+    run.finish()
+    return client.get(f"/api/evaluations/generate-agentic-guide-stream/{run.run_id}", headers={"Last-Event-ID": "5"})
+
+
+ROUTE_CASES: List[Case] = [
+    Case("GET /campaigns", lambda c, f, i: c.get("/api/evaluations/campaigns")),
+    Case("GET /campaigns/{id}/candidates", lambda c, f, i: c.get(f"/api/evaluations/campaigns/{f.campaign_ids[i % len(f.campaign_ids)]}/candidates")),
+    Case("GET /skills", lambda c, f, i: c.get("/api/evaluations/skills")),
+    Case("GET /sessions", lambda c, f, i: c.get("/api/evaluations/sessions?limit=50")),
+    Case("GET /session/{id}", lambda c, f, i: c.get(f"/api/evaluations/session/{_session(f, i)}")),
+    Case("GET /candidates", lambda c, f, i: c.get("/api/evaluations/candidates?limit=50")),
+    Case("POST /generate-agentic-guide (1 candidate)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide", json=_guide_body(f, i, 1)), iterations_divisor=2),
+    Case("POST /generate-agentic-guide (5 candidates)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide", json=_guide_body(f, i, 5)), iterations_divisor=5),
+    Case("POST /generate-agentic-guide (5 candidates, fast)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide", json={**_guide_body(f, i, 5), "profile": "fast"}), iterations_divisor=5),
+    Case("POST /generate-agentic-guide (5 candidates, packed)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide", json={**_guide_body(f, i, 5), "pack": True}), iterations_divisor=5),
+    Case("POST /generate-agentic-guide (5 candidates, draft)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide", json={**_guide_body(f, i, 5), "mode": "draft"}), iterations_divisor=5),
+    Case("POST /generate-agentic-guide-stream (3 candidates)", lambda c, f, i: c.post("/api/evaluations/generate-agentic-guide-stream", json=_guide_body(f, i, 3)), iterations_divisor=3),
+    Case("GET /generate-agentic-guide-stream/{run_id}", _resume_stream_run),
+    Case("POST /generate-agentic-guide-stream/{run_id}/cancel", _cancel_stream_run),
+    Case("POST /generate-guide/{session_id}", lambda c, f, i: c.post(f"/api/evaluations/generate-guide/{_session(f, i)}"), iterations_divisor=2),
+    Case("POST /regenerate-question", lambda c, f, i: c.post("/api/evaluations/regenerate-question", json={
+        "original_question": "Tell me about a difficult customer.",
+        "skill_name": "Empathy",
+        "instruction": f"Variant {i}",
+    })),
+]
+
+
+def install_fixture(fixture: Fixture):
+    """Point the app's DB sessions (requests and background threads) at the fixture."""
+    from fastapi.testclient import TestClient
+
+    from app import database
+    from app.main import app
+    from app.routes import evaluations
+
+    database.SessionLocal = fixture.sessionmaker  # get_db looks it up per request
+    evaluations.SessionLocal = fixture.sessionmaker
+    return TestClient(app)
+
+
+def run_routes(fixture: Fixture, iterations: int, trace_memory: bool) -> Dict[str, Any]:
+    client = install_fixture(fixture)
+    results = {}
+    for case in ROUTE_CASES:
+        def call(i: int, case: Case = case):
+            response = case.call(client, fixture, i)
+            if response.status_code not in case.expected_status:
+                raise RuntimeError(f"{case.name} returned {response.status_code}: {response.text[:200]}")
+            return response
+
+        results[case.name] = measure(call, max(iterations // case.iterations_divisor, 3), trace_memory=trace_memory)
+        print(f"  {case.name:<55} p50 {results[case.name]['p50_ms']:>9.2f} ms  p95 {results[case.name]['p95_ms']:>9.2f} ms", file=sys.stderr)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# LLMService helper micro-benchmarks
+# ---------------------------------------------------------------------------
+
+def run_llm_helpers(iterations: int, trace_memory: bool) -> Dict[str, Any]:
+    from app.fake_llm import FakeLLMClient
+    from app.llm_service import llm_service
+
+    fake = FakeLLMClient()
+    guide = fake.respond("Generate EXACTLY 12 questions total")
+    short_guide = fake.respond("Generate EXACTLY 5 questions total")
+    additional = fake.respond("Generate EXACTLY 7 NEW interview questions")
+    evidence = [
+        {"skill_name": f"Skill {n}", "score": n % 5 + 1, "max_score": 5, "reason": "Observed behaviour " * 10,
+         "transcript_snippet": "Customer: hello " * 20, "is_required": n % 2 == 0, "priority": "high"}
+        for n in range(8)
+    ]
+    gaps = [
+        {"skill_name": f"Skill {n}", "current_score": 2, "required_score": 4, "gap_severity": "moderate",
+         "priority": "high", "evidence": "Missed cues " * 10, "transcript_snippet": "Agent: sorry " * 10}
+        for n in range(6)
+    ]
+    not_tested = [{"skill_name": f"Untested {n}", "priority": "medium", "reason": "Not evaluated"} for n in range(3)]
+    verified = [{"skill_name": f"Verified {n}", "score": 5, "evidence": "Strong " * 10} for n in range(3)]
+
+    helpers = {
+        "_format_evidence": lambda i: llm_service._format_evidence(evidence),
+        "_format_verified_skills": lambda i: llm_service._format_verified_skills(verified),
+        "_format_skill_gaps": lambda i: llm_service._format_skill_gaps(gaps),
+        "_format_not_tested_skills": lambda i: llm_service._format_not_tested_skills(not_tested),
+        "_build_additional_questions_prompt": lambda i: llm_service._build_additional_questions_prompt(
+            candidate_name="Jane Doe", role="Support Specialist", job_description="Handle escalations. " * 50,
+            skill_gaps=gaps, skills_not_tested=not_tested,
+            existing_questions=llm_service._extract_existing_questions(guide), needed=4, scenario_type="EMAIL"
+        ),
+        "_count_questions": lambda i: llm_service._count_questions(guide),
+        "_extract_existing_questions": lambda i: llm_service._extract_existing_questions(guide),
+        "_merge_additional_questions": lambda i: llm_service._merge_additional_questions(copy.deepcopy(short_guide), additional),
+        "_trim_questions": lambda i: llm_service._trim_questions(copy.deepcopy(guide)["sections"], 8),
+        "_get_mock_agentic_response": lambda i: llm_service._get_mock_agentic_response("Jane Doe", verified, gaps, not_tested, 8),
+    }
+    results = {}
+    for name, fn in helpers.items():
+        results[name] = measure(fn, iterations, trace_memory=trace_memory)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Wire format: verbose vs compact LLM responses
+# ---------------------------------------------------------------------------
+
+WIRE_FORMATS = {"verbose": False, "compact": True}  # name -> LLM_COMPACT_OUTPUT
+
+
+def run_wire_format(iterations: int, ms_per_1k_chars: float) -> Dict[str, Any]:
+    """
+    Generate a 12-question guide in each wire format, with the fake LLM taking
+    `ms_per_1k_chars` per 1k response characters (output-bound latency), and
+    report latency and completion tokens per guide.
+    """
+    from app.config import settings
+    from app.fake_llm import FakeLLMClient
+    from app.llm_service import llm_service
+    from app.metrics import metrics
+
+    gaps = [
+        {"skill_name": f"Skill {n}", "current_score": 2, "required_score": 4, "gap_severity": "moderate",
+         "priority": "high", "evidence": "Missed cues " * 10, "transcript_snippet": "Agent: sorry " * 10}
+        for n in range(6)
+    ]
+    not_tested = [{"skill_name": f"Untested {n}", "priority": "medium", "reason": "Not evaluated"} for n in range(3)]
+
+    def generate(i: int):
+        return llm_service.generate_agentic_guide(
+            candidate_name="Jane Doe", role="Support Specialist", job_description="Handle escalations. " * 50,
+            verified_skills=[], skill_gaps=gaps, skills_not_tested=not_tested, evaluation_evidence=[],
+            num_questions=12
+        )
+
+    def completion_tokens() -> float:
+        return sum(metrics.get("llm_tokens_total", {"type": "completion", "call_type": call_type}) for call_type in ("first", "top_up"))
+
+    original_client, original_compact = llm_service._client, settings.LLM_COMPACT_OUTPUT
+    llm_service._client = FakeLLMClient(ms_per_1k_chars=ms_per_1k_chars, shortfall=settings.FAKE_LLM_SHORTFALL)
+    results = {}
+    try:
+        for name, compact in WIRE_FORMATS.items():
+            settings.LLM_COMPACT_OUTPUT = compact
+            before = completion_tokens()
+            results[name] = measure(generate, iterations, trace_memory=False)
+            results[name]["output_tokens_per_guide"] = round((completion_tokens() - before) / (iterations + 2), 1)  # + warmup calls
+            print(f"  {name:<10} p50 {results[name]['p50_ms']:>9.2f} ms  output tokens/guide {results[name]['output_tokens_per_guide']:>8.1f}", file=sys.stderr)
+    finally:
+        llm_service._client, settings.LLM_COMPACT_OUTPUT = original_client, original_compact
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated data scales ({', '.join(SCALES)})")
+    parser.add_argument("--iterations", type=int, default=30, help="Iterations per route (LLM routes run fewer)")
+    parser.add_argument("--helper-iterations", type=int, default=2000, help="Iterations per LLMService helper")
+    parser.add_argument("--llm-latency-ms", type=float, default=None, help="Fake LLM latency per call")
+    parser.add_argument("--llm-shortfall", type=int, default=None, help="Questions missing from the first guide call (exercises top-up)")
+    parser.add_argument("--wire-iterations", type=int, default=10, help="Guides per wire format (0 skips the comparison)")
+    parser.add_argument("--wire-ms-per-1k-chars", type=float, default=20.0, help="Fake LLM latency per 1k response characters for the wire format comparison")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", default=None, help="Output JSON path (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    from app.config import settings
+    from app.llm_service import llm_service
+
+    if args.llm_latency_ms is not None:
+        settings.FAKE_LLM_LATENCY_MS = args.llm_latency_ms
+    if args.llm_shortfall is not None:
+        settings.FAKE_LLM_SHORTFALL = args.llm_shortfall
+    llm_service._client = None  # Rebuild the fake client with the settings above
+
+    commit = _git_commit()
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": commit,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "llm_provider": settings.LLM_PROVIDER,
+            "fake_llm_latency_ms": settings.FAKE_LLM_LATENCY_MS,
+            "fake_llm_shortfall": settings.FAKE_LLM_SHORTFALL,
+            "iterations": args.iterations,
+        },
+        "startup": {},
+        "routes": {},
+        "llm_helpers": {},
+        "wire_format": {},
+    }
+
+    from .startup import measure_import
+    print("Import time...", file=sys.stderr)
+    report["startup"]["import app.main"] = measure_import("app.main")
+
+    for scale_name in [s.strip() for s in args.scales.split(",") if s.strip()]:
+        print(f"Scale {scale_name}: building fixture...", file=sys.stderr)
+        fixture = build_fixture(scale_name)
+        report["routes"][scale_name] = run_routes(fixture, args.iterations, trace_memory=not args.no_memory)
+
+    print("LLMService helpers...", file=sys.stderr)
+    report["llm_helpers"] = run_llm_helpers(args.helper_iterations, trace_memory=not args.no_memory)
+
+    if args.wire_iterations:
+        print("Wire format...", file=sys.stderr)
+        report["wire_format"] = run_wire_format(args.wire_iterations, args.wire_ms_per_1k_chars)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Import-time budget for the web app.
+
+    python -m benchmarks.startup --budget-ms 2000
+
+Imports `app.main` in fresh interpreters without database credentials and
+checks four things: the import stays under the budget, nothing is printed,
+none of the deferred heavy dependencies (OpenAI SDK, Postgres driver) are
+loaded, and the settings (with the .env file) are not read yet. It exits non-zero when any check fails. benchmarks.run records the
+same measurement in its baseline.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .run import percentile
+
+BACKEND_DIR = Path(__file__).parent.parent
+# Loaded on first use (LLM client, DB engine), never at import
+DEFERRED_MODULES = ("openai", "psycopg2")
+
+_IMPORT_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$")
+# Reported on stderr after the import, so the stdout check stays meaningful
+_SETTINGS_PROBE = "import sys; from app.config import settings; sys.stderr.write(f'settings loaded: {settings._settings is not None}\\n')"
+
+
+def _clean_env() -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PG_") and k != "OPENAI_API_KEY"}
+    env.pop("LLM_PROVIDER", None)
+    return env
+
+
+def measure_import(module: str = "app.main", runs: int = 5) -> Dict[str, Any]:
+    """Cumulative import time of `module` over fresh interpreters, plus side-effect checks."""
+    times_ms: List[float] = []
+    printed = ""
+    eager: set = set()
+    settings_loaded = False
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}; {_SETTINGS_PROBE}"],
+            cwd=BACKEND_DIR, env=_clean_env(), capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        printed = printed or proc.stdout
+        settings_loaded = settings_loaded or "settings loaded: True" in proc.stderr
+        for line in proc.stderr.splitlines():
+            match = _IMPORT_LINE.match(line)
+            if not match:
+                continue
+            cumulative_us, indent, name = match.groups()
+            if name.split(".")[0] in DEFERRED_MODULES:
+                eager.add(name.split(".")[0])
+            if name == module and not indent:
+                times_ms.append(int(cumulative_us) / 1000)
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(times_ms, 50), 1),
+        "max_ms": round(max(times_ms), 1),
+        "stdout": printed.strip(),
+        "eager_modules": sorted(eager),
+        "settings_loaded": settings_loaded,
+    }
+
+
+def check(result: Dict[str, Any], budget_ms: float) -> List[str]:
+    problems = []
+    if result["p50_ms"] > budget_ms:
+        problems.append(f"import took {result['p50_ms']} ms (budget {budget_ms} ms)")
+    if result["stdout"]:
+        problems.append(f"import printed to stdout: {result['stdout'][:200]!r}")
+    if result["eager_modules"]:
+        problems.append(f"deferred modules imported eagerly: {', '.join(result['eager_modules'])}")
+    if result.get("settings_loaded"):
+        problems.append("import read the settings (and .env); read them on first use or at startup")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check the app's import time and import side effects")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Allowed p50 import time")
+    args = parser.parse_args(argv)
+
+    result = measure_import(args.module, args.runs)
+    print(f"import {args.module}: p50 {result['p50_ms']} ms, max {result['max_ms']} ms over {result['runs']} runs")
+    problems = check(result, args.budget_ms)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
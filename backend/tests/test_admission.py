@@ -0,0 +1,85 @@
+"""AdmissionController: 429 with Retry-After, bounded queue waits and slot hand-off."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.admission import AdmissionController
+from app.config import settings
+from app.metrics import metrics
+
+
+def _controller(name, max_concurrent=1, max_queue=0):
+    return AdmissionController(name, max_concurrent=lambda: max_concurrent, max_queue=lambda: max_queue)
+
+
+def test_full_queue_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_DEFAULT_RETRY_AFTER_SECONDS", 7)
+    controller = _controller("test_queue_full")
+
+    async def main():
+        await controller.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await controller.acquire()
+        return exc.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "7"
+    assert controller.active == 1
+    assert metrics.get("admission_rejections_total", {"pool": "test_queue_full", "reason": "queue_full"}) == 1
+
+
+def test_retry_after_follows_hold_time_and_queue_depth():
+    controller = _controller("test_retry_after", max_concurrent=2)
+    controller._avg_hold_seconds = 3.0
+    assert controller.retry_after() == 2  # ceil(3 * 1 / 2)
+    controller._avg_hold_seconds = 0.1
+    assert controller.retry_after() == 1  # Never less than a second
+
+
+def test_queued_request_times_out_with_429(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_TIMEOUT_SECONDS", 0.05)
+    controller = _controller("test_queue_timeout", max_queue=1)
+
+    async def main():
+        await controller.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await controller.acquire()
+        return exc.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert controller.queued == 0
+    assert metrics.get("admission_rejections_total", {"pool": "test_queue_timeout", "reason": "queue_timeout"}) == 1
+
+
+def test_release_hands_slot_to_waiter():
+    controller = _controller("test_hand_off", max_queue=1)
+
+    async def main():
+        granted_at = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0.01)
+        assert controller.queued == 1
+        controller.release(granted_at)
+        await asyncio.wait_for(waiter, timeout=1)
+        return controller.active, controller.queued
+
+    assert asyncio.run(main()) == (1, 0)
+    controller.release()
+    assert controller.active == 0
+
+
+def test_disabled_admission_never_rejects(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", False)
+    controller = _controller("test_disabled")
+
+    async def main():
+        for _ in range(3):
+            await controller.acquire()
+
+    asyncio.run(main())
+    assert controller.active == 0
@@ -0,0 +1,42 @@
+"""Compact response schemas stay valid for strict structured outputs."""
+
+import pytest
+
+from app import compact_format
+from app.guide_profiles import PROFILES
+from app.llm_service import _variant_schema
+from app.schemas import AdditionalQuestionsOutput, AgenticGuideOutput, GuideQuestion, PackedGuidesOutput
+
+OUTPUTS = [AgenticGuideOutput, AdditionalQuestionsOutput, GuideQuestion, PackedGuidesOutput]
+
+
+def _ref_nodes(node):
+    if isinstance(node, dict):
+        if "$ref" in node:
+            yield node
+        for value in node.values():
+            yield from _ref_nodes(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _ref_nodes(item)
+
+
+@pytest.mark.parametrize("output", OUTPUTS, ids=lambda output: output.__name__)
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("compact", [False, True], ids=["long", "compact"])
+def test_refs_have_no_sibling_keywords(output, profile, compact):
+    refs = list(_ref_nodes(_variant_schema(output, profile, compact)))
+    assert all(list(node) == ["$ref"] for node in refs), [node for node in refs if list(node) != ["$ref"]]
+
+
+def test_compact_schema_shortens_keys_and_keeps_long_names_in_descriptions():
+    schema = _variant_schema(AgenticGuideOutput, "full", True)
+    assert "sec" in schema["properties"] and "sections" not in schema["properties"]
+    assert schema["properties"]["sum"]["description"].startswith("executive_summary")
+    assert schema["required"] == list(schema["properties"])
+
+
+def test_expand_inverts_compact():
+    data = {"sections": {"skill_gaps": [{"skill_name": "Sales", "questions": [{"question": "Why?", "follow_ups": []}]}]}}
+    assert compact_format.compact(data) == {"sec": {"gaps": [{"sk": "Sales", "qs": [{"q": "Why?", "fu": []}]}]}}
+    assert compact_format.expand(compact_format.compact(data)) == data
@@ -0,0 +1,95 @@
+"""CompressionMiddleware: SSE events flushed one by one, size threshold, refused encodings."""
+
+import asyncio
+import json
+import zlib
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware
+
+MIN_SIZE = 1024
+EVENTS = [f"event: step\ndata: {json.dumps({'step': n, 'message': 'Generating guide'})}\n\n".encode() for n in range(5)]
+
+
+def _decoder(encoding: str):
+    if encoding == "br":
+        return brotli.Decompressor().process
+    return zlib.decompressobj(31).decompress  # gzip container
+
+
+def _asgi_scope(accept_encoding: str) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_sse_events_decode_as_soon_as_sent(encoding):
+    sent = []
+    decode = _decoder(encoding)
+    decoded_after_event = []
+
+    async def events_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        for event in EVENTS:
+            before = len(sent)
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+            # What the client can read right now, before the stream ends
+            decoded_after_event.append(b"".join(decode(m["body"]) for m in sent[before:] if m["type"] == "http.response.body"))
+        await send({"type": "http.response.body", "body": b""})
+
+    async def record(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    middleware = CompressionMiddleware(events_app, minimum_size=MIN_SIZE)
+    asyncio.run(middleware(_asgi_scope(encoding), receive, record))
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == encoding.encode()
+    assert b"content-length" not in headers
+    assert decoded_after_event == EVENTS
+
+
+def _json_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=MIN_SIZE)
+
+    @app.get("/json/{size}")
+    def sized(size: int):
+        return {"data": "x" * size}
+
+    return app
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_json_above_minimum_size_is_compressed(encoding):
+    client = TestClient(_json_app())
+    response = client.get("/json/4000", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert int(response.headers["content-length"]) < 4000
+    assert response.json() == {"data": "x" * 4000}
+
+
+def test_json_below_minimum_size_is_not_compressed():
+    client = TestClient(_json_app())
+    response = client.get("/json/100", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"data": "x" * 100}
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0, br;q=0", "gzip; q=0.0", "identity", ""])
+def test_refused_or_identity_encodings_get_uncompressed_bodies(accept_encoding):
+    client = TestClient(_json_app())
+    response = client.get("/json/4000", headers={"Accept-Encoding": accept_encoding})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"data": "x" * 4000}
@@ -0,0 +1,41 @@
+"""Settings load lazily: importing the app reads no files and captures no limits."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+PROBE = """
+import dotenv
+calls = []
+dotenv.load_dotenv = lambda *args, **kwargs: calls.append(1)
+import app.config
+print(len(calls))
+app.config.settings.LLM_MODEL
+print(len(calls))
+"""
+
+
+def test_import_defers_dotenv_until_settings_are_read():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert out == ["0", "1"]
+
+
+def test_importing_the_app_leaves_settings_unloaded():
+    probe = "import app.main\nfrom app.config import settings\nprint(settings._settings is None)"
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert out == ["True"]
+
+
+def test_limits_follow_settings_changes(monkeypatch):
+    from app.admission import guide_admission
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "GUIDE_MAX_CONCURRENT", 3)
+    monkeypatch.setattr(settings, "GUIDE_MAX_QUEUE", 7)
+    assert (guide_admission.max_concurrent, guide_admission.max_queue) == (3, 7)
@@ -0,0 +1,89 @@
+"""Model routing and latency-based degradation plans."""
+
+import pytest
+
+from app.config import settings
+from app.degradation import DegradationController
+from app.model_routing import model_router
+
+
+@pytest.fixture(autouse=True)
+def _models(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MODEL", "big")
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "small")
+    monkeypatch.setattr(settings, "LLM_ROUTES", {})
+    monkeypatch.setattr(settings, "LLM_ESCALATION_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_ESCALATION_MODEL", "")
+    monkeypatch.setattr(settings, "DEGRADATION_ENABLED", True)
+    monkeypatch.setattr(settings, "DEGRADATION_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "DEGRADATION_STEP_RATIOS", [1.0, 1.5, 2.5])
+    monkeypatch.setattr(settings, "LLM_LATENCY_SLO_SECONDS", 10)
+    monkeypatch.setattr(settings, "LLM_LATENCY_WINDOW_SECONDS", 300)
+
+
+def _observed(seconds, samples=5, call_type="first", model="big"):
+    controller = DegradationController()
+    for _ in range(samples):
+        controller.observe(call_type, model, seconds)
+    return controller
+
+
+def test_default_routes(monkeypatch):
+    assert model_router.routes() == {"guide": "big", "top_up": "small", "regenerate": "small", "legacy_guide": "big"}
+    monkeypatch.setattr(settings, "LLM_ROUTES", {"top_up": "custom"})
+    assert model_router.model_for("top_up") == "custom"
+
+
+def test_escalation_target(monkeypatch):
+    assert model_router.escalation_for("small") == "big"
+    assert model_router.escalation_for("big") is None
+    monkeypatch.setattr(settings, "LLM_ESCALATION_MODEL", "huge")
+    assert model_router.escalation_for("big") == "huge"
+    monkeypatch.setattr(settings, "LLM_ESCALATION_ENABLED", False)
+    assert model_router.escalation_for("small") is None
+
+
+def test_full_plan_below_slo_or_min_samples():
+    assert _observed(30, samples=4).plan(deadline_seconds=120).strategy == "full"
+    plan = _observed(5).plan(deadline_seconds=120)
+    assert plan.strategy == "full"
+    assert plan.metadata() == {"degraded": False}
+
+
+@pytest.mark.parametrize("seconds,strategy", [(12, "reduced"), (20, "fast_model"), (30, "draft")])
+def test_plan_steps_down_with_p95(seconds, strategy):
+    plan = _observed(seconds).plan(deadline_seconds=120)
+    assert plan.strategy == strategy
+    assert plan.reasons == ["llm_latency_slo"]
+    assert plan.metadata()["degradation"]["llm_p95_seconds"] == seconds
+
+
+def test_fast_model_plan_uses_fast_model():
+    plan = _observed(20).plan(deadline_seconds=120)
+    assert (plan.model, plan.max_iterations) == ("small", 1)
+
+
+def test_calls_on_other_models_are_ignored():
+    controller = _observed(30, model="small")
+    assert controller.p95() is None
+    assert controller.plan(deadline_seconds=120).strategy == "full"
+
+
+def test_deadline_shorter_than_p95_drafts():
+    plan = _observed(8).plan(deadline_seconds=5)
+    assert plan.draft
+    assert plan.reasons == ["deadline"]
+
+
+def test_deadline_without_room_for_top_ups_skips_them():
+    controller = _observed(8)
+    for _ in range(5):
+        controller.observe("top_up", "small", 4)
+    plan = controller.plan(deadline_seconds=10)
+    assert plan.strategy == "full"
+    assert plan.max_iterations == 0
+    assert plan.reasons == ["deadline_no_top_up"]
+
+
+def test_non_llm_mode_is_never_degraded():
+    assert _observed(30).plan(deadline_seconds=120, mode="draft_only").strategy == "full"
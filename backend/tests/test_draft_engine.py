@@ -0,0 +1,54 @@
+"""DraftEngine: exact question counts and distinct question text."""
+
+from app.draft_engine import draft_engine
+
+
+def _gap(name: str) -> dict:
+    return {
+        "skill_name": name, "current_score": 2, "required_score": 4,
+        "gap_severity": "moderate", "priority": "high", "evidence": "Missed customer cues"
+    }
+
+
+def _questions(guide: dict) -> list:
+    sections = guide["sections"]
+    return [q["question"] for gap in sections["skill_gaps"] for q in gap["questions"]] + [
+        s["question"]["question"] for s in sections["skills_not_tested"]
+    ]
+
+
+def test_many_questions_on_one_gap_are_distinct():
+    guide = draft_engine.generate("Jane", [], [_gap("Communication")], [], 30)
+    questions = _questions(guide)
+    assert len(questions) == 30
+    assert len(set(questions)) == 30
+    assert "remaining_deficit" not in guide
+
+
+def test_exact_count_with_gaps_and_untested_skills():
+    untested = [{"skill_name": "Negotiation", "priority": "medium"}]
+    guide = draft_engine.generate("Jane", [], [_gap("Communication"), _gap("Problem Solving")], untested, 8)
+    assert len(_questions(guide)) == 8
+    assert "remaining_deficit" not in guide
+
+
+def test_no_gaps_fills_with_stretch_questions_on_verified_skills():
+    verified = [{"skill_name": "Communication", "score": 5, "evidence": "Clear and structured"}]
+    untested = [{"skill_name": "Negotiation", "priority": "medium"}]
+    guide = draft_engine.generate("Jane", verified, [], untested, 8)
+    questions = _questions(guide)
+    assert len(questions) == 8 and len(set(questions)) == 8
+    assert [(gap["skill_name"], gap["priority"]) for gap in guide["sections"]["skill_gaps"]] == [("Communication", "low")]
+    assert "remaining_deficit" not in guide
+
+
+def test_nothing_to_build_on_fills_with_general_behavioural_questions():
+    guide = draft_engine.generate("Jane", [], [], [], 5)
+    questions = _questions(guide)
+    assert len(questions) == 5 and len(set(questions)) == 5
+    assert [gap["skill_name"] for gap in guide["sections"]["skill_gaps"]] == ["General Behavioural"]
+
+
+def test_repeated_questions_read_naturally():
+    questions = _questions(draft_engine.generate("Jane", [], [_gap("Communication")], [], 20))
+    assert not any("(example" in q or "show this" in q for q in questions)
@@ -0,0 +1,74 @@
+"""Generation profiles: schema pruning, unused $defs and max_tokens caps."""
+
+from app import guide_profiles
+from app.llm_service import _strict_schema
+from app.schemas import AgenticGuideOutput
+
+
+def _objects(node):
+    """Every object schema (a node with `properties`) in `node`."""
+    if isinstance(node, dict):
+        if isinstance(node.get("properties"), dict):
+            yield node
+        for value in node.values():
+            yield from _objects(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _objects(item)
+
+
+def _property_names(schema):
+    return {name for node in _objects(schema) for name in node["properties"]}
+
+
+def test_full_profile_keeps_schema():
+    schema = _strict_schema(AgenticGuideOutput)
+    assert guide_profiles.prune_schema(schema, guide_profiles.omitted_fields("full")) is schema
+
+
+def test_pruning_removes_properties_and_required_entries():
+    schema = _strict_schema(AgenticGuideOutput)
+    for profile in ("standard", "fast"):
+        omitted = guide_profiles.omitted_fields(profile)
+        pruned = guide_profiles.prune_schema(schema, omitted)
+
+        assert not _property_names(pruned) & omitted
+        assert "questions" in _property_names(pruned)
+        for node in _objects(pruned):
+            assert node["required"] == list(node["properties"])
+    # The cached schema shared by other profiles is untouched
+    assert "interview_tips" in schema["properties"]
+
+
+def test_fast_profile_drops_unused_defs():
+    schema = _strict_schema(AgenticGuideOutput)
+    pruned = guide_profiles.prune_schema(schema, guide_profiles.omitted_fields("fast"))
+
+    assert "GapReasoning" in schema["$defs"]
+    assert "GapReasoning" not in pruned.get("$defs", {})
+    assert "NotTestedReasoning" not in pruned.get("$defs", {})
+    assert "GuideQuestion" in pruned["$defs"]
+
+
+def test_pruned_response_validates_with_defaults():
+    guide = AgenticGuideOutput.model_validate({
+        "executive_summary": "Summary",
+        "sections": {
+            "verified_skills": [],
+            "skill_gaps": [{"skill_name": "Communication", "current_score": 2, "priority": "high", "questions": []}],
+            "skills_not_tested": []
+        }
+    })
+    gap = guide.sections.skill_gaps[0].model_dump()
+    assert gap["reasoning"]["evidence_from_evaluation"] == ""
+    assert guide.interview_tips == []
+
+
+def test_max_tokens_caps():
+    assert guide_profiles.max_tokens("full", 6000) == 6000
+    assert guide_profiles.max_tokens("standard", 6000) == 4000
+    assert guide_profiles.max_tokens("standard", 3000) == 3000
+    assert guide_profiles.max_tokens("standard", 4000, "top_up") == 2500
+    assert guide_profiles.max_tokens("fast", 6000) == 2000
+    assert guide_profiles.max_tokens("fast", 4000, "top_up") == 1200
+    assert guide_profiles.max_tokens("unknown", 6000) == 6000
@@ -0,0 +1,121 @@
+"""IdempotencyStore: replays, bounded waits, and duplicates that wait without holding slots."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.admission import AdmissionController
+from app.config import settings
+from app.idempotency import IdempotencyStore
+
+
+def _returning(value, calls):
+    async def fn():
+        calls.append(value)
+        return value
+    return fn
+
+
+def test_retry_replays_stored_response():
+    store = IdempotencyStore()
+    calls = []
+
+    async def main():
+        first = await store.run("scope", "key", {"a": 1}, _returning({"ok": True}, calls))
+        second = await store.run("scope", "key", {"a": 1}, _returning({"ok": False}, calls))
+        return first, second
+
+    assert asyncio.run(main()) == (({"ok": True}, False), ({"ok": True}, True))
+    assert calls == [{"ok": True}]
+
+
+def test_reused_key_with_different_payload_is_rejected():
+    store = IdempotencyStore()
+
+    async def main():
+        await store.run("scope", "key", {"a": 1}, _returning({}, []))
+        await store.run("scope", "key", {"a": 2}, _returning({}, []))
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main())
+    assert raised.value.status_code == 422
+
+
+def test_wait_on_hung_original_times_out_with_409(monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+    store = IdempotencyStore()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hung():
+            await release.wait()
+            return {"ok": True}
+
+        original = asyncio.ensure_future(store.run("scope", "key", {}, hung))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            await store.run("scope", "key", {}, _returning({"ok": "duplicate"}, []))
+        release.set()
+        await original
+        replay = await store.run("scope", "key", {}, _returning({"ok": "duplicate"}, []))
+        return raised.value, replay
+
+    error, replay = asyncio.run(main())
+    assert error.status_code == 409 and int(error.headers["Retry-After"]) >= 1
+    assert replay == ({"ok": True}, True)
+
+
+def test_concurrent_duplicates_wait_without_taking_admission_slots(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    admission = AdmissionController("test", max_concurrent=lambda: 1, max_queue=lambda: 0)
+    store = IdempotencyStore()
+    calls = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def generate():
+            async with admission.slot():
+                calls.append(1)
+                await release.wait()
+                return {"ok": True}
+
+        original = asyncio.ensure_future(store.run("scope", "key", {}, generate))
+        await asyncio.sleep(0)
+        duplicates = [asyncio.ensure_future(store.run("scope", "key", {}, generate)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        # A full pool with no queue would reject these with 429 had they asked for a slot
+        assert (admission.active, admission.queued) == (1, 0)
+        assert not any(duplicate.done() for duplicate in duplicates)
+        release.set()
+        return await original, await asyncio.gather(*duplicates)
+
+    first, replays = asyncio.run(main())
+    assert first == ({"ok": True}, False)
+    assert replays == [({"ok": True}, True)] * 5
+    assert calls == [1]
+    assert admission.active == 0
+
+
+def test_failed_original_lets_a_waiter_take_over():
+    store = IdempotencyStore()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise RuntimeError("boom")
+
+        original = asyncio.ensure_future(store.run("scope", "key", {}, failing))
+        await asyncio.sleep(0)
+        retry = asyncio.ensure_future(store.run("scope", "key", {}, _returning({"ok": True}, [])))
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(RuntimeError):
+            await original
+        return await retry
+
+    assert asyncio.run(main()) == ({"ok": True}, False)
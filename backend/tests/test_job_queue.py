@@ -0,0 +1,109 @@
+"""JobQueue: claiming, lease expiry and resume, stale workers, cancellation."""
+
+import pytest
+
+from app.config import settings
+from app.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def _expire_leases(monkeypatch):
+    """Leases granted from now on are already expired at the next claim."""
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", -1)
+
+
+def test_claim_leases_items_in_order_and_completes_the_job(queue):
+    job_id = queue.submit({"num_questions": 8}, ["s1", "s2"])
+    first = queue.claim("w1")
+    second = queue.claim("w2")
+    assert (first["session_id"], second["session_id"]) == ("s1", "s2")
+    assert first["attempt"] == 1 and first["payload"] == {"num_questions": 8}
+    assert queue.claim("w3") is None
+    assert queue.get_job(job_id)["status"] == "running"
+
+    assert queue.complete(first["item_id"], job_id, "w1", {"session_id": "s1", "success": True})
+    assert queue.fail(second["item_id"], job_id, "w2", "Session s2 not found", retry=False)
+    job = queue.get_job(job_id)
+    assert (job["status"], job["completed"], job["failed"]) == ("completed", 1, 1)
+    assert queue.get_results(job_id) == [
+        {"session_id": "s1", "success": True},
+        {"session_id": "s2", "error": "Session s2 not found", "success": False},
+    ]
+
+
+def test_shards_bound_concurrency(queue):
+    queue.submit({}, ["s1", "s2", "s3"], shards=2)
+    assert queue.claim("w1")["session_id"] == "s1"
+    assert queue.claim("w2")["session_id"] == "s2"
+    assert queue.claim("w3") is None  # s3 shares s1's shard
+
+
+def test_expired_lease_is_resumed_by_another_worker(queue, monkeypatch):
+    job_id = queue.submit({}, ["s1"])
+    _expire_leases(monkeypatch)
+    stale = queue.claim("w1")
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 300)
+    resumed = queue.claim("w2")
+    assert resumed["item_id"] == stale["item_id"] and resumed["attempt"] == 2
+
+    # The worker that lost its lease cannot overwrite the new owner's outcome
+    assert not queue.complete(stale["item_id"], job_id, "w1", {"session_id": "s1", "from": "w1"})
+    assert not queue.fail(stale["item_id"], job_id, "w1", "boom", retry=True)
+    assert queue.get_job(job_id)["running"] == 1
+    assert queue.complete(resumed["item_id"], job_id, "w2", {"session_id": "s1", "from": "w2"})
+    assert queue.get_results(job_id) == [{"session_id": "s1", "from": "w2"}]
+
+
+def test_retryable_failure_returns_item_to_pending(queue):
+    job_id = queue.submit({}, ["s1"])
+    item = queue.claim("w1")
+    assert queue.fail(item["item_id"], job_id, "w1", "timeout", retry=True)
+    assert queue.claim("w2")["attempt"] == 2
+
+
+def test_expired_lease_fails_after_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 1)
+    _expire_leases(monkeypatch)
+    job_id = queue.submit({}, ["s1"])
+    queue.claim("w1")
+    assert queue.claim("w2") is None
+    job = queue.get_job(job_id)
+    assert (job["status"], job["failed"]) == ("completed", 1)
+
+
+def test_cancel_drops_pending_items_and_records_running_ones(queue):
+    job_id = queue.submit({}, ["s1", "s2"])
+    running = queue.claim("w1")
+    assert queue.cancel(job_id) == 1  # s2; s1 is left to its worker
+    assert queue.is_cancelled(job_id)
+    assert queue.claim("w2") is None
+
+    assert queue.mark_cancelled(running["item_id"], job_id, "w1")
+    job = queue.get_job(job_id)
+    assert (job["status"], job["cancelled"], job["running"]) == ("cancelled", 2, 0)
+    assert queue.cancel(job_id) is None
+
+
+def test_job_cancellation_records_both_cancellation_metrics(queue, monkeypatch):
+    from app import worker
+    from app.metrics import metrics
+    from app.routes import generation_jobs
+
+    monkeypatch.setattr(generation_jobs, "job_queue", queue)
+    monkeypatch.setattr(worker, "job_queue", queue)
+    generations = {"endpoint": "job", "reason": "client_request"}
+    sessions = {"endpoint": "job"}
+    before = metrics.get("guide_generations_cancelled_total", generations), metrics.get("guide_sessions_cancelled_total", sessions)
+
+    job_id = queue.submit({}, ["s1", "s2", "s3"])
+    running = queue.claim("w1")
+    generation_jobs.cancel_generation_job(job_id)
+    worker.process_item(running, "w1")  # Sees the cancellation before generating
+
+    after = metrics.get("guide_generations_cancelled_total", generations), metrics.get("guide_sessions_cancelled_total", sessions)
+    assert (after[0] - before[0], after[1] - before[1]) == (1, 3)
+    assert queue.get_job(job_id)["cancelled"] == 3
@@ -0,0 +1,96 @@
+"""Packed guide generation: splitting the response by session and per-candidate fallbacks."""
+
+from app.config import settings
+from app.degradation import GenerationPlan
+from app.llm_service import LLMService
+from app.metrics import metrics
+
+BANK = [{"skill_name": "Communication", "question": {"question": "Tell me about a hard conversation."}}]
+
+
+def _candidate(session_id):
+    return {
+        "session_id": session_id,
+        "plan": GenerationPlan(),
+        "candidate_name": f"Candidate {session_id}",
+        "role": "Support Agent",
+        "verified_skills": [],
+        "skill_gaps": [{"skill_name": "Communication", "score": 2}],
+        "skills_not_tested": [],
+        "evaluation_evidence": [],
+        "feedback_summary": None,
+        "voice_summary": None,
+        "scenario_type": None,
+    }
+
+
+def _packed_service(monkeypatch, response):
+    """LLMService whose packed call returns `response` and whose per-guide step records its input."""
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    service = LLMService()
+    calls = {"packed": 0, "guides": {}}
+
+    def complete_json(**kwargs):
+        calls["packed"] += 1
+        assert kwargs["call_type"] == "packed"
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def generate_agentic_guide(candidate_name, packed, **kwargs):
+        calls["guides"][candidate_name] = packed
+        return {"candidate": candidate_name}
+
+    monkeypatch.setattr(service, "_retrieve_bank_questions", lambda *args: BANK)
+    monkeypatch.setattr(service, "_complete_json", complete_json)
+    monkeypatch.setattr(service, "generate_agentic_guide", generate_agentic_guide)
+    return service, calls
+
+
+def test_packed_response_is_split_by_session(monkeypatch):
+    response = {"guides": [
+        {"session_id": "s2", "guide": {"executive_summary": "second"}},
+        {"session_id": "s1", "guide": {"executive_summary": "first"}},
+    ]}
+    service, calls = _packed_service(monkeypatch, response)
+
+    results = service.generate_packed_agentic_guides([_candidate("s1"), _candidate("s2")], "Job")
+
+    assert calls["packed"] == 1
+    assert results == {"s1": {"candidate": "Candidate s1"}, "s2": {"candidate": "Candidate s2"}}
+    assert calls["guides"]["Candidate s1"] == ({"executive_summary": "first"}, BANK)
+    assert calls["guides"]["Candidate s2"] == ({"executive_summary": "second"}, BANK)
+
+
+def test_candidate_missing_from_response_is_generated_individually(monkeypatch):
+    response = {"guides": [{"session_id": "s1", "guide": {"executive_summary": "first"}}]}
+    service, calls = _packed_service(monkeypatch, response)
+    before = metrics.get("guide_packed_fallbacks_total", {"reason": "missing_candidate"})
+
+    results = service.generate_packed_agentic_guides([_candidate("s1"), _candidate("s2")], "Job")
+
+    assert set(results) == {"s1", "s2"}
+    assert calls["guides"]["Candidate s1"][0] == {"executive_summary": "first"}
+    # No packed guide: generate_agentic_guide makes the candidate's own first call
+    assert calls["guides"]["Candidate s2"] == (None, BANK)
+    assert metrics.get("guide_packed_fallbacks_total", {"reason": "missing_candidate"}) == before + 1
+
+
+def test_failed_packed_call_falls_back_for_every_candidate(monkeypatch):
+    service, calls = _packed_service(monkeypatch, RuntimeError("provider down"))
+    before = metrics.get("guide_packed_fallbacks_total", {"reason": "api_error"})
+
+    results = service.generate_packed_agentic_guides([_candidate("s1"), _candidate("s2")], "Job")
+
+    assert set(results) == {"s1", "s2"}
+    assert all(guide is None for guide, _ in calls["guides"].values())
+    assert metrics.get("guide_packed_fallbacks_total", {"reason": "api_error"}) == before + 2
+
+
+def test_single_candidate_is_not_packed(monkeypatch):
+    service, calls = _packed_service(monkeypatch, {"guides": []})
+
+    service.generate_packed_agentic_guides([_candidate("s1")], "Job")
+
+    assert calls["packed"] == 0
+    assert calls["guides"]["Candidate s1"] == (None, None)
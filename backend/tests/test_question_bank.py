@@ -0,0 +1,55 @@
+"""Question bank: harvested questions wait for review before they are served."""
+
+import pytest
+
+from app.config import settings
+from app.question_bank import SOURCE, QuestionBank
+
+GAPS = [{"skill_name": "Communication", "gap_severity": "moderate"}]
+
+
+def _guide(*questions):
+    return {"sections": {"skill_gaps": [
+        {"skill_name": "Communication", "questions": [{"question": q, "what_to_look_for": "Clarity"} for q in questions]}
+    ]}}
+
+
+@pytest.fixture
+def bank(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", True)
+    return QuestionBank(str(tmp_path / "bank.sqlite3"))
+
+
+def _retrieve(bank):
+    return bank.retrieve(GAPS, [], role="Support", scenario_type="chat", budget=4)
+
+
+def test_harvested_questions_are_pending_until_approved(bank):
+    assert bank.add_from_guide(_guide("Tell me about a hard escalation."), GAPS, [], "Support", "chat") == 1
+    assert _retrieve(bank) == []
+
+    [entry] = bank.pending()
+    assert entry["question"]["question"] == "Tell me about a hard escalation."
+    assert bank.review(entry["id"], approved=True)
+    [served] = _retrieve(bank)
+    assert served["question"]["question"] == "Tell me about a hard escalation."
+    assert served["question"]["source"] == SOURCE
+    assert bank.pending() == []
+
+
+def test_rejected_questions_are_not_served(bank):
+    bank.add_from_guide(_guide("Walk me through a refund dispute."), GAPS, [], "Support", "chat")
+    [entry] = bank.pending()
+    bank.review(entry["id"], approved=False)
+    assert _retrieve(bank) == []
+
+
+def test_duplicate_questions_are_stored_once(bank):
+    assert bank.add_from_guide(_guide("Describe a tough call."), GAPS, [], "Support", "chat") == 1
+    assert bank.add_from_guide(_guide("  describe a TOUGH call. ", "A new one?"), GAPS, [], "Support", "chat") == 1
+    assert [entry["question"]["question"] for entry in bank.pending()] == ["Describe a tough call.", "A new one?"]
+
+
+def test_disabled_bank_stores_nothing(bank, monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", False)
+    assert bank.add_from_guide(_guide("Anything?"), GAPS, [], "Support", "chat") == 0
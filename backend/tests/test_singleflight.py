@@ -0,0 +1,123 @@
+"""SingleFlight: shared results, leader cancellation hand-off and follower cancellation."""
+
+import threading
+import time
+
+from app.cancellation import CancellationToken, GenerationCancelled
+from app.singleflight import SingleFlight, input_key
+
+
+def _wait_for_follower(flight, key, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        call = flight._calls.get(key)
+        if call is not None and call.followers:
+            return
+        time.sleep(0.005)
+    raise AssertionError("follower never attached")
+
+
+def _in_thread(fn):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def test_follower_gets_a_copy_of_the_leader_result():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append("leader")
+        release.wait(2)
+        return {"questions": [1, 2]}
+
+    leader, leader_out = _in_thread(lambda: flight.do("k", leader_fn))
+    while not flight.in_flight():
+        time.sleep(0.005)
+    follower, follower_out = _in_thread(lambda: flight.do("k", lambda: calls.append("follower")))
+    _wait_for_follower(flight, "k")
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert calls == ["leader"]
+    assert leader_out["result"] == follower_out["result"] == {"questions": [1, 2]}
+    assert leader_out["result"] is not follower_out["result"]
+    assert flight.in_flight() == 0
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def cancelled_leader():
+        release.wait(2)
+        raise GenerationCancelled("client_disconnect")
+
+    leader, leader_out = _in_thread(lambda: flight.do("k", cancelled_leader))
+    while not flight.in_flight():
+        time.sleep(0.005)
+    follower, follower_out = _in_thread(lambda: flight.do("k", lambda: "follower result"))
+    _wait_for_follower(flight, "k")
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert isinstance(leader_out["error"], GenerationCancelled)
+    assert follower_out == {"result": "follower result"}
+
+
+def test_follower_gets_leader_error():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def failing_leader():
+        release.wait(2)
+        raise ValueError("boom")
+
+    leader, _ = _in_thread(lambda: flight.do("k", failing_leader))
+    while not flight.in_flight():
+        time.sleep(0.005)
+    follower, follower_out = _in_thread(lambda: flight.do("k", lambda: "unused"))
+    _wait_for_follower(flight, "k")
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert isinstance(follower_out["error"], ValueError)
+
+
+def test_cancelled_follower_stops_waiting_without_affecting_leader():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    token = CancellationToken()
+
+    leader, leader_out = _in_thread(lambda: flight.do("k", lambda: release.wait(2) and "done"))
+    while not flight.in_flight():
+        time.sleep(0.005)
+    follower, follower_out = _in_thread(lambda: flight.do("k", lambda: "unused", cancel_token=token))
+    _wait_for_follower(flight, "k")
+    token.cancel("client_disconnect")
+    follower.join(2)
+
+    assert isinstance(follower_out["error"], GenerationCancelled)
+    assert leader.is_alive()
+
+    release.set()
+    leader.join(2)
+    assert leader_out == {"result": "done"}
+
+
+def test_input_key_ignores_dict_order():
+    assert input_key({"a": 1, "b": 2}, "x") == input_key({"b": 2, "a": 1}, "x")
+    assert input_key({"a": 1}) != input_key({"a": 2})
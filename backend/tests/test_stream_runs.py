@@ -0,0 +1,121 @@
+"""Stream runs: Last-Event-ID replay, SSE formatting and cancellation after disconnect."""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.stream_runs import StreamRun, format_sse, parse_last_event_id, stream_runs
+
+
+def _collect(run, last_event_id=0):
+    async def main():
+        return [event async for event in run.subscribe(last_event_id)]
+    return asyncio.run(main())
+
+
+def test_subscribe_replays_events_after_last_event_id():
+    run = StreamRun("run")
+    for n in range(1, 5):
+        run.publish("progress", {"n": n})
+    run.finish()
+
+    events = _collect(run, last_event_id=2)
+
+    assert [(seq, event_type, data["n"]) for seq, event_type, data in events] == [(3, "progress", 3), (4, "progress", 4)]
+    assert _collect(run, last_event_id=4) == []
+
+
+def test_subscriber_follows_live_events_until_finish():
+    run = StreamRun("run")
+    run.publish("run", {})
+
+    async def main():
+        seen = []
+
+        async def follow():
+            async for seq, event_type, _ in run.subscribe():
+                seen.append((seq, event_type))
+
+        task = asyncio.create_task(follow())
+        await asyncio.sleep(0.01)
+        # Generation publishes from its own thread
+        await asyncio.to_thread(run.publish, "guide", {})
+        await asyncio.to_thread(run.finish)
+        await asyncio.wait_for(task, timeout=1)
+        return seen
+
+    assert asyncio.run(main()) == [(1, "run"), (2, "guide")]
+
+
+def test_resume_route_replays_from_last_event_id_header():
+    run = stream_runs.create()
+    run.publish("run", {"run_id": run.run_id})
+    run.publish("guide", {"session_id": "s1"})
+    run.publish("done", {})
+    run.finish()
+
+    response = TestClient(app).get(
+        f"/api/evaluations/generate-agentic-guide-stream/{run.run_id}",
+        headers={"Last-Event-ID": "1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-run-id"] == run.run_id
+    assert "id: 1\n" not in response.text
+    assert response.text.index("id: 2\nevent: guide\n") < response.text.index("id: 3\nevent: done\n")
+
+
+def test_resume_route_returns_404_for_unknown_run():
+    response = TestClient(app).get("/api/evaluations/generate-agentic-guide-stream/missing")
+    assert response.status_code == 404
+
+
+def test_run_is_cancelled_when_no_subscriber_reattaches(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_DISCONNECT_GRACE_SECONDS", 0.05)
+    run = StreamRun("run")
+    run.publish("run", {})
+
+    async def disconnect_after_first_event():
+        stream = run.subscribe()
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(disconnect_after_first_event())
+    assert not run.cancel_token.cancelled
+
+    time.sleep(0.2)
+    assert run.cancel_token.cancelled
+    assert run.cancel_token.reason == "client_disconnect"
+
+
+def test_reattaching_within_grace_period_keeps_run_alive(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_DISCONNECT_GRACE_SECONDS", 0.1)
+    run = StreamRun("run")
+    run.publish("run", {})
+
+    async def connect_and_drop():
+        stream = run.subscribe()
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(connect_and_drop())
+    run._attach()  # A reconnect arrives before the timer fires
+    time.sleep(0.2)
+
+    assert not run.cancel_token.cancelled
+
+
+def test_format_sse():
+    assert format_sse(3, "guide", {"a": 1}) == 'id: 3\nevent: guide\ndata: {"a": 1}\n\n'
+    assert format_sse(0, "keepalive", {}) == ": keepalive\n\n"
+
+
+def test_parse_last_event_id():
+    assert parse_last_event_id(None) == 0
+    assert parse_last_event_id("") == 0
+    assert parse_last_event_id("7") == 7
+    assert parse_last_event_id("-3") == 0
+    assert parse_last_event_id("abc") == 0
@@ -35,7 +35,7 @@ import {
   TrendingDown
 } from 'lucide-react';
 import Link from 'next/link';
-import { api, AgenticGuideResponse, AgenticGuideResult, GapQuestion, SessionDetail, StreamingStep } from '@/lib/api';
+import { api, AgenticGuideResponse, AgenticGuideResult, GapQuestion, SessionDetail, StreamingGuide, StreamingStep } from '@/lib/api';
 
 function GeneratePageContent() {
   const searchParams = useSearchParams();
@@ -101,6 +101,7 @@ function GeneratePageContent() {
   // Streaming progress state
   const [currentStep, setCurrentStep] = useState<StreamingStep | null>(null);
   const [completedSteps, setCompletedSteps] = useState<string[]>([]);
+  const [streamingGuide, setStreamingGuide] = useState<StreamingGuide | null>(null);
 
   // Fetch session details for each candidate
   useEffect(() => {
@@ -191,6 +192,7 @@ function GeneratePageContent() {
     setError(null);
     setCurrentStep(null);
     setCompletedSteps([]);
+    setStreamingGuide(null);
 
     // Convert Map to object for API
     const perCandidateInstructionsObj: Record<string, string> = {};
@@ -235,7 +237,9 @@ function GeneratePageContent() {
         setError(errorMessage);
         setLoading(false);
         setCurrentStep(null);
-      }
+      },
+      // onGuide callback - instant draft, refined in place as AI content arrives
+      (guide: StreamingGuide) => setStreamingGuide(guide)
     );
   };
 
@@ -690,6 +694,38 @@ function GeneratePageContent() {
                     </p>
                   </motion.div>
                 )}
+
+                {/* Draft guide preview for the current candidate */}
+                {streamingGuide && streamingGuide.candidate_index === currentStep.candidate_index && (
+                  <motion.div
+                    initial={{ opacity: 0 }}
+                    animate={{ opacity: 1 }}
+                    className="mt-4 p-4 rounded-lg bg-white border border-slate-200"
+                  >
+                    <div className="flex items-center justify-between mb-2">
+                      <h4 className="text-sm font-semibold text-slate-800">
+                        {streamingGuide.candidate_name}
+                      </h4>
+                      <span className={`text-xs px-2 py-0.5 rounded-full ${
+                        streamingGuide.status === 'draft'
+                          ? 'bg-slate-100 text-slate-600'
+                          : 'bg-indigo-50 text-indigo-700'
+                      }`}>
+                        {streamingGuide.status === 'draft' ? 'Draft' : streamingGuide.status === 'upgrading' ? 'Refining with AI' : 'AI guide'}
+                      </span>
+                    </div>
+                    <p className="text-xs text-slate-600 mb-3">{streamingGuide.guide.executive_summary}</p>
+                    <ul className="space-y-1">
+                      {(streamingGuide.guide.sections.skill_gaps || []).flatMap((gap) =>
+                        gap.questions.map((q, qIdx) => (
+                          <li key={`${gap.skill_name}-${qIdx}`} className="text-xs text-slate-700">
+                            <span className="font-medium text-amber-700">{gap.skill_name}:</span> {q.question}
+                          </li>
+                        ))
+                      )}
+                    </ul>
+                  </motion.div>
+                )}
               </motion.div>
             )}
           </AnimatePresence>
@@ -828,17 +864,19 @@ function GuideDisplay({
             </div>
           </div>
           
-          <div className="p-4 rounded-xl bg-amber-50 border border-amber-200">
-            <h4 className="font-semibold text-amber-700 mb-2 flex items-center gap-2">
-              <Lightbulb className="w-4 h-4" />
-              Interview Tips
-            </h4>
-            <ul className="space-y-1">
-              {guideData.interview_tips.map((tip, i) => (
-                <li key={i} className="text-sm text-amber-700">• {tip}</li>
-              ))}
-            </ul>
-          </div>
+          {guideData.interview_tips.length > 0 && (
+            <div className="p-4 rounded-xl bg-amber-50 border border-amber-200">
+              <h4 className="font-semibold text-amber-700 mb-2 flex items-center gap-2">
+                <Lightbulb className="w-4 h-4" />
+                Interview Tips
+              </h4>
+              <ul className="space-y-1">
+                {guideData.interview_tips.map((tip, i) => (
+                  <li key={i} className="text-sm text-amber-700">• {tip}</li>
+                ))}
+              </ul>
+            </div>
+          )}
         </div>
       </div>
 
@@ -1190,10 +1228,12 @@ function EditableQuestionCard({
         )}
       </AnimatePresence>
       
-      <div className="flex items-center gap-2 text-xs text-slate-400 mb-3">
-        <Clock className="w-3 h-3" />
-        <span>{question.time_estimate}</span>
-      </div>
+      {question.time_estimate && (
+        <div className="flex items-center gap-2 text-xs text-slate-400 mb-3">
+          <Clock className="w-3 h-3" />
+          <span>{question.time_estimate}</span>
+        </div>
+      )}
       
       <div className="grid md:grid-cols-3 gap-3">
         <div className="p-3 rounded-lg bg-emerald-50 border border-emerald-100">
@@ -1207,28 +1247,32 @@ function EditableQuestionCard({
             ))}
           </ul>
         </div>
-        <div className="p-3 rounded-lg bg-red-50 border border-red-100">
-          <p className="text-xs font-semibold text-red-700 mb-1 flex items-center gap-1">
-            <AlertTriangle className="w-3 h-3" />
-            Red Flags
-          </p>
-          <ul className="text-xs text-red-600 space-y-0.5">
-            {question.red_flags.map((flag, i) => (
-              <li key={i}>• {flag}</li>
-            ))}
-          </ul>
-        </div>
-        <div className="p-3 rounded-lg bg-blue-50 border border-blue-100">
-          <p className="text-xs font-semibold text-blue-700 mb-1 flex items-center gap-1">
-            <ChevronRight className="w-3 h-3" />
-            Follow-ups
-          </p>
-          <ul className="text-xs text-blue-600 space-y-0.5">
-            {question.follow_ups.map((fu, i) => (
-              <li key={i}>• {fu}</li>
-            ))}
-          </ul>
-        </div>
+        {question.red_flags.length > 0 && (
+          <div className="p-3 rounded-lg bg-red-50 border border-red-100">
+            <p className="text-xs font-semibold text-red-700 mb-1 flex items-center gap-1">
+              <AlertTriangle className="w-3 h-3" />
+              Red Flags
+            </p>
+            <ul className="text-xs text-red-600 space-y-0.5">
+              {question.red_flags.map((flag, i) => (
+                <li key={i}>• {flag}</li>
+              ))}
+            </ul>
+          </div>
+        )}
+        {question.follow_ups.length > 0 && (
+          <div className="p-3 rounded-lg bg-blue-50 border border-blue-100">
+            <p className="text-xs font-semibold text-blue-700 mb-1 flex items-center gap-1">
+              <ChevronRight className="w-3 h-3" />
+              Follow-ups
+            </p>
+            <ul className="text-xs text-blue-600 space-y-0.5">
+              {question.follow_ups.map((fu, i) => (
+                <li key={i}>• {fu}</li>
+              ))}
+            </ul>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -125,6 +125,10 @@ export interface AgenticGuideRequest {
   custom_instructions?: string;
   per_candidate_instructions?: Record<string, string>;  // session_id -> instruction
   num_questions: number;
+  mode?: 'llm' | 'draft';  // draft = instant rule-based guide
+  deadline_seconds?: number;  // Per-guide time budget (server default GUIDE_DEADLINE_SECONDS)
+  profile?: 'full' | 'standard' | 'fast';  // fast = questions and what to listen for only
+  pack?: boolean;  // Share LLM calls between small-evidence candidates (non-streaming endpoint)
 }
 
 export interface VerifiedSkillSection {
@@ -149,6 +153,7 @@ export interface GapQuestion {
   red_flags: string[];
   follow_ups: string[];
   time_estimate: string;
+  source?: 'question_bank'; // Reused from an earlier guide
 }
 
 export interface SkillGapSection {
@@ -185,6 +190,7 @@ export interface AgenticGuide {
   overall_red_flags: string[];
   overall_strengths: string[];
   interview_tips: string[];
+  remaining_deficit?: number;  // Questions still missing (deadline cut top-ups short)
 }
 
 export interface AgenticGuideResult {
@@ -206,6 +212,11 @@ export interface AgenticGuideResult {
     feedback_available: boolean;
     voice_evaluation_available: boolean;
     custom_instructions_provided: boolean;
+    mode?: 'llm' | 'draft';
+    profile?: 'full' | 'standard' | 'fast';  // Lighter profiles leave reasoning, red flags, tips etc. empty
+    packed?: boolean;  // First LLM call shared with other candidates of the batch
+    degraded?: boolean;  // Generated with a cheaper strategy (slow LLM, deadline or LLM error)
+    degradation?: { strategy: string; reasons: string[]; llm_p95_seconds: number | null };
   };
 }
 
@@ -215,6 +226,21 @@ export interface AgenticGuideResponse {
   required_skills_count: number;
   candidates_processed: number;
   guides: AgenticGuideResult[];
+  timing?: StreamTiming;  // Only on the streaming `complete` event
+}
+
+export interface CandidateTiming {
+  session_id: string;
+  total_ms: number;
+  stages_ms: Record<string, number>;
+  llm_calls: number;
+  tokens: { prompt: number; completion: number };
+}
+
+export interface StreamTiming {
+  candidates: CandidateTiming[];
+  llm_calls: number;
+  tokens: { prompt: number; completion: number };
 }
 
 // Streaming progress types
@@ -228,6 +254,34 @@ export interface StreamingStep {
     skill_gaps_count?: number;
     skills_not_tested_count?: number;
   };
+  elapsed_ms?: number;  // Since the start of the stream run
+  stages_ms?: Record<string, number>;  // Stage durations for this candidate so far
+}
+
+// Guide shown while a candidate is generating: the instant `draft`, then
+// patched in place by `upgrade` events until the final `result`
+export interface StreamingGuide {
+  candidate_index: number;
+  session_id: string;
+  candidate_name: string;
+  guide: AgenticGuide;
+  status: 'draft' | 'upgrading' | 'final';
+}
+
+// Apply an `upgrade` event's `replace` map (dotted paths, null = remove) to a guide
+export function applyGuideUpgrade(guide: AgenticGuide, replace: Record<string, unknown>): AgenticGuide {
+  const next = { ...guide, sections: { ...guide.sections } } as Record<string, unknown>;
+  for (const [path, value] of Object.entries(replace)) {
+    const [key, section] = path.split('.');
+    const target = section ? (next.sections as Record<string, unknown>) : next;
+    const field = section || key;
+    if (value === null) {
+      delete target[field];
+    } else {
+      target[field] = value;
+    }
+  }
+  return next as unknown as AgenticGuide;
 }
 
 export interface StreamingError {
@@ -253,6 +307,12 @@ async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T>
   return response.json();
 }
 
+// Reuse the same key when retrying a generation request so the server
+// returns (or waits for) the original response instead of regenerating.
+function idempotencyHeaders(idempotencyKey?: string): HeadersInit | undefined {
+  return idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined;
+}
+
 export const api = {
   // Campaigns
   getCampaigns: () => fetchAPI<Campaign[]>('/evaluations/campaigns'),
@@ -271,15 +331,17 @@ export const api = {
   getSkills: () => fetchAPI<Skill[]>('/evaluations/skills'),
   
   // Interview Guide Generation (Legacy)
-  generateGuide: (sessionId: string, numQuestions = 8) => 
+  generateGuide: (sessionId: string, numQuestions = 8, idempotencyKey?: string) => 
     fetchAPI<InterviewGuide>(`/evaluations/generate-guide/${sessionId}?num_questions=${numQuestions}`, {
       method: 'POST',
+      headers: idempotencyHeaders(idempotencyKey),
     }),
   
   // Agentic Interview Guide Generation
-  generateAgenticGuide: (request: AgenticGuideRequest) =>
+  generateAgenticGuide: (request: AgenticGuideRequest, idempotencyKey?: string) =>
     fetchAPI<AgenticGuideResponse>('/evaluations/generate-agentic-guide', {
       method: 'POST',
+      headers: idempotencyHeaders(idempotencyKey),
       body: JSON.stringify(request),
     }),
   
@@ -289,7 +351,7 @@ export const api = {
     skill_name: string;
     instruction?: string;
     candidate_context?: string;
-  }) =>
+  }, idempotencyKey?: string) =>
     fetchAPI<{
       success: boolean;
       regenerated_question?: {
@@ -302,80 +364,149 @@ export const api = {
       error?: string;
     }>('/evaluations/regenerate-question', {
       method: 'POST',
+      headers: idempotencyHeaders(idempotencyKey),
       body: JSON.stringify(request),
     }),
   
-  // Streaming Agentic Interview Guide Generation with progress updates
+  // Streaming Agentic Interview Guide Generation with progress updates.
+  // If the connection drops, reattaches to the server-side run with Last-Event-ID
+  // so finished candidates are replayed instead of regenerated.
   generateAgenticGuideStream: async (
     request: AgenticGuideRequest,
     onStep: (step: StreamingStep) => void,
     onComplete: (result: AgenticGuideResponse) => void,
-    onError: (error: string) => void
+    onError: (error: string) => void,
+    onGuide?: (guide: StreamingGuide) => void
   ): Promise<void> => {
-    try {
-      const response = await fetch(`${API_BASE}/evaluations/generate-agentic-guide-stream`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(request),
-      });
-
-      if (!response.ok) {
-        const error = await response.json().catch(() => ({ detail: 'An error occurred' }));
-        throw new Error(error.detail || `HTTP error! status: ${response.status}`);
-      }
+    const MAX_RECONNECTS = 5;
+    const guides = new Map<number, StreamingGuide>();
+    let runId = '';
+    let lastEventId = '';
+    let finished = false;  // complete, cancelled or a run-level error
+    let reconnects = 0;
+    let lastError = 'Stream ended before generation finished';
 
-      const reader = response.body?.getReader();
-      if (!reader) {
-        throw new Error('ReadableStream not supported');
-      }
+    while (!finished) {
+      try {
+        const response = runId
+          ? await fetch(`${API_BASE}/evaluations/generate-agentic-guide-stream/${runId}`, {
+              headers: { 'Last-Event-ID': lastEventId },
+            })
+          : await fetch(`${API_BASE}/evaluations/generate-agentic-guide-stream`, {
+              method: 'POST',
+              headers: {
+                'Content-Type': 'application/json',
+              },
+              body: JSON.stringify(request),
+            });
+
+        if (!response.ok) {
+          const error = await response.json().catch(() => ({ detail: 'An error occurred' }));
+          throw new Error(error.detail || `HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body?.getReader();
+        if (!reader) {
+          throw new Error('ReadableStream not supported');
+        }
 
-      const decoder = new TextDecoder();
-      let buffer = '';
-
-      while (true) {
-        const { done, value } = await reader.read();
-        
-        if (done) break;
-        
-        buffer += decoder.decode(value, { stream: true });
-        
-        // Parse SSE events from buffer
-        const lines = buffer.split('\n');
-        buffer = lines.pop() || ''; // Keep incomplete line in buffer
-        
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let currentId = '';
         let currentEvent = '';
         let currentData = '';
-        
-        for (const line of lines) {
-          if (line.startsWith('event: ')) {
-            currentEvent = line.substring(7).trim();
-          } else if (line.startsWith('data: ')) {
-            currentData = line.substring(6);
-          } else if (line === '' && currentEvent && currentData) {
-            // End of event, process it
-            try {
-              const parsed = JSON.parse(currentData);
-              
-              if (currentEvent === 'step') {
-                onStep(parsed as StreamingStep);
-              } else if (currentEvent === 'complete') {
-                onComplete(parsed as AgenticGuideResponse);
-              } else if (currentEvent === 'error') {
-                onError((parsed as StreamingError).error);
+
+        while (true) {
+          const { done, value } = await reader.read();
+          
+          if (done) break;
+          
+          buffer += decoder.decode(value, { stream: true });
+          
+          // Parse SSE events from buffer
+          const lines = buffer.split('\n');
+          buffer = lines.pop() || ''; // Keep incomplete line in buffer
+          
+          for (const line of lines) {
+            if (line.startsWith('id: ')) {
+              currentId = line.substring(4).trim();
+            } else if (line.startsWith('event: ')) {
+              currentEvent = line.substring(7).trim();
+            } else if (line.startsWith('data: ')) {
+              currentData = line.substring(6);
+            } else if (line === '' && currentEvent && currentData) {
+              // End of event, process it
+              if (currentId) lastEventId = currentId;
+              try {
+                const parsed = JSON.parse(currentData);
+                
+                if (currentEvent === 'run') {
+                  runId = parsed.run_id;
+                } else if (currentEvent === 'step') {
+                  onStep(parsed as StreamingStep);
+                } else if (currentEvent === 'draft') {
+                  const draft: StreamingGuide = {
+                    candidate_index: parsed.candidate_index,
+                    session_id: parsed.session_id,
+                    candidate_name: parsed.candidate_name,
+                    guide: parsed.guide,
+                    status: 'draft',
+                  };
+                  guides.set(draft.candidate_index, draft);
+                  onGuide?.(draft);
+                } else if (currentEvent === 'upgrade') {
+                  const current = guides.get(parsed.candidate_index);
+                  if (current) {
+                    const upgraded: StreamingGuide = {
+                      ...current,
+                      guide: applyGuideUpgrade(current.guide, parsed.replace),
+                      status: parsed.final ? 'final' : 'upgrading',
+                    };
+                    guides.set(upgraded.candidate_index, upgraded);
+                    onGuide?.(upgraded);
+                  }
+                } else if (currentEvent === 'complete') {
+                  finished = true;
+                  onComplete(parsed as AgenticGuideResponse);
+                } else if (currentEvent === 'cancelled') {
+                  finished = true;
+                  onError(`Generation cancelled (${parsed.reason})`);
+                } else if (currentEvent === 'error') {
+                  // Without a session_id the whole run failed and the server ends the stream
+                  if (!(parsed as StreamingError).session_id) finished = true;
+                  onError((parsed as StreamingError).error);
+                }
+              } catch (parseError) {
+                console.error('Failed to parse SSE data:', parseError);
               }
-            } catch (parseError) {
-              console.error('Failed to parse SSE data:', parseError);
+              
+              currentId = '';
+              currentEvent = '';
+              currentData = '';
             }
-            
-            currentEvent = '';
-            currentData = '';
           }
         }
+
+        if (!finished && !runId) {
+          throw new Error('Stream ended before generation started');
+        }
+      } catch (error) {
+        lastError = error instanceof Error ? error.message : 'Failed to connect to streaming endpoint';
+        if (!runId) {
+          onError(lastError);
+          return;
+        }
+      }
+
+      // Dropped connections and clean ends without a terminal event both use up a reconnect
+      if (!finished) {
+        if (reconnects >= MAX_RECONNECTS) {
+          onError(lastError);
+          return;
+        }
+        reconnects += 1;
+        await new Promise((resolve) => setTimeout(resolve, 1000 * reconnects));
       }
-    } catch (error) {
-      onError(error instanceof Error ? error.message : 'Failed to connect to streaming endpoint');
     }
   },
 };